@@ -0,0 +1,127 @@
+"""HTTP/1.1 vs HTTP/2 benchmark for the async client.
+
+Serves a mock chat-completions endpoint locally (cleartext, HTTP/2 with
+prior knowledge) and fires 50/200/500 concurrent requests through
+IOIntelligenceAsyncHTTPClient over each protocol, reporting wall time and
+the peak number of open file descriptors (sockets) in this process. The
+server runs in-process, so each connection is counted at both ends.
+
+Requires: pip install "langchain-iointelligence[http2]" hypercorn
+Linux only for the descriptor count (reads /proc/self/fd).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+from langchain_iointelligence.async_http_client import \
+    IOIntelligenceAsyncHTTPClient
+
+RESPONSE = json.dumps(
+    {
+        "id": "bench",
+        "model": "mock",
+        "choices": [
+            {"finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+).encode()
+
+
+async def mock_api(scope, receive, send):
+    """Minimal ASGI chat endpoint with a fixed server-side latency."""
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+    await asyncio.sleep(0.05)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": RESPONSE})
+
+
+class _PriorKnowledgeH2Client(IOIntelligenceAsyncHTTPClient):
+    """Speak HTTP/2 over cleartext; real endpoints negotiate it via TLS ALPN."""
+
+    def _build_client(self) -> httpx.AsyncClient:
+        if not self.http2:
+            return super()._build_client()
+        return httpx.AsyncClient(
+            timeout=self.timeout, http1=False, http2=True, limits=self.limits
+        )
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+async def run(url: str, http2: bool, concurrency: int) -> None:
+    client = _PriorKnowledgeH2Client(
+        "bench",
+        url,
+        max_retries=0,
+        http2=http2,
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+    )
+    peak = open_fds()
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, open_fds())
+            await asyncio.sleep(0.005)
+
+    baseline = open_fds()
+    sampler = asyncio.create_task(sample())
+    data = {"model": "mock", "messages": [{"role": "user", "content": "hi"}]}
+    started = time.perf_counter()
+    await asyncio.gather(*(client.apost_with_retry(data) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    await client.aclose()
+    print(
+        f"{'h2' if http2 else 'h1':>3} {concurrency:>5} "
+        f"{elapsed * 1000:>9.1f} ms {peak - baseline:>8} extra fds"
+    )
+
+
+async def main(port: int, levels) -> None:
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.backlog = 1024
+    config.loglevel = "WARNING"
+    shutdown = asyncio.Event()
+    server = asyncio.create_task(serve(mock_api, config, shutdown_trigger=shutdown.wait))
+    await asyncio.sleep(0.5)
+    url = f"http://127.0.0.1:{port}/v1/chat/completions"
+
+    print("proto  conc       time      sockets")
+    for concurrency in levels:
+        for http2 in (False, True):
+            await run(url, http2, concurrency)
+
+    shutdown.set()
+    await server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--levels", type=int, nargs="+", default=[50, 200, 500])
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.levels))
@@ -0,0 +1,125 @@
+"""Microbenchmark: byte-level SSE parser vs. the old line-decoding loop.
+
+Builds a synthetic 100k-chunk chat-completion stream, splits it into
+network-sized reads, and times extracting every ``data`` payload with
+
+* ``requests``: the old sync path, ``Response.iter_lines(decode_unicode=True)``
+  followed by ``startswith("data: ")`` / ``line[6:]`` / ``strip()``;
+* ``httpx``: the old async path, httpx's ``TextDecoder`` + ``LineDecoder``
+  (what ``aiter_lines`` runs) followed by the same slicing;
+* ``naive``: a bare str split loop, a lower bound for line-based parsing;
+* ``sse``: :func:`langchain_iointelligence.sse.iter_sse_data`.
+
+Run: python examples/sse_benchmark.py [--chunks 100000] [--read-size 4096]
+(``--read-size 0`` delivers one event per read.)
+"""
+
+import argparse
+import json
+import time
+
+import requests
+from httpx._decoders import LineDecoder, TextDecoder
+
+from langchain_iointelligence.sse import iter_sse_data
+
+
+def build_stream(chunks: int) -> bytes:
+    parts = []
+    for i in range(chunks):
+        payload = {
+            "id": "chatcmpl-bench",
+            "model": "meta-llama/Llama-3.3-70B-Instruct",
+            "choices": [{"index": 0, "delta": {"content": f" tok{i}"}, "finish_reason": None}],
+        }
+        parts.append(b"data: " + json.dumps(payload).encode() + b"\n\n")
+    parts.append(b"data: [DONE]\n\n")
+    return b"".join(parts)
+
+
+def split_reads(stream: bytes, read_size: int):
+    if read_size <= 0:
+        # One read per event, as when the server flushes every token.
+        return [event + b"\n\n" for event in stream.split(b"\n\n")[:-1]]
+    return [stream[i:i + read_size] for i in range(0, len(stream), read_size)]
+
+
+def _data_lines(lines):
+    for line in lines:
+        if not line or not line.startswith("data: "):
+            continue
+        payload = line[6:].strip()
+        if payload == "[DONE]":
+            return
+        yield payload
+
+
+class _ReplayResponse(requests.Response):
+    def __init__(self, reads):
+        super().__init__()
+        self._reads = reads
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        return (read.decode("utf-8") for read in self._reads)
+
+
+def requests_lines(reads):
+    return _data_lines(_ReplayResponse(reads).iter_lines(decode_unicode=True))
+
+
+def _httpx_line_iter(reads):
+    text, lines = TextDecoder("utf-8"), LineDecoder()
+    for read in reads:
+        yield from lines.decode(text.decode(read))
+    yield from lines.flush()
+
+
+def httpx_lines(reads):
+    return _data_lines(_httpx_line_iter(reads))
+
+
+def naive_lines(reads):
+    """Decode to str and split on LF; no CR handling at all."""
+    pending = ""
+    for read in reads:
+        pending += read.decode("utf-8")
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if not line.startswith("data: "):
+                continue
+            payload = line[6:].strip()
+            if payload == "[DONE]":
+                return
+            yield payload
+
+
+def bench(name, func, reads, repeat):
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = sum(1 for _ in func(reads))
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:>8}: {best * 1000:8.1f} ms  ({count} events, {best / count * 1e9:6.0f} ns/event)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--read-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reads = split_reads(build_stream(args.chunks), args.read_size)
+    size = f"{args.read_size} bytes" if args.read_size > 0 else "one event each"
+    print(f"{args.chunks} events in {len(reads)} reads of {size}")
+    bench("requests", requests_lines, reads, args.repeat)
+    bench("httpx", httpx_lines, reads, args.repeat)
+    bench("naive", naive_lines, reads, args.repeat)
+    bench("sse", iter_sse_data, reads, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
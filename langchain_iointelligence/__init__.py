@@ -1,13 +1,30 @@
 """LangChain wrapper for io Intelligence LLM API."""
 
+from .agent import AgentEvent, AgentResult, IOIntelligenceAgent
+from .cache import (BaseResponseCache, InMemoryResponseCache,
+                    SQLiteResponseCache, TieredResponseCache)
 from .chat import IOIntelligenceChat, IOIntelligenceChatModel
+from .circuit_breaker import CircuitBreaker
+from .client_pool import (IOIntelligenceClientPool, aclose_shared_clients,
+                          close_shared_clients, get_client_pool)
+from .codec import JSONCodec, get_json_codec, set_json_codec
+from .concurrency import AdaptiveConcurrencyLimiter
 from .exceptions import (IOIntelligenceAPIError,
                          IOIntelligenceAuthenticationError,
+                         IOIntelligenceCircuitOpenError,
                          IOIntelligenceConnectionError, IOIntelligenceError,
                          IOIntelligenceInvalidResponseError,
                          IOIntelligenceRateLimitError,
                          IOIntelligenceServerError, IOIntelligenceTimeoutError)
+from .hedging import HedgePolicy
 from .llm import IOIntelligenceLLM
+from .message_cache import MessageSerializationCache
+from .rate_limit import IOIntelligenceRateLimiter
+from .routing import EndpointRouter
+from .streaming import StreamDelta
+from .tool_executor import ToolExecutor
+from .tool_schemas import Toolset, get_openai_tool_schema
+from .tool_stream import ToolCallAccumulator
 from .utils import (IOIntelligenceUtils, is_model_available,
                     list_available_models)
 from .vision import (DEFAULT_VISION_MODEL, MAX_IMAGES_PER_REQUEST,
@@ -27,7 +44,38 @@ __all__ = [
     "IOIntelligenceTimeoutError",
     "IOIntelligenceConnectionError",
     "IOIntelligenceInvalidResponseError",
+    "IOIntelligenceCircuitOpenError",
     "IOIntelligenceUtils",
+    "IOIntelligenceRateLimiter",
+    "StreamDelta",
+    "ToolCallAccumulator",
+    "ToolExecutor",
+    "Toolset",
+    "get_openai_tool_schema",
+    # Agent loop
+    "IOIntelligenceAgent",
+    "AgentEvent",
+    "AgentResult",
+    # Response caching
+    "BaseResponseCache",
+    "InMemoryResponseCache",
+    "SQLiteResponseCache",
+    "TieredResponseCache",
+    "MessageSerializationCache",
+    # JSON codec
+    "JSONCodec",
+    "get_json_codec",
+    "set_json_codec",
+    # Shared client pool
+    "IOIntelligenceClientPool",
+    "get_client_pool",
+    "close_shared_clients",
+    "aclose_shared_clients",
+    # Multi-endpoint routing, hedging, circuit breaking and concurrency
+    "EndpointRouter",
+    "HedgePolicy",
+    "CircuitBreaker",
+    "AdaptiveConcurrencyLimiter",
     "list_available_models",
     "is_model_available",
     # Vision / multimodal helpers
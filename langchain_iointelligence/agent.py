@@ -0,0 +1,271 @@
+"""Tool-calling agent loop on top of the chat model's async stream.
+
+:class:`IOIntelligenceAgent` runs model turn -> tools -> model turn until
+the model answers without tool calls. Each turn is streamed; a tool call
+is dispatched to its tool as soon as its arguments have streamed in
+(:class:`ToolCallAccumulator`), so tools run while the model is still
+emitting the rest of the turn. The wire-format message list is kept
+between turns and only the new messages are serialised each time.
+
+Example::
+
+    agent = IOIntelligenceAgent(chat, [get_weather, get_time])
+    result = await agent.arun("What's the weather and time in Tokyo?")
+    print(result.output)
+"""
+
+import asyncio
+from typing import (Any, AsyncIterator, Callable, Dict, List, Optional,
+                    Sequence, Union)
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.messages.ai import UsageMetadata
+from langchain_core.messages.tool import ToolCall
+from langchain_core.tools import BaseTool
+
+from .batch import DEFAULT_BATCH_CONCURRENCY, has_running_loop
+from .canonical import canonicalize_request
+from .chat import (IOIntelligenceChatModel, _convert_message_to_dict,
+                   _format_tool_choice)
+from .streaming import parse_stream_delta
+from .tool_executor import ToolExecutor
+from .tool_schemas import Toolset
+from .tool_stream import ToolCallAccumulator
+from .usage import build_usage_metadata
+
+STOP_REASONS = ("final_answer", "max_iterations", "max_tokens")
+
+
+class AgentEvent:
+    """One step of an agent run, as yielded by :meth:`IOIntelligenceAgent.astream`.
+
+    ``type`` is one of:
+
+    * ``"token"`` - ``data`` is a text delta of the current turn;
+    * ``"tool_call"`` - a tool call whose arguments are complete (it is
+      already running);
+    * ``"tool_result"`` - the ``ToolMessage`` of a finished tool call;
+    * ``"message"`` - the complete ``AIMessage`` of a turn;
+    * ``"done"`` - the final :class:`AgentResult`.
+    """
+
+    __slots__ = ("type", "data")
+
+    def __init__(self, type: str, data: Any):
+        self.type = type
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"AgentEvent(type={self.type!r}, data={self.data!r})"
+
+
+class AgentResult:
+    """Outcome of an agent run.
+
+    Attributes:
+        output: Text of the last model turn
+        messages: Full conversation, including the input messages
+        iterations: Number of model turns
+        usage: Token usage summed over all turns
+        stop_reason: One of :data:`STOP_REASONS`
+    """
+
+    __slots__ = ("output", "messages", "iterations", "usage", "stop_reason")
+
+    def __init__(
+        self,
+        output: str,
+        messages: List[BaseMessage],
+        iterations: int,
+        usage: UsageMetadata,
+        stop_reason: str,
+    ):
+        self.output = output
+        self.messages = messages
+        self.iterations = iterations
+        self.usage = usage
+        self.stop_reason = stop_reason
+
+    def __repr__(self) -> str:
+        return (
+            f"AgentResult(stop_reason={self.stop_reason!r}, "
+            f"iterations={self.iterations}, output={self.output!r})"
+        )
+
+
+class IOIntelligenceAgent:
+    """Drive a tool-calling conversation with an io Intelligence chat model.
+
+    Args:
+        chat: The chat model (its own settings - model, retries, caching,
+            stream resumption - apply to every turn)
+        tools: ``BaseTool`` instances or plain functions
+        max_iterations: Maximum number of model turns
+        max_total_tokens: Stop once the summed ``total_tokens`` of all turns
+            reaches this (None = no cap)
+        tool_choice: Passed to the API like ``bind_tools(tool_choice=...)``
+            on the first turn only, so the loop can still finish
+        tool_timeout: Per-call tool timeout in seconds
+        max_tool_concurrency: Maximum number of tools running at once
+        **request_kwargs: Extra request fields sent on every turn
+    """
+
+    def __init__(
+        self,
+        chat: IOIntelligenceChatModel,
+        tools: Sequence[Union[BaseTool, Callable[..., Any]]],
+        *,
+        max_iterations: int = 10,
+        max_total_tokens: Optional[int] = None,
+        tool_choice: Optional[Union[str, bool, dict]] = None,
+        tool_timeout: Optional[float] = None,
+        max_tool_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        **request_kwargs: Any,
+    ):
+        self.chat = chat
+        self.executor = ToolExecutor(
+            tools, max_workers=max_tool_concurrency, timeout=tool_timeout
+        )
+        self.toolset = Toolset(list(self.executor.tools.values()))
+        self.max_iterations = max_iterations
+        self.max_total_tokens = max_total_tokens
+        self.tool_choice = (
+            _format_tool_choice(tool_choice, list(self.executor.tools))
+            if tool_choice is not None
+            else None
+        )
+        self.request_kwargs = request_kwargs
+
+    def _request(self, wire_messages: List[Dict[str, Any]], iteration: int) -> Dict[str, Any]:
+        data = self.chat._build_request_data(
+            [], None, stream=True, tools=self.toolset.schemas, **self.request_kwargs
+        )
+        # The serialised history is shared between turns; only new messages
+        # are converted.
+        data["messages"] = list(wire_messages)
+        if self.tool_choice is not None and iteration == 0:
+            data["tool_choice"] = self.tool_choice
+        if self.chat.canonical_requests:
+            # Re-apply the layout now that the history and tool_choice are in.
+            data = canonicalize_request(data)
+        return data
+
+    async def _run_tool(self, call: ToolCall, limit: asyncio.Semaphore) -> ToolMessage:
+        async with limit:
+            (message,) = await self.executor.aexecute([call])
+        return message
+
+    async def astream(self, input: LanguageModelInput) -> AsyncIterator[AgentEvent]:
+        """Run the loop, yielding an :class:`AgentEvent` for every step."""
+        messages = list(self.chat._convert_input(input).to_messages())
+        wire_messages = [_convert_message_to_dict(message) for message in messages]
+        usage = UsageMetadata(input_tokens=0, output_tokens=0, total_tokens=0)
+        limit = asyncio.Semaphore(self.executor.max_workers)
+        stop_reason = "max_iterations"
+        output = ""
+        iteration = 0
+
+        while iteration < self.max_iterations:
+            iteration += 1
+            tasks: List["asyncio.Task[ToolMessage]"] = []
+            ready: List[ToolCall] = []
+            accumulator = ToolCallAccumulator(on_tool_call=ready.append)
+            content: List[str] = []
+            turn_usage: Optional[UsageMetadata] = None
+            raw_chunks, _ = self.chat._araw_stream(self._request(wire_messages, iteration - 1))
+            try:
+                async for raw_chunk in raw_chunks:
+                    delta = parse_stream_delta(raw_chunk)
+                    if delta is None:
+                        continue
+                    if delta.index is None:
+                        turn_usage = build_usage_metadata(delta.usage)
+                        for key in ("input_tokens", "output_tokens", "total_tokens"):
+                            usage[key] += turn_usage[key]
+                        continue
+                    if delta.content:
+                        content.append(delta.content)
+                        yield AgentEvent("token", delta.content)
+                    accumulator.add(delta)
+                    for call in ready:
+                        tasks.append(asyncio.ensure_future(self._run_tool(call, limit)))
+                        yield AgentEvent("tool_call", call)
+                    ready.clear()
+                accumulator.finish()
+                for call in ready:
+                    tasks.append(asyncio.ensure_future(self._run_tool(call, limit)))
+                    yield AgentEvent("tool_call", call)
+                tool_messages = list(await asyncio.gather(*tasks))
+            except BaseException as exc:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if isinstance(exc, Exception):
+                    raise self.chat._wrap_error(exc)
+                raise
+            if accumulator.invalid_tool_calls:
+                tool_messages += await self.executor.aexecute(accumulator.invalid_tool_calls)
+
+            output = "".join(content)
+            ai_message = AIMessage(
+                content=output,
+                tool_calls=accumulator.tool_calls,
+                invalid_tool_calls=accumulator.invalid_tool_calls,
+                usage_metadata=turn_usage,
+            )
+            messages.append(ai_message)
+            wire_messages.append(_convert_message_to_dict(ai_message))
+            yield AgentEvent("message", ai_message)
+            for tool_message in tool_messages:
+                messages.append(tool_message)
+                wire_messages.append(_convert_message_to_dict(tool_message))
+                yield AgentEvent("tool_result", tool_message)
+
+            if not tool_messages:
+                stop_reason = "final_answer"
+                break
+            if (
+                self.max_total_tokens is not None
+                and usage["total_tokens"] >= self.max_total_tokens
+            ):
+                stop_reason = "max_tokens"
+                break
+
+        yield AgentEvent(
+            "done", AgentResult(output, messages, iteration, usage, stop_reason)
+        )
+
+    async def arun(self, input: LanguageModelInput) -> AgentResult:
+        """Run the loop to completion and return the :class:`AgentResult`."""
+        result: Optional[AgentResult] = None
+        async for event in self.astream(input):
+            if event.type == "done":
+                result = event.data
+        assert result is not None
+        return result
+
+    async def _arun_and_release(self, input: LanguageModelInput) -> AgentResult:
+        try:
+            return await self.arun(input)
+        finally:
+            # The private loop dies with this call (see chat.batch); other
+            # users of the chat model keep its client.
+            await self.chat.aclose_loop()
+
+    def run(self, input: LanguageModelInput) -> AgentResult:
+        """Blocking wrapper around :meth:`arun`.
+
+        Raises:
+            RuntimeError: If called from a running event loop (use ``arun``)
+        """
+        if has_running_loop():
+            raise RuntimeError(
+                "IOIntelligenceAgent.run() cannot be called from a running event "
+                "loop; use 'await agent.arun(...)' instead."
+            )
+        return asyncio.run(self._arun_and_release(input))
+
+    def close(self) -> None:
+        """Shut down the tool thread pool."""
+        self.executor.close()
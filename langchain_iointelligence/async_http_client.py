@@ -1,19 +1,55 @@
 """Async HTTP client (httpx) with retry logic for io Intelligence API."""
 
 import asyncio
-import json
-from typing import Any, AsyncIterator, Dict, Optional
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
 
 import httpx
 
-from .exceptions import (IOIntelligenceConnectionError, IOIntelligenceError,
+from . import codec
+from .circuit_breaker import CircuitBreaker
+from .concurrency import AdaptiveConcurrencyLimiter, ConcurrencySlot
+from .exceptions import (IOIntelligenceCircuitOpenError,
+                         IOIntelligenceConnectionError, IOIntelligenceError,
                          IOIntelligenceRateLimitError,
                          IOIntelligenceServerError, IOIntelligenceTimeoutError,
                          classify_api_error)
+from .hedging import HedgePolicy
+from .rate_limit import IOIntelligenceRateLimiter
+from .retry import compute_retry_delay, parse_rate_limit_headers
+from .routing import EndpointRouter
+from .sse import aiter_sse_data
+from .timing import RequestTiming, parse_server_timing
+
+# httpx's own pool defaults, restated so they can be tuned per client.
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+
+# Errors after which a routed request moves to another endpoint.
+_FAILOVER_ERRORS = (httpx.TransportError, IOIntelligenceCircuitOpenError)
+
+
+def _is_server_error(response: httpx.Response) -> bool:
+    return response.status_code >= 500
+
+
+def _is_rate_limited(response: httpx.Response) -> bool:
+    return response.status_code == 429
 
 
 class IOIntelligenceAsyncHTTPClient:
-    """Async HTTP client mirroring the sync client's retry/error behaviour."""
+    """Async HTTP client mirroring the sync client's retry/error behaviour.
+
+    With ``http2=True`` concurrent requests are multiplexed as streams over a
+    few connections instead of one socket each (needs the ``h2`` package,
+    ``pip install "langchain-iointelligence[http2]"``). A
+    ``concurrency_limiter`` caps the requests in flight and learns the cap
+    from 429s, timeouts and latency (see :mod:`.concurrency`).
+    """
 
     def __init__(
         self,
@@ -22,65 +58,313 @@ class IOIntelligenceAsyncHTTPClient:
         timeout: int = 30,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        rate_limiter: Optional[IOIntelligenceRateLimiter] = None,
+        http2: bool = False,
+        max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: Optional[int] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY,
+        router: Optional[EndpointRouter] = None,
+        hedge: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
     ):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ImportError(
+                    "http2=True requires the 'h2' package. Install it with "
+                    "`pip install \"langchain-iointelligence[http2]\"`."
+                )
         self.api_key = api_key
         self.api_url = api_url
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.rate_limiter = rate_limiter
+        self.router = router
+        self.hedge = hedge
+        self.circuit_breaker = circuit_breaker
+        self.concurrency_limiter = concurrency_limiter
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
         self._headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
-        self._client: Optional[httpx.AsyncClient] = None
-        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # One httpx client per event loop: a shared instance may be used
+        # from several threads/loops at once, and httpx clients are bound
+        # to the loop that opened their connections.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._clients_lock = threading.Lock()
+
+    @property
+    def _client(self) -> Optional[httpx.AsyncClient]:
+        """The httpx client of the running event loop (None if not created)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        with self._clients_lock:
+            return self._clients.get(loop)
 
     def _get_client(self) -> httpx.AsyncClient:
-        """Return a pooled client bound to the running event loop."""
+        """Return the pooled client bound to the running event loop."""
         loop = asyncio.get_running_loop()
-        if (
-            self._client is None
-            or self._client.is_closed
-            or self._client_loop is not loop
-        ):
-            # A client from a dead/different loop cannot be closed here safely;
-            # drop the reference and let GC handle the sockets.
-            self._client = httpx.AsyncClient(timeout=self.timeout)
-            self._client_loop = loop
-        return self._client
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._clients[loop] = self._build_client()
+        return client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the underlying httpx client with this client's pool settings."""
+        return httpx.AsyncClient(
+            timeout=self.timeout, http2=self.http2, limits=self.limits
+        )
 
     async def aclose(self) -> None:
-        """Close the pooled client (if any)."""
-        if self._client is not None and not self._client.is_closed:
-            await self._client.aclose()
-        self._client = None
-        self._client_loop = None
-
-    async def apost_with_retry(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Async POST with automatic retry on rate-limit/server/network errors."""
+        """Close the pooled clients of every event loop.
+
+        The running loop's client is closed here; clients of other loops
+        that still run are closed on their own loop, and those of closed
+        loops are dropped.
+        """
+        current = asyncio.get_running_loop()
+        with self._clients_lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for loop, client in clients:
+            if client.is_closed:
+                continue
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def aclose_loop(self) -> None:
+        """Close only the pooled client bound to the running event loop.
+
+        Call before a private loop (``asyncio.run``) ends; other loops using
+        this client are unaffected.
+        """
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def _asend(
+        self, model: str, send: Callable[[str], Awaitable[httpx.Response]], url: str
+    ) -> httpx.Response:
+        """Run ``send(url)`` under the circuit breaker, if any."""
+        if self.circuit_breaker is None:
+            return await send(url)
+        with self.circuit_breaker.guard(url, model) as call:
+            response = await send(url)
+            call.record_status(response.status_code)
+        return response
+
+    async def _acquire_slot(self) -> Optional[ConcurrencySlot]:
+        """Wait for the concurrency limiter, if any."""
+        if self.concurrency_limiter is None:
+            return None
+        return await self.concurrency_limiter.acquire()
+
+    async def _apost_limited(
+        self, client: httpx.AsyncClient, body: bytes, model: str, **kwargs: Any
+    ) -> httpx.Response:
+        """:meth:`_apost` holding a concurrency slot, reporting its outcome."""
+        slot = await self._acquire_slot()
+        if slot is None:
+            return await self._apost(client, body, model, **kwargs)
+        with slot:
+            try:
+                response = await self._apost(client, body, model, **kwargs)
+            except httpx.TimeoutException:
+                slot.observe_overload()
+                raise
+            slot.observe(response.status_code)
+        return response
+
+    async def _apost(
+        self, client: httpx.AsyncClient, body: bytes, model: str, **kwargs: Any
+    ) -> httpx.Response:
+        """POST ``body`` to the API, failing over between routed endpoints."""
+
+        def _post(url: str) -> Awaitable[httpx.Response]:
+            return client.post(url, headers=self._headers, content=body, **kwargs)
+
+        if self.router is None:
+            return await self._asend(model, _post, self.api_url)
+        return await self.router.acall(
+            lambda url: self._asend(model, _post, url),
+            is_failure=_is_server_error,
+            errors=_FAILOVER_ERRORS,
+            is_throttled=_is_rate_limited,
+        )
+
+    async def _aopen_stream(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        body: bytes,
+        model: str,
+    ) -> httpx.Response:
+        """Send a streaming request; the caller must ``aclose()`` the response."""
+
+        def _send(url: str) -> Awaitable[httpx.Response]:
+            request = client.build_request("POST", url, headers=headers, content=body)
+            return client.send(request, stream=True)
+
+        if self.router is None:
+            return await self._asend(model, _send, self.api_url)
+        return await self.router.acall(
+            lambda url: self._asend(model, _send, url),
+            is_failure=_is_server_error,
+            errors=_FAILOVER_ERRORS,
+            is_throttled=_is_rate_limited,
+            discard=httpx.Response.aclose,
+        )
+
+    async def apost_with_retry(
+        self,
+        data: Dict[str, Any],
+        timing: Optional[RequestTiming] = None,
+        max_retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Async POST with automatic retry on rate-limit/server/network errors.
+
+        ``timing`` additionally receives the connect/TLS times of new
+        connections (httpx ``trace`` extension). ``max_retries`` overrides
+        the client's setting for this call. With a ``hedge`` policy a slow
+        request is raced against a duplicate (see :mod:`.hedging`); when a
+        duplicate sent to the policy's ``fallback_model`` wins,
+        ``timing.served_model`` names that model.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        if self.hedge is not None:
+            return await self._ahedged_post(data, timing, self.hedge, max_retries)
+        return await self._apost_with_retry(data, timing, max_retries)
+
+    async def _ahedged_post(
+        self,
+        data: Dict[str, Any],
+        timing: Optional[RequestTiming],
+        policy: HedgePolicy,
+        max_retries: int,
+    ) -> Dict[str, Any]:
+        """Run the request, hedging it once the policy's delay has passed."""
+        policy.on_request()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(
+            self._apost_with_retry(data, timing, max_retries)
+        )
+        tasks = [primary]
+        try:
+            delay = policy.hedge_delay()
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and policy.try_hedge():
+                    tasks.append(
+                        asyncio.ensure_future(
+                            self._apost_with_retry(
+                                policy.hedge_request(data), None, max_retries
+                            )
+                        )
+                    )
+            pending = set(tasks)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Prefer the primary's outcome when both finish together.
+                for task in sorted(done, key=lambda task: task is not primary):
+                    error = task.exception()
+                    if error is None:
+                        hedge_won = task is not primary
+                        policy.record(time.perf_counter() - started, hedge_won)
+                        if timing is not None and hedge_won:
+                            timing.hedged = True
+                            if policy.fallback_model is not None:
+                                timing.served_model = policy.fallback_model
+                        return task.result()
+                    first_error = first_error or error
+            assert first_error is not None
+            raise first_error
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    async def _apost_with_retry(
+        self,
+        data: Dict[str, Any],
+        timing: Optional[RequestTiming],
+        max_retries: int,
+    ) -> Dict[str, Any]:
         last_exception: Optional[IOIntelligenceError] = None
+        trace = {"extensions": {"trace": timing.trace}} if timing is not None else {}
 
-        for attempt in range(self.max_retries + 1):
+        for attempt in range(max_retries + 1):
+            reserved_tokens = (
+                await self.rate_limiter.aacquire(data) if self.rate_limiter else 0
+            )
+            settled = False
+            if timing is not None:
+                timing.retries = attempt
             try:
                 client = self._get_client()
-                response = await client.post(
-                    self.api_url, headers=self._headers, json=data
+                response = await self._apost_limited(
+                    client, codec.dumps(data), str(data.get("model", "")), **trace
                 )
 
                 if response.status_code >= 400:
-                    error = classify_api_error(response.status_code, response.text)
+                    error = classify_api_error(
+                        response.status_code, response.text, response.headers
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.observe(
+                            str(data.get("model", "")), error.rate_limit
+                        )
                     if isinstance(
                         error,
                         (IOIntelligenceRateLimitError, IOIntelligenceServerError),
-                    ) and attempt < self.max_retries:
-                        delay = self.retry_delay * (2**attempt)
-                        if isinstance(error, IOIntelligenceRateLimitError):
-                            delay = max(delay, 60)
-                        await asyncio.sleep(delay)
+                    ) and attempt < max_retries:
+                        await asyncio.sleep(
+                            compute_retry_delay(
+                                attempt,
+                                self.retry_delay,
+                                error.rate_limit,
+                                is_rate_limit=isinstance(
+                                    error, IOIntelligenceRateLimitError
+                                ),
+                            )
+                        )
                         continue
                     raise error
 
-                result: Dict[str, Any] = response.json()
+                result: Dict[str, Any] = codec.loads(response.content)
+                if self.rate_limiter:
+                    self.rate_limiter.observe(
+                        str(data.get("model", "")),
+                        parse_rate_limit_headers(response.headers),
+                    )
+                    self.rate_limiter.record_usage(data, reserved_tokens, result)
+                    settled = True
+                if timing is not None:
+                    timing.server = parse_server_timing(response.headers, result.get("usage"))
+                    timing.finish()
                 return result
 
             except IOIntelligenceError:
@@ -92,50 +376,89 @@ class IOIntelligenceAsyncHTTPClient:
                 last_exception = IOIntelligenceTimeoutError(
                     f"Request timeout after {self.timeout} seconds"
                 )
-                if attempt < self.max_retries:
-                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                if attempt < max_retries:
+                    await asyncio.sleep(compute_retry_delay(attempt, self.retry_delay))
                     continue
             except httpx.HTTPError as exc:
                 last_exception = IOIntelligenceConnectionError(
                     f"Connection error: {str(exc)}"
                 )
-                if attempt < self.max_retries:
-                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                if attempt < max_retries:
+                    await asyncio.sleep(compute_retry_delay(attempt, self.retry_delay))
                     continue
             except ValueError as exc:  # JSON decode error - don't retry
                 last_exception = IOIntelligenceError(
                     f"Invalid JSON response: {str(exc)}"
                 )
                 break
+            finally:
+                # A failed attempt spent no tokens; the next one reserves anew.
+                if self.rate_limiter and not settled:
+                    self.rate_limiter.refund(data, reserved_tokens)
 
         raise last_exception or IOIntelligenceError("All retry attempts failed")
 
     async def astream(self, data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """Async stream of parsed SSE chunk dicts from the chat endpoint."""
         headers = {**self._headers, "Accept": "text/event-stream"}
+        model = str(data.get("model", ""))
+        reserved_tokens = 0
+        streaming = False
+        slot: Optional[ConcurrencySlot] = None
         try:
+            # Acquired inside the try so a cancelled wait still refunds.
+            if self.rate_limiter:
+                reserved_tokens = await self.rate_limiter.aacquire(data)
+            # The slot is held until the stream ends: generation is the load.
+            slot = await self._acquire_slot()
             client = self._get_client()
-            async with client.stream(
-                "POST", self.api_url, headers=headers, json=data
-            ) as response:
+            try:
+                response = await self._aopen_stream(
+                    client, headers, codec.dumps(data), model
+                )
+            except httpx.TimeoutException:
+                if slot is not None:
+                    slot.observe_overload()
+                raise
+            if slot is not None:
+                slot.observe(response.status_code)
+            try:
                 if response.status_code >= 400:
                     body = await response.aread()
                     text = body.decode() if isinstance(body, bytes) else str(body)
-                    raise classify_api_error(response.status_code, text)
+                    error = classify_api_error(
+                        response.status_code, text, response.headers
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.observe(model, error.rate_limit)
+                    raise error
 
-                async for line in response.aiter_lines():
-                    if not line or not line.startswith("data: "):
-                        continue
-                    payload = line[6:].strip()
-                    if payload == "[DONE]":
-                        break
+                if self.rate_limiter:
+                    self.rate_limiter.observe(
+                        model, parse_rate_limit_headers(response.headers)
+                    )
+                streaming = True
+                usage_chunk: Optional[Dict[str, Any]] = None
+                async for payload in aiter_sse_data(response.aiter_bytes()):
                     try:
-                        yield json.loads(payload)
-                    except json.JSONDecodeError:
+                        chunk = codec.loads(payload)
+                    except ValueError:
                         continue
+                    if isinstance(chunk, dict) and chunk.get("usage"):
+                        usage_chunk = chunk
+                    yield chunk
+                if self.rate_limiter and usage_chunk is not None:
+                    self.rate_limiter.record_usage(data, reserved_tokens, usage_chunk)
+            finally:
+                await response.aclose()
         except httpx.TimeoutException:
             raise IOIntelligenceTimeoutError(
                 f"Request timeout after {self.timeout} seconds"
             )
         except httpx.HTTPError as exc:
             raise IOIntelligenceConnectionError(f"Connection error: {str(exc)}")
+        finally:
+            if slot is not None:
+                slot.release()
+            if self.rate_limiter and not streaming:
+                self.rate_limiter.refund(data, reserved_tokens)
@@ -0,0 +1,77 @@
+"""Bounded-concurrency batch engine for io Intelligence chat models.
+
+``Runnable.batch`` spins up one executor thread per input and sends every
+request through the blocking HTTP client, with no shared backpressure. The
+helpers here instead fan a batch out over the pooled async client with a
+fixed number of workers, so at most ``max_concurrency`` requests are in
+flight at any time while results keep their input order.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Used when neither the RunnableConfig nor the model sets a limit.
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+async def agather_bounded(
+    factories: Sequence[Callable[[], Awaitable[T]]],
+    max_concurrency: Optional[int] = None,
+    *,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """Await ``factories`` with at most ``max_concurrency`` running at once.
+
+    Coroutines are created lazily by a fixed pool of workers, so a 10k item
+    batch never holds more than ``max_concurrency`` pending requests.
+
+    Args:
+        factories: Zero-argument callables returning the awaitable for each item.
+        max_concurrency: Maximum number of awaitables in flight (``None`` or
+            ``<= 0`` means :data:`DEFAULT_BATCH_CONCURRENCY`).
+        return_exceptions: When True, an item's exception is stored in its
+            result slot and the remaining items keep running. When False, the
+            first exception cancels outstanding work and is re-raised.
+
+    Returns:
+        Results (or exceptions) in the same order as ``factories``.
+    """
+    total = len(factories)
+    if total == 0:
+        return []
+    limit = max_concurrency if max_concurrency and max_concurrency > 0 else DEFAULT_BATCH_CONCURRENCY
+    results: List[Any] = [None] * total
+    next_index = 0
+
+    async def _worker() -> None:
+        nonlocal next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            try:
+                results[index] = await factories[index]()
+            except Exception as exc:  # noqa: BLE001 - reported per item
+                if not return_exceptions:
+                    raise
+                results[index] = exc
+
+    workers = [asyncio.ensure_future(_worker()) for _ in range(min(limit, total))]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+    return results
+
+
+def has_running_loop() -> bool:
+    """Return True if the current thread is already running an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
@@ -0,0 +1,289 @@
+"""Opt-in response caching for io Intelligence chat requests.
+
+Responses are cached as the raw API JSON, keyed on a canonical hash of the
+request payload built by ``IOIntelligenceChatModel._build_request_data``,
+so a cache hit rebuilds exactly the ``AIMessage`` (content, tool calls,
+usage) the live call produced.
+
+Three stores are provided:
+
+* :class:`InMemoryResponseCache` - a thread-safe LRU with optional TTL;
+* :class:`SQLiteResponseCache` - a persistent on-disk store;
+* :class:`TieredResponseCache` - memory in front of disk, promoting disk hits.
+
+Streamed responses are stored as a *stream recording*: the raw SSE chunk
+dicts in arrival order plus each chunk's offset from the start of the
+stream (see :class:`StreamRecorder`). Replaying a recording feeds the same
+chunk builder as a live stream, with no network I/O.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (Any, AsyncIterator, Callable, Dict, Iterator, List,
+                    Optional, Tuple)
+
+STREAM_RECORDING_OBJECT = "stream.recording"
+
+
+def request_cache_key(data: Dict[str, Any]) -> str:
+    """Return a stable SHA-256 key for a request payload.
+
+    Keys are sorted and whitespace removed, so two payloads that differ only
+    in dict ordering share a key.
+    """
+    canonical = json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StreamRecorder:
+    """Collect the raw chunk dicts of a live stream for later replay."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._started = clock()
+        self.chunks: List[Dict[str, Any]] = []
+        self.offsets: List[float] = []
+
+    def record(self, chunk: Dict[str, Any]) -> None:
+        """Append ``chunk`` with its offset (seconds) from the stream start."""
+        self.chunks.append(chunk)
+        self.offsets.append(round(self._clock() - self._started, 6))
+
+    def to_cache_value(self) -> Dict[str, Any]:
+        """Return the JSON-serialisable recording stored in the cache."""
+        return {
+            "object": STREAM_RECORDING_OBJECT,
+            "chunks": self.chunks,
+            "offsets": self.offsets,
+        }
+
+
+def is_stream_recording(value: Any) -> bool:
+    """Return True if ``value`` is a recording made by :class:`StreamRecorder`."""
+    return (
+        isinstance(value, dict)
+        and value.get("object") == STREAM_RECORDING_OBJECT
+        and isinstance(value.get("chunks"), list)
+    )
+
+
+def _replay_delays(recording: Dict[str, Any]) -> List[float]:
+    """Return the pause before each recorded chunk (never negative)."""
+    offsets = recording.get("offsets") or []
+    delays: List[float] = []
+    previous = 0.0
+    for index in range(len(recording["chunks"])):
+        offset = offsets[index] if index < len(offsets) else previous
+        delays.append(max(0.0, offset - previous))
+        previous = max(previous, offset)
+    return delays
+
+
+def replay_stream(
+    recording: Dict[str, Any],
+    realtime: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the recorded chunk dicts, optionally at their original pace."""
+    delays = _replay_delays(recording) if realtime else None
+    for index, chunk in enumerate(recording["chunks"]):
+        if delays and delays[index] > 0:
+            sleep(delays[index])
+        yield chunk
+
+
+async def areplay_stream(
+    recording: Dict[str, Any], realtime: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of :func:`replay_stream`."""
+    delays = _replay_delays(recording) if realtime else None
+    for index, chunk in enumerate(recording["chunks"]):
+        if delays and delays[index] > 0:
+            await asyncio.sleep(delays[index])
+        yield chunk
+
+
+class BaseResponseCache(ABC):
+    """Interface for response caches: ``get``/``set`` raw JSON by key.
+
+    Callers may mutate what ``get`` returns, so a store that keeps Python
+    objects must hand out copies rather than its own entries.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None`` on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` (JSON-serialisable) under ``key``."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+
+class InMemoryResponseCache(BaseResponseCache):
+    """Thread-safe LRU cache with an optional time-to-live.
+
+    Values are deep-copied on the way in and out, so a caller mutating a
+    returned response (or the one it stored) cannot change the entry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently used
+                one is evicted
+            ttl: Seconds an entry stays valid (None = until evicted)
+            clock: Monotonic clock, injectable for tests
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and self._clock() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(BaseResponseCache):
+    """Persistent cache backed by a single SQLite file."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file (parent directories are created)
+            ttl: Seconds an entry stays valid (None = forever)
+            clock: Wall clock, injectable for tests
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and self._clock() - created > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, encoded, self._clock()),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        if self.ttl is None:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (self._clock() - self.ttl,)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+class TieredResponseCache(BaseResponseCache):
+    """An in-memory LRU in front of a persistent store.
+
+    Reads try memory first and promote disk hits; writes go to both tiers.
+    """
+
+    def __init__(self, memory: BaseResponseCache, disk: BaseResponseCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
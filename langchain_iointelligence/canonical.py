@@ -0,0 +1,72 @@
+"""Canonical request layout for server-side prompt-prefix caching.
+
+Inference servers with prefix (KV) caching reuse the prefill of a prompt
+whose leading tokens match an earlier request. Tools and system prompts
+render first in the prompt, so they only hit that cache if they are
+byte-for-byte identical between calls. :func:`canonicalize_request`
+makes them so:
+
+* tool schemas are ordered by name and their keys sorted recursively;
+* system messages are moved to the front of the conversation (their
+  relative order is kept);
+* the body is laid out as ``model``, ``tools``, ``tool_choice``,
+  ``messages`` and then the remaining fields in sorted order, so the
+  stable part of the JSON comes first.
+
+:func:`cacheable_prefix` reports the size of that stable part.
+"""
+
+from typing import Any, Dict, List
+
+from . import codec
+from .rate_limit import _CHARS_PER_TOKEN
+
+_LEADING_KEYS = ("model", "tools", "tool_choice", "messages")
+
+
+def _sorted_keys(value: Any) -> Any:
+    """Return ``value`` with every dict's keys sorted (list order kept)."""
+    if isinstance(value, dict):
+        return {key: _sorted_keys(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [_sorted_keys(item) for item in value]
+    return value
+
+
+def _tool_name(tool: Dict[str, Any]) -> str:
+    return str((tool.get("function") or tool).get("name", ""))
+
+
+def canonicalize_request(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of ``data`` laid out for maximal prefix reuse."""
+    canonical: Dict[str, Any] = {}
+    if "model" in data:
+        canonical["model"] = data["model"]
+    if data.get("tools"):
+        canonical["tools"] = [
+            _sorted_keys(tool) for tool in sorted(data["tools"], key=_tool_name)
+        ]
+    if "tool_choice" in data:
+        canonical["tool_choice"] = _sorted_keys(data["tool_choice"])
+    messages: List[Dict[str, Any]] = list(data.get("messages") or [])
+    canonical["messages"] = [m for m in messages if m.get("role") == "system"] + [
+        m for m in messages if m.get("role") != "system"
+    ]
+    for key in sorted(data):
+        if key not in _LEADING_KEYS:
+            canonical[key] = data[key]
+    return canonical
+
+
+def cacheable_prefix(data: Dict[str, Any]) -> Dict[str, int]:
+    """Size of the part of ``data`` that repeats across calls.
+
+    Counts the tool schemas and the leading system messages - what renders
+    first in the prompt - as encoded bytes and as a rough token estimate.
+    """
+    size = len(codec.dumps(data["tools"])) if data.get("tools") else 0
+    for message in data.get("messages") or []:
+        if message.get("role") != "system":
+            break
+        size += len(codec.dumps(message))
+    return {"bytes": size, "estimated_tokens": size // _CHARS_PER_TOKEN}
@@ -1,20 +1,21 @@
 """Enhanced IOIntelligenceChatModel implementation for LangChain."""
 
+import asyncio
 import json
 import os
 from operator import itemgetter
 from typing import (Any, AsyncIterator, Callable, Dict, Iterator, List,
-                    Literal, Mapping, Optional, Sequence, Type, Union, cast)
+                    Literal, Mapping, Optional, Sequence, Tuple, Type, Union,
+                    cast)
 
 from dotenv import load_dotenv
 from langchain_core.callbacks.manager import (AsyncCallbackManagerForLLMRun,
                                               CallbackManagerForLLMRun)
 from langchain_core.language_models import LanguageModelInput
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import (AIMessage, BaseMessage, HumanMessage,
-                                     InvalidToolCall, SystemMessage,
-                                     ToolCall, ToolMessage)
-from langchain_core.messages.ai import UsageMetadata
+from langchain_core.messages import (AIMessage, AIMessageChunk, BaseMessage,
+                                     HumanMessage, InvalidToolCall,
+                                     SystemMessage, ToolCall, ToolMessage)
 from langchain_core.output_parsers import (JsonOutputParser,
                                            PydanticOutputParser)
 from langchain_core.output_parsers.openai_tools import (
@@ -22,16 +23,38 @@ from langchain_core.output_parsers.openai_tools import (
     parse_tool_call)
 from langchain_core.outputs import (ChatGeneration, ChatGenerationChunk,
                                     ChatResult)
-from langchain_core.runnables import Runnable, RunnableMap, RunnablePassthrough
+from langchain_core.runnables import (Runnable, RunnableConfig, RunnableMap,
+                                      RunnablePassthrough)
+from langchain_core.runnables.config import get_config_list
 from langchain_core.tools import BaseTool
-from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_core.utils.pydantic import is_basemodel_subclass
 from pydantic import BaseModel
 
-from .async_http_client import IOIntelligenceAsyncHTTPClient
+from .async_http_client import (DEFAULT_KEEPALIVE_EXPIRY,
+                                DEFAULT_MAX_CONNECTIONS,
+                                DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                                IOIntelligenceAsyncHTTPClient)
+from .batch import (DEFAULT_BATCH_CONCURRENCY, agather_bounded,
+                    has_running_loop)
+from .cache import (BaseResponseCache, StreamRecorder, areplay_stream,
+                    is_stream_recording, replay_stream, request_cache_key)
+from .canonical import cacheable_prefix, canonicalize_request
+from .circuit_breaker import CircuitBreaker
+from .client_pool import get_client_pool
+from .concurrency import AdaptiveConcurrencyLimiter
 from .exceptions import IOIntelligenceError, IOIntelligenceInvalidResponseError
-from .http_client import IOIntelligenceHTTPClient
-from .streaming import IOIntelligenceStreamer, build_generation_chunk
+from .fallback import FALLBACK_ERRORS, ModelFallbackChain, known_models
+from .hedging import HedgePolicy
+from .http_client import DEFAULT_POOL_MAXSIZE, IOIntelligenceHTTPClient
+from .message_cache import MessageSerializationCache
+from .rate_limit import IOIntelligenceRateLimiter, get_rate_limiter
+from .resume import aresumable_stream, resumable_stream
+from .routing import EndpointRouter, resolve_api_url
+from .streaming import (IOIntelligenceStreamer, StreamDelta,
+                        build_generation_chunk, parse_stream_delta)
+from .timing import RequestTiming
+from .tool_schemas import Toolset, get_openai_tool_schema
+from .usage import build_usage_metadata
 from .utils import IOIntelligenceUtils
 
 # Load environment variables from .env file
@@ -131,6 +154,28 @@ class IOIntelligenceChatModel(BaseChatModel):
     max_retries: int = 3
     retry_delay: float = 1.0
     streaming: bool = False
+    batch_max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    response_cache: Optional[BaseResponseCache] = None
+    cache_nondeterministic: bool = False
+    stream_replay_timing: bool = False
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    stream_resume: Optional[Literal["continue", "restart"]] = None
+    max_stream_resumes: int = 2
+    http2: bool = False
+    max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: Optional[int] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY
+    share_clients: bool = False
+    message_cache: Optional[MessageSerializationCache] = None
+    canonical_requests: bool = False
+    endpoints: Optional[Union[List[str], EndpointRouter]] = None
+    hedge_policy: Optional[HedgePolicy] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    fallback_models: Optional[List[str]] = None
+    fallback_cooldown: float = 30.0
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
 
     def __init__(
         self,
@@ -144,6 +189,28 @@ class IOIntelligenceChatModel(BaseChatModel):
         max_retries: int = 3,
         retry_delay: float = 1.0,
         streaming: bool = False,
+        batch_max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        response_cache: Optional[BaseResponseCache] = None,
+        cache_nondeterministic: bool = False,
+        stream_replay_timing: bool = False,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        stream_resume: Optional[Literal["continue", "restart"]] = None,
+        max_stream_resumes: int = 2,
+        http2: bool = False,
+        max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: Optional[int] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY,
+        share_clients: bool = False,
+        message_cache: Optional[MessageSerializationCache] = None,
+        canonical_requests: bool = False,
+        endpoints: Optional[Union[List[str], EndpointRouter]] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        fallback_models: Optional[List[str]] = None,
+        fallback_cooldown: float = 30.0,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
         **kwargs,
     ):
         """Initialize IOIntelligenceChatModel.
@@ -159,6 +226,74 @@ class IOIntelligenceChatModel(BaseChatModel):
             max_retries: Maximum number of retries (default: 3)
             retry_delay: Initial retry delay in seconds (default: 1.0)
             streaming: Enable streaming responses (default: False)
+            batch_max_concurrency: Maximum requests in flight for ``batch()`` /
+                ``abatch()`` when the config sets no ``max_concurrency`` (default: 8)
+            requests_per_minute: Client-side request budget per model, shared by
+                every client using the same API key (default: None, unlimited)
+            tokens_per_minute: Client-side token budget per model (default: None)
+            response_cache: Opt-in cache of raw API responses keyed on the
+                request payload (default: None, no caching)
+            cache_nondeterministic: Also cache requests with temperature > 0
+                (default: False, only temperature=0 requests are cached)
+            stream_replay_timing: Replay cached streams with their original
+                inter-chunk timing (default: False, replay at memory speed)
+            pool_maxsize: Keep-alive connections pooled by the sync session,
+                which is shared by regular and streaming requests (default: 10)
+            stream_resume: Resume streams that drop mid-generation, either by
+                asking the server to ``"continue"`` the partial answer or by
+                ``"restart"``-ing and skipping already-emitted text; a
+                restart needs deterministic sampling (temperature=0 or a
+                seed) and raises if the replay diverges (default: None, a
+                dropped stream raises)
+            max_stream_resumes: Resumes allowed per stream (default: 2)
+            http2: Multiplex async requests over HTTP/2 (default: False;
+                requires the ``h2`` package)
+            max_connections: Async pool connection limit (default: 100)
+            max_keepalive_connections: Idle async connections kept open
+                (default: 20)
+            keepalive_expiry: Seconds an idle async connection is kept
+                (default: 5.0)
+            share_clients: Take HTTP clients from the process-wide
+                :class:`IOIntelligenceClientPool`, sharing connection pools
+                with every model that has the same URL, key and transport
+                settings (default: False, one set of clients per instance)
+            message_cache: Convert each message object to the wire format
+                once and reuse the result on later requests, so a growing
+                conversation only serialises its new turns; messages must
+                not be mutated after they were sent (default: None)
+            canonical_requests: Lay requests out so tools and system prompts
+                form a byte-identical prefix across calls (tools sorted by
+                name, keys sorted, system messages first), for server-side
+                prefix caching; results report the prefix size in
+                ``response_metadata["cacheable_prefix"]`` (default: False)
+            endpoints: Several API URLs (or base URLs) to spread requests
+                over, e.g. regions or self-hosted gateways; each request
+                goes to the endpoint with the lowest latency x load and
+                fails over to another on connection errors, timeouts and
+                5xx. Pass an :class:`EndpointRouter` to tune health
+                tracking (default: None, ``api_url`` only)
+            hedge_policy: Race slow async (non-streaming) requests against a
+                duplicate sent after the policy's delay, taking the first
+                success; with ``endpoints`` the duplicate usually goes to
+                another endpoint (default: None, no hedging)
+            circuit_breaker: Fail fast with
+                :class:`IOIntelligenceCircuitOpenError` while recent requests
+                to an endpoint/model mostly failed, instead of retrying;
+                share one instance between models to trip them together
+                (default: None)
+            fallback_models: Models to switch to, in order, as soon as the
+                requested one answers with a rate limit, 5xx or timeout
+                (non-streaming calls); checked against the model catalog on
+                first use. ``response_metadata["fallback_from"]`` names the
+                requested model when another one served (default: None)
+            fallback_cooldown: Seconds a failed model is tried last, unless
+                its 429 named a ``Retry-After`` (default: 30.0)
+            concurrency_limiter: Cap async requests and streams in flight,
+                growing the cap while responses are healthy and halving it
+                on 429/503, timeouts or rising latency; ``batch()`` /
+                ``abatch()`` then run up to its ``max_limit`` workers and let
+                it decide. Share one instance between models to pool the
+                learned capacity (default: None, no limit)
         """
         # Extract and set API credentials
         api_key = api_key or os.getenv("IO_API_KEY")
@@ -166,12 +301,13 @@ class IOIntelligenceChatModel(BaseChatModel):
         # Handle base_url vs api_url
         if base_url and not api_url:
             # Auto-detect and append endpoint if needed
-            if base_url.endswith('/chat/completions'):
-                api_url = base_url
-            elif base_url.endswith('/v1'):
-                api_url = f"{base_url}/chat/completions"
-            else:
-                api_url = f"{base_url}/v1/chat/completions"
+            api_url = resolve_api_url(base_url)
+        elif endpoints and not api_url:
+            api_url = (
+                endpoints.urls[0]
+                if isinstance(endpoints, EndpointRouter)
+                else resolve_api_url(endpoints[0])
+            )
         else:
             api_url = api_url or os.getenv("IO_API_URL")
 
@@ -196,6 +332,28 @@ class IOIntelligenceChatModel(BaseChatModel):
                 "max_retries": max_retries,
                 "retry_delay": retry_delay,
                 "streaming": streaming,
+                "batch_max_concurrency": batch_max_concurrency,
+                "requests_per_minute": requests_per_minute,
+                "tokens_per_minute": tokens_per_minute,
+                "response_cache": response_cache,
+                "cache_nondeterministic": cache_nondeterministic,
+                "stream_replay_timing": stream_replay_timing,
+                "pool_maxsize": pool_maxsize,
+                "stream_resume": stream_resume,
+                "max_stream_resumes": max_stream_resumes,
+                "http2": http2,
+                "max_connections": max_connections,
+                "max_keepalive_connections": max_keepalive_connections,
+                "keepalive_expiry": keepalive_expiry,
+                "share_clients": share_clients,
+                "message_cache": message_cache,
+                "canonical_requests": canonical_requests,
+                "endpoints": endpoints,
+                "hedge_policy": hedge_policy,
+                "circuit_breaker": circuit_breaker,
+                "fallback_models": fallback_models,
+                "fallback_cooldown": fallback_cooldown,
+                "concurrency_limiter": concurrency_limiter,
             }
         )
 
@@ -206,22 +364,84 @@ class IOIntelligenceChatModel(BaseChatModel):
         self._async_http_client: Optional[Any] = None
         self._streamer: Optional[Any] = None
         self._utils: Optional[Any] = None
+        self._router: Optional[EndpointRouter] = None
+        self._fallbacks: Optional[ModelFallbackChain] = None
 
     @property
     def _llm_type(self) -> str:
         """Return identifier of LLM type."""
         return "io_intelligence_chat"
 
+    @property
+    def io_rate_limiter(self) -> Optional[IOIntelligenceRateLimiter]:
+        """Shared client-side rate limiter for this API key (None if unlimited)."""
+        return get_rate_limiter(
+            self.io_api_key, self.requests_per_minute, self.tokens_per_minute
+        )
+
+    def _transport_settings(self) -> Dict[str, Any]:
+        """Settings that decide whether two models can share a client."""
+        settings = {
+            "api_key": self.io_api_key,
+            "api_url": self.io_api_url,
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+            "retry_delay": self.retry_delay,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "pool_maxsize": self.pool_maxsize,
+        }
+        if self.circuit_breaker is not None:
+            settings["circuit_breaker"] = id(self.circuit_breaker)
+        if self.endpoints:
+            # Routed clients only share with models routing the same way.
+            settings["endpoints"] = (
+                id(self.endpoints)
+                if isinstance(self.endpoints, EndpointRouter)
+                else tuple(self.endpoints)
+            )
+        return settings
+
+    @property
+    def endpoint_router(self) -> Optional[EndpointRouter]:
+        """Router over ``endpoints`` shared by this model's clients (None if unset)."""
+        if self._router is None and self.endpoints:
+            if isinstance(self.endpoints, EndpointRouter):
+                self._router = self.endpoints
+            else:
+                urls = list(self.endpoints)
+                self._router = self._get_or_share(
+                    "router", lambda: EndpointRouter(urls)
+                )
+        return self._router
+
+    def _get_or_share(
+        self, kind: str, factory: Callable[[], Any], **extra_settings: Any
+    ) -> Any:
+        """Build a client, or fetch the shared one when ``share_clients`` is set."""
+        if not self.share_clients:
+            return factory()
+        settings = {**self._transport_settings(), **extra_settings}
+        return get_client_pool().get(kind, settings, factory)
+
     @property
     def http_client(self):
         """Get or create HTTP client."""
         if self._http_client is None:
-            self._http_client = IOIntelligenceHTTPClient(
-                api_key=self.io_api_key,
-                api_url=self.io_api_url,
-                timeout=self.timeout,
-                max_retries=self.max_retries,
-                retry_delay=self.retry_delay,
+            router = self.endpoint_router
+            self._http_client = self._get_or_share(
+                "http",
+                lambda: IOIntelligenceHTTPClient(
+                    api_key=self.io_api_key,
+                    api_url=self.io_api_url,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                    retry_delay=self.retry_delay,
+                    rate_limiter=self.io_rate_limiter,
+                    pool_maxsize=self.pool_maxsize,
+                    router=router,
+                    circuit_breaker=self.circuit_breaker,
+                ),
             )
         return self._http_client
 
@@ -229,21 +449,55 @@ class IOIntelligenceChatModel(BaseChatModel):
     def async_http_client(self):
         """Get or create the async HTTP client."""
         if self._async_http_client is None:
-            self._async_http_client = IOIntelligenceAsyncHTTPClient(
-                api_key=self.io_api_key,
-                api_url=self.io_api_url,
-                timeout=self.timeout,
-                max_retries=self.max_retries,
-                retry_delay=self.retry_delay,
+            router = self.endpoint_router
+            self._async_http_client = self._get_or_share(
+                "async",
+                lambda: IOIntelligenceAsyncHTTPClient(
+                    api_key=self.io_api_key,
+                    api_url=self.io_api_url,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                    retry_delay=self.retry_delay,
+                    rate_limiter=self.io_rate_limiter,
+                    http2=self.http2,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                    router=router,
+                    hedge=self.hedge_policy,
+                    circuit_breaker=self.circuit_breaker,
+                    concurrency_limiter=self.concurrency_limiter,
+                ),
+                http2=self.http2,
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+                hedge_policy=id(self.hedge_policy) if self.hedge_policy else None,
+                concurrency_limiter=(
+                    id(self.concurrency_limiter) if self.concurrency_limiter else None
+                ),
             )
         return self._async_http_client
 
     @property
     def streamer(self):
-        """Get or create streaming client."""
+        """Get or create streaming client (sharing the sync HTTP session)."""
         if self._streamer is None:
-            self._streamer = IOIntelligenceStreamer(
-                api_key=self.io_api_key, api_url=self.io_api_url, timeout=self.timeout
+            session = self.http_client.session
+            router = self.endpoint_router
+            self._streamer = self._get_or_share(
+                "streamer",
+                lambda: IOIntelligenceStreamer(
+                    api_key=self.io_api_key,
+                    api_url=self.io_api_url,
+                    timeout=self.timeout,
+                    rate_limiter=self.io_rate_limiter,
+                    max_retries=self.max_retries,
+                    retry_delay=self.retry_delay,
+                    session=session,
+                    router=router,
+                    circuit_breaker=self.circuit_breaker,
+                ),
             )
         return self._streamer
 
@@ -251,8 +505,13 @@ class IOIntelligenceChatModel(BaseChatModel):
     def utils(self):
         """Get or create utilities client."""
         if self._utils is None:
-            self._utils = IOIntelligenceUtils(
-                api_key=self.io_api_key, api_url=self.io_api_url, timeout=self.timeout
+            self._utils = self._get_or_share(
+                "utils",
+                lambda: IOIntelligenceUtils(
+                    api_key=self.io_api_key,
+                    api_url=self.io_api_url,
+                    timeout=self.timeout,
+                ),
             )
         return self._utils
 
@@ -265,6 +524,8 @@ class IOIntelligenceChatModel(BaseChatModel):
         tool results, so multi-turn tool-calling conversations round-trip
         correctly.
         """
+        if self.message_cache is not None:
+            return self.message_cache.convert_all(messages)
         return [_convert_message_to_dict(message) for message in messages]
 
     def _build_request_data(
@@ -289,6 +550,8 @@ class IOIntelligenceChatModel(BaseChatModel):
             # Ask for token usage in the final SSE chunk (caller may override).
             data.setdefault("stream_options", {"include_usage": True})
         data.update(kwargs)
+        if self.canonical_requests:
+            data = canonicalize_request(data)
         return data
 
     def _invalid_response_error(self, message: str) -> Exception:
@@ -326,11 +589,7 @@ class IOIntelligenceChatModel(BaseChatModel):
             )
 
         raw_usage = response_data.get("usage") or {}
-        usage_metadata = UsageMetadata(
-            input_tokens=raw_usage.get("prompt_tokens", 0),
-            output_tokens=raw_usage.get("completion_tokens", 0),
-            total_tokens=raw_usage.get("total_tokens", 0),
-        )
+        usage_metadata = build_usage_metadata(raw_usage)
 
         message = AIMessage(
             content=content,
@@ -365,6 +624,164 @@ class IOIntelligenceChatModel(BaseChatModel):
             },
         )
 
+    def _response_cache_key(self, data: Dict[str, Any]) -> Optional[str]:
+        """Return the cache key for ``data``, or None if it must not be cached."""
+        if self.response_cache is None:
+            return None
+        if not self.cache_nondeterministic and data.get("temperature") != 0:
+            return None
+        return request_cache_key(data)
+
+    def _cached_chat_result(self, cache_key: Optional[str]) -> Optional[ChatResult]:
+        """Rebuild a ChatResult from the response cache (None on a miss)."""
+        if cache_key is None or self.response_cache is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        result = self._create_chat_result(cached)
+        result.generations[0].message.response_metadata["cache_hit"] = True
+        return result
+
+    def _cached_stream_recording(
+        self, cache_key: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached stream recording for ``cache_key`` (None on a miss)."""
+        if cache_key is None or self.response_cache is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        return cached if is_stream_recording(cached) else None
+
+    @staticmethod
+    def _mark_cache_hit(chunk: ChatGenerationChunk) -> ChatGenerationChunk:
+        """Flag a replayed chunk the same way cached ``_generate`` results are."""
+        chunk.message.response_metadata["cache_hit"] = True
+        return chunk
+
+    def _annotate_prefix(self, result: ChatResult, data: Dict[str, Any]) -> None:
+        """Record the cacheable prefix size of a canonical request."""
+        if self.canonical_requests:
+            result.generations[0].message.response_metadata[
+                "cacheable_prefix"
+            ] = cacheable_prefix(data)
+
+    @staticmethod
+    def _annotate_timing(result: ChatResult, timing: RequestTiming) -> None:
+        """Publish the request's timings as ``response_metadata["timing"]``."""
+        if timing.total_ms is None:
+            timing.finish()
+        message = result.generations[0].message
+        usage = getattr(message, "usage_metadata", None) or {}
+        message.response_metadata["timing"] = timing.to_metadata(
+            usage.get("output_tokens")
+        )
+
+    @staticmethod
+    def _timed_chunk(
+        chunk: ChatGenerationChunk, timing: RequestTiming
+    ) -> ChatGenerationChunk:
+        """Track time to first token; put the timings on the usage chunk."""
+        message = chunk.message
+        if not isinstance(message, AIMessageChunk):
+            return chunk
+        if message.content or message.tool_call_chunks:
+            timing.mark_first_token()
+        if message.usage_metadata:
+            timing.finish()
+            message.response_metadata["timing"] = timing.to_metadata(
+                message.usage_metadata.get("output_tokens")
+            )
+        return chunk
+
+    def _init_fallbacks(self, catalog: Any) -> ModelFallbackChain:
+        if self._fallbacks is None:
+            self._fallbacks = ModelFallbackChain(
+                known_models(self.fallback_models or [], catalog),
+                self.fallback_cooldown,
+            )
+        return self._fallbacks
+
+    def _post(
+        self, data: Dict[str, Any], timing: RequestTiming
+    ) -> Tuple[Dict[str, Any], str]:
+        """Send ``data``, falling back to other models if configured.
+
+        Returns the response and the model that served it.
+        """
+        requested = str(data.get("model", ""))
+        if not self.fallback_models:
+            return self.http_client.post_with_retry(data, timing=timing), requested
+        if self._fallbacks is None:
+            try:
+                catalog = self.utils.get_catalog()
+            except IOIntelligenceError:
+                catalog = None
+            self._init_fallbacks(catalog)
+        assert self._fallbacks is not None
+        models = self._fallbacks.candidates(requested)
+        for position, model in enumerate(models):
+            is_last = position == len(models) - 1
+            try:
+                response_data = self.http_client.post_with_retry(
+                    data if model == requested else {**data, "model": model},
+                    timing=timing,
+                    # Only the last resort waits out retries.
+                    max_retries=None if is_last else 0,
+                )
+            except FALLBACK_ERRORS as exc:
+                self._fallbacks.mark_failed(model, exc)
+                if is_last:
+                    raise
+                continue
+            self._fallbacks.mark_ok(model)
+            return response_data, model
+        raise AssertionError("unreachable")
+
+    async def _apost(
+        self, data: Dict[str, Any], timing: RequestTiming
+    ) -> Tuple[Dict[str, Any], str]:
+        """Async counterpart of :meth:`_post`."""
+        requested = str(data.get("model", ""))
+        client = self.async_http_client
+        if not self.fallback_models:
+            response_data = await client.apost_with_retry(data, timing=timing)
+            # A hedge sent to the hedge policy's fallback model may have won.
+            return response_data, timing.served_model or requested
+        if self._fallbacks is None:
+            try:
+                catalog = await self.utils.aget_catalog()
+            except IOIntelligenceError:
+                catalog = None
+            self._init_fallbacks(catalog)
+        assert self._fallbacks is not None
+        models = self._fallbacks.candidates(requested)
+        for position, model in enumerate(models):
+            is_last = position == len(models) - 1
+            try:
+                response_data = await client.apost_with_retry(
+                    data if model == requested else {**data, "model": model},
+                    timing=timing,
+                    max_retries=None if is_last else 0,
+                )
+            except FALLBACK_ERRORS as exc:
+                self._fallbacks.mark_failed(model, exc)
+                if is_last:
+                    raise
+                continue
+            self._fallbacks.mark_ok(model)
+            return response_data, timing.served_model or model
+        raise AssertionError("unreachable")
+
+    def _served_result(
+        self, response_data: Dict[str, Any], requested: str, served: str
+    ) -> ChatResult:
+        """Build the ChatResult, noting a fallback model in its metadata."""
+        if served == requested:
+            return self._create_chat_result(response_data)
+        result = self._create_chat_result({"model": served, **response_data})
+        result.generations[0].message.response_metadata["fallback_from"] = requested
+        return result
+
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -374,11 +791,27 @@ class IOIntelligenceChatModel(BaseChatModel):
     ) -> ChatResult:
         """Run the LLM on the given messages."""
         data = self._build_request_data(messages, stop, **kwargs)
+        cache_key = self._response_cache_key(data)
+        cached = self._cached_chat_result(cache_key)
+        if cached is not None:
+            return cached
+        timing = RequestTiming()
+        requested = str(data.get("model", ""))
         try:
-            response_data = self.http_client.post_with_retry(data)
-            return self._create_chat_result(response_data)
+            response_data, served = self._post(data, timing)
+            result = self._served_result(response_data, requested, served)
         except Exception as e:
             raise self._wrap_error(e)
+        # A fallback model's answer is not cached under the requested model.
+        if (
+            cache_key is not None
+            and self.response_cache is not None
+            and served == requested
+        ):
+            self.response_cache.set(cache_key, response_data)
+        self._annotate_prefix(result, data)
+        self._annotate_timing(result, timing)
+        return result
 
     async def _agenerate(
         self,
@@ -389,11 +822,97 @@ class IOIntelligenceChatModel(BaseChatModel):
     ) -> ChatResult:
         """Asynchronously run the LLM on the given messages (native async)."""
         data = self._build_request_data(messages, stop, **kwargs)
+        cache_key = self._response_cache_key(data)
+        cached = self._cached_chat_result(cache_key)
+        if cached is not None:
+            return cached
+        timing = RequestTiming()
+        requested = str(data.get("model", ""))
         try:
-            response_data = await self.async_http_client.apost_with_retry(data)
-            return self._create_chat_result(response_data)
+            response_data, served = await self._apost(data, timing)
+            result = self._served_result(response_data, requested, served)
         except Exception as e:
             raise self._wrap_error(e)
+        if (
+            cache_key is not None
+            and self.response_cache is not None
+            and served == requested
+        ):
+            self.response_cache.set(cache_key, response_data)
+        self._annotate_prefix(result, data)
+        self._annotate_timing(result, timing)
+        return result
+
+    def _raw_stream(
+        self, data: Dict[str, Any]
+    ) -> Tuple[Iterator[Dict[str, Any]], bool]:
+        """Open a stream of raw chunk dicts for ``data``.
+
+        Returns the iterator and whether it replays the response cache.
+        Live streams are resumed per ``stream_resume`` and, when cacheable,
+        recorded once they complete.
+        """
+        cache_key = self._response_cache_key(data)
+        recording = self._cached_stream_recording(cache_key)
+        if recording is not None:
+            return replay_stream(recording, realtime=self.stream_replay_timing), True
+
+        if self.stream_resume:
+            raw_chunks = resumable_stream(
+                self.streamer.stream_raw,
+                data,
+                self.stream_resume,
+                self.max_stream_resumes,
+            )
+        else:
+            raw_chunks = self.streamer.stream_raw(data)
+        if cache_key is None or self.response_cache is None:
+            return raw_chunks, False
+        return self._record_stream(raw_chunks, cache_key), False
+
+    def _record_stream(
+        self, raw_chunks: Iterator[Dict[str, Any]], cache_key: str
+    ) -> Iterator[Dict[str, Any]]:
+        recorder = StreamRecorder()
+        for raw_chunk in raw_chunks:
+            recorder.record(raw_chunk)
+            yield raw_chunk
+        # Only complete streams are recorded; an abandoned generator never
+        # reaches this point.
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, recorder.to_cache_value())
+
+    def _araw_stream(
+        self, data: Dict[str, Any]
+    ) -> Tuple[AsyncIterator[Dict[str, Any]], bool]:
+        """Async counterpart of :meth:`_raw_stream`."""
+        cache_key = self._response_cache_key(data)
+        recording = self._cached_stream_recording(cache_key)
+        if recording is not None:
+            return areplay_stream(recording, realtime=self.stream_replay_timing), True
+
+        if self.stream_resume:
+            raw_chunks = aresumable_stream(
+                self.async_http_client.astream,
+                data,
+                self.stream_resume,
+                self.max_stream_resumes,
+            )
+        else:
+            raw_chunks = self.async_http_client.astream(data)
+        if cache_key is None or self.response_cache is None:
+            return raw_chunks, False
+        return self._arecord_stream(raw_chunks, cache_key), False
+
+    async def _arecord_stream(
+        self, raw_chunks: AsyncIterator[Dict[str, Any]], cache_key: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        recorder = StreamRecorder()
+        async for raw_chunk in raw_chunks:
+            recorder.record(raw_chunk)
+            yield raw_chunk
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, recorder.to_cache_value())
 
     def _stream(
         self,
@@ -404,9 +923,18 @@ class IOIntelligenceChatModel(BaseChatModel):
     ) -> Iterator[ChatGenerationChunk]:
         """Stream the LLM on the given messages."""
         data = self._build_request_data(messages, stop, stream=True, **kwargs)
+        timing = RequestTiming()
+        raw_chunks, from_cache = self._raw_stream(data)
+        if from_cache:
+            for chunk in self.streamer.build_chunks(raw_chunks):
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.message.content or "")
+                yield self._mark_cache_hit(chunk)
+            return
 
         try:
-            for chunk in self.streamer.stream_chat_completion(data):
+            for chunk in self.streamer.build_chunks(raw_chunks):
+                self._timed_chunk(chunk, timing)
                 if run_manager:
                     run_manager.on_llm_new_token(chunk.message.content or "")
                 yield chunk
@@ -422,11 +950,17 @@ class IOIntelligenceChatModel(BaseChatModel):
     ) -> AsyncIterator[ChatGenerationChunk]:
         """Asynchronously stream the LLM on the given messages (native async)."""
         data = self._build_request_data(messages, stop, stream=True, **kwargs)
+        timing = RequestTiming()
+        raw_chunks, from_cache = self._araw_stream(data)
         try:
-            async for raw_chunk in self.async_http_client.astream(data):
+            async for raw_chunk in raw_chunks:
                 chunk = build_generation_chunk(raw_chunk)
                 if chunk is None:
                     continue
+                if from_cache:
+                    self._mark_cache_hit(chunk)
+                else:
+                    self._timed_chunk(chunk, timing)
                 if run_manager:
                     content = chunk.message.content
                     await run_manager.on_llm_new_token(
@@ -436,9 +970,165 @@ class IOIntelligenceChatModel(BaseChatModel):
         except Exception as e:
             raise self._wrap_error(e)
 
+    def stream_deltas(
+        self,
+        input: LanguageModelInput,
+        *,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Iterator[StreamDelta]:
+        """Stream lightweight :class:`StreamDelta` records instead of chunks.
+
+        For high-volume consumers that forward tokens as-is: no LangChain
+        message objects are built per token (call
+        ``delta.to_generation_chunk()`` when one is needed), and callbacks
+        and tracing are bypassed. Caching, replay and stream resumption
+        behave as in :meth:`stream`. Being a method of the model itself, it
+        does not see kwargs bound with ``bind``/``bind_tools``; pass request
+        options such as ``tools`` directly.
+        """
+        messages = self._convert_input(input).to_messages()
+        data = self._build_request_data(messages, stop, stream=True, **kwargs)
+        raw_chunks, _ = self._raw_stream(data)
+        try:
+            for raw_chunk in raw_chunks:
+                delta = parse_stream_delta(raw_chunk)
+                if delta is not None:
+                    yield delta
+        except Exception as e:
+            raise self._wrap_error(e)
+
+    async def astream_deltas(
+        self,
+        input: LanguageModelInput,
+        *,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[StreamDelta]:
+        """Async counterpart of :meth:`stream_deltas`."""
+        messages = self._convert_input(input).to_messages()
+        data = self._build_request_data(messages, stop, stream=True, **kwargs)
+        raw_chunks, _ = self._araw_stream(data)
+        try:
+            async for raw_chunk in raw_chunks:
+                delta = parse_stream_delta(raw_chunk)
+                if delta is not None:
+                    yield delta
+        except Exception as e:
+            raise self._wrap_error(e)
+
+    def stream_text(
+        self,
+        input: LanguageModelInput,
+        *,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """Stream only the non-empty text deltas (see :meth:`stream_deltas`)."""
+        for delta in self.stream_deltas(input, stop=stop, **kwargs):
+            if delta.content:
+                yield delta.content
+
+    async def astream_text(
+        self,
+        input: LanguageModelInput,
+        *,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Async counterpart of :meth:`stream_text`."""
+        async for delta in self.astream_deltas(input, stop=stop, **kwargs):
+            if delta.content:
+                yield delta.content
+
+    def batch(
+        self,
+        inputs: List[LanguageModelInput],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Invoke the model on many inputs over the pooled async client.
+
+        Runs :meth:`abatch` on a private event loop instead of one executor
+        thread per input. When called from a thread that already runs an
+        event loop, falls back to LangChain's thread-based implementation.
+
+        Returns ``List[Any]`` because the ``Runnable`` output type is
+        ``BaseMessage`` or ``AIMessage`` depending on the langchain-core
+        version, and failed items hold exceptions with
+        ``return_exceptions=True``.
+        """
+        if not inputs:
+            return []
+        if has_running_loop():
+            return super().batch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+        return asyncio.run(
+            self._abatch_and_release(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+        )
+
+    async def _abatch_and_release(
+        self,
+        inputs: List[LanguageModelInput],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]],
+        *,
+        return_exceptions: bool,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Run :meth:`abatch`, then close the connections bound to this loop."""
+        try:
+            return await self.abatch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+        finally:
+            # The private loop dies with this call; its pooled connections
+            # cannot be reused from another loop.
+            await self.aclose_loop()
+
+    async def abatch(
+        self,
+        inputs: List[LanguageModelInput],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Invoke the model on many inputs with bounded concurrency.
+
+        At most ``config["max_concurrency"]`` (or ``batch_max_concurrency``)
+        requests are in flight at once; with a ``concurrency_limiter`` and
+        no ``max_concurrency`` in the config, the limiter sets the pace.
+        Results keep the input order; with ``return_exceptions=True`` failed
+        items hold their exception while the rest of the batch completes.
+        """
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+        max_concurrency = configs[0].get("max_concurrency")
+        if not max_concurrency:
+            max_concurrency = (
+                self.concurrency_limiter.max_limit
+                if self.concurrency_limiter is not None
+                else self.batch_max_concurrency
+            )
+
+        def _factory(item: LanguageModelInput, item_config: RunnableConfig):
+            return lambda: self.ainvoke(item, item_config, **kwargs)
+
+        return await agather_bounded(
+            [_factory(item, cfg) for item, cfg in zip(inputs, configs)],
+            max_concurrency,
+            return_exceptions=return_exceptions,
+        )
+
     def bind_tools(
         self,
-        tools: Sequence[Union[Dict[str, Any], type, Callable, BaseTool]],
+        tools: Union[Toolset, Sequence[Union[Dict[str, Any], type, Callable, BaseTool]]],
         *,
         tool_choice: Optional[Union[str, bool, dict]] = None,
         **kwargs: Any,
@@ -448,7 +1138,9 @@ class IOIntelligenceChatModel(BaseChatModel):
         Args:
             tools: Tool definitions - any object understood by
                 ``convert_to_openai_tool`` (Pydantic models, ``@tool`` functions,
-                ``BaseTool`` instances, plain functions, or OpenAI tool dicts).
+                ``BaseTool`` instances, plain functions, or OpenAI tool dicts),
+                or a prebuilt :class:`Toolset`. Schemas are cached per tool
+                object, so rebinding the same tools is cheap.
             tool_choice: Controls which tool is invoked. One of ``"auto"``,
                 ``"none"``, ``"required"``/``"any"``/``True``, a specific tool
                 name, or an explicit OpenAI ``tool_choice`` dict.
@@ -456,11 +1148,10 @@ class IOIntelligenceChatModel(BaseChatModel):
         Returns:
             A runnable that always sends the bound tools to the API.
         """
-        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        toolset = tools if isinstance(tools, Toolset) else Toolset(tools)
         if tool_choice is not None:
-            tool_names = [t["function"]["name"] for t in formatted_tools]
-            kwargs["tool_choice"] = _format_tool_choice(tool_choice, tool_names)
-        return super().bind(tools=formatted_tools, **kwargs)
+            kwargs["tool_choice"] = _format_tool_choice(tool_choice, toolset.names)
+        return super().bind(tools=toolset.schemas, **kwargs)
 
     def with_structured_output(
         self,
@@ -496,8 +1187,9 @@ class IOIntelligenceChatModel(BaseChatModel):
         )
 
         if method == "function_calling":
-            tool_name = convert_to_openai_tool(schema)["function"]["name"]
-            llm = self.bind_tools([schema], tool_choice=tool_name)
+            openai_tool = get_openai_tool_schema(schema)
+            tool_name = openai_tool["function"]["name"]
+            llm = self.bind_tools([openai_tool], tool_choice=tool_name)
             if is_pydantic_schema:
                 output_parser: Runnable = PydanticToolsParser(
                     tools=[cast(Type[BaseModel], schema)], first_tool_only=True
@@ -507,7 +1199,7 @@ class IOIntelligenceChatModel(BaseChatModel):
                     key_name=tool_name, first_tool_only=True
                 )
         elif method == "json_schema":
-            function = convert_to_openai_tool(schema)["function"]
+            function = get_openai_tool_schema(schema)["function"]
             response_format = {
                 "type": "json_schema",
                 "json_schema": {
@@ -548,17 +1240,38 @@ class IOIntelligenceChatModel(BaseChatModel):
         return llm | output_parser
 
     def close(self) -> None:
-        """Close the cached synchronous HTTP session (if one was created)."""
+        """Close the cached synchronous HTTP session (if one was created).
+
+        Shared clients (``share_clients=True``) are only released by this
+        model; the pool keeps them open for other models.
+        """
+        # The streamer borrows the HTTP client's session; drop it too.
+        self._streamer = None
         if self._http_client is not None:
-            self._http_client.close()
+            if not self.share_clients:
+                self._http_client.close()
             self._http_client = None
+        if self._utils is not None:
+            if not self.share_clients:
+                self._utils.close()
+            self._utils = None
 
     async def aclose(self) -> None:
         """Close the cached async HTTP client (if one was created)."""
         if self._async_http_client is not None:
-            await self._async_http_client.aclose()
+            if not self.share_clients:
+                await self._async_http_client.aclose()
             self._async_http_client = None
 
+    async def aclose_loop(self) -> None:
+        """Close the async client's connections bound to the running loop.
+
+        The client itself stays usable by other threads and loops; used
+        before a private ``asyncio.run`` loop ends.
+        """
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose_loop()
+
     @property
     def _identifying_params(self) -> Dict[str, Any]:
         """Return a dictionary of identifying parameters."""
@@ -0,0 +1,224 @@
+"""Circuit breaking per (endpoint, model) for the HTTP clients.
+
+During an incident every caller otherwise walks through its own retries
+and backoff sleeps, tying up threads and coroutines for the whole retry
+budget. A :class:`CircuitBreaker` shared by those callers watches the
+outcome of recent requests per endpoint URL and model:
+
+* **closed** - requests flow; once enough of the recent ones failed (5xx,
+  timeouts, connection errors) or were slow, the circuit opens;
+* **open** - requests fail at once with
+  :class:`~.exceptions.IOIntelligenceCircuitOpenError`, without touching
+  the network, for ``open_duration`` seconds;
+* **half-open** - a few probe requests go through; if they succeed the
+  circuit closes, a single failure opens it again.
+
+Rate-limit responses (429) say nothing about the endpoint's health and
+are not counted either way.
+"""
+
+import collections
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .exceptions import IOIntelligenceCircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    """State of one (endpoint, model) circuit; guarded by the breaker's lock."""
+
+    __slots__ = ("state", "outcomes", "opened_at", "probes", "probe_successes")
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        # (timestamp, failed, slow) of recent calls while closed.
+        self.outcomes: Deque[Tuple[float, bool, bool]] = collections.deque()
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+
+
+class CircuitCall:
+    """One guarded request; see :meth:`CircuitBreaker.guard`.
+
+    Call :meth:`record_status` with the HTTP status once the response
+    headers are in. Leaving the ``with`` block with an exception counts as
+    a failure (cancellation counts as nothing).
+    """
+
+    __slots__ = ("_breaker", "_key", "_started", "_status")
+
+    def __init__(self, breaker: "CircuitBreaker", key: Tuple[str, str]):
+        self._breaker = breaker
+        self._key = key
+        self._started = time.perf_counter()
+        self._status: Optional[int] = None
+
+    def record_status(self, status_code: int) -> None:
+        self._status = status_code
+
+    def __enter__(self) -> "CircuitCall":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        latency = time.perf_counter() - self._started
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            self._breaker._record(self._key, None, latency)  # cancelled
+        elif exc_type is not None or (self._status is not None and self._status >= 500):
+            self._breaker._record(self._key, True, latency)
+        elif self._status == 429:
+            self._breaker._record(self._key, None, latency)
+        else:
+            self._breaker._record(self._key, False, latency)
+
+
+class CircuitBreaker:
+    """Shared closed/open/half-open circuits keyed on (endpoint URL, model).
+
+    Pass one instance to every model (``circuit_breaker=...``) that should
+    trip together.
+
+    Args:
+        failure_rate_threshold: Failed fraction of recent calls that opens
+            the circuit
+        slow_call_threshold: Seconds after which a call counts as slow
+            (None = latency is ignored)
+        slow_call_rate_threshold: Slow fraction of recent calls that opens
+            the circuit
+        min_calls: Calls in the window before the rates are evaluated
+        window: Seconds of history considered while closed
+        open_duration: Seconds a circuit stays open before probing
+        half_open_max_calls: Probe requests let through while half-open;
+            this many successes close the circuit
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        min_calls: int = 10,
+        window: float = 60.0,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._circuits: Dict[Tuple[str, str], _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, key: Tuple[str, str]) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit()
+        return circuit
+
+    def _refresh(self, circuit: _Circuit, now: float) -> None:
+        if circuit.state == OPEN and now >= circuit.opened_at + self.open_duration:
+            circuit.state = HALF_OPEN
+            circuit.probes = 0
+            circuit.probe_successes = 0
+
+    def state(self, endpoint: str, model: str = "") -> str:
+        """Current state of the circuit: ``"closed"``, ``"open"`` or ``"half_open"``."""
+        with self._lock:
+            circuit = self._circuit((endpoint, model))
+            self._refresh(circuit, self._clock())
+            return circuit.state
+
+    def guard(self, endpoint: str, model: str = "") -> CircuitCall:
+        """Admit a request to ``endpoint`` for ``model``.
+
+        Raises:
+            IOIntelligenceCircuitOpenError: If the circuit is open, or
+                half-open with all probes in flight
+        """
+        key = (endpoint, model)
+        now = self._clock()
+        with self._lock:
+            circuit = self._circuit(key)
+            self._refresh(circuit, now)
+            if circuit.state == CLOSED:
+                return CircuitCall(self, key)
+            if circuit.state == HALF_OPEN and circuit.probes < self.half_open_max_calls:
+                circuit.probes += 1
+                return CircuitCall(self, key)
+            retry_after = max(0.0, circuit.opened_at + self.open_duration - now)
+        raise IOIntelligenceCircuitOpenError(
+            f"Circuit open for model '{model}' at {endpoint}; failing fast",
+            endpoint=endpoint,
+            model=model,
+            retry_after=retry_after,
+        )
+
+    def _record(self, key: Tuple[str, str], failed: Optional[bool], latency: float) -> None:
+        """Record a call outcome (``failed`` None = neither success nor failure)."""
+        slow = self.slow_call_threshold is not None and latency >= self.slow_call_threshold
+        now = self._clock()
+        with self._lock:
+            circuit = self._circuit(key)
+            if circuit.state == HALF_OPEN:
+                circuit.probes = max(0, circuit.probes - 1)
+                if failed is None:
+                    return
+                if failed or slow:
+                    self._open(circuit, now)
+                    return
+                circuit.probe_successes += 1
+                if circuit.probe_successes >= self.half_open_max_calls:
+                    circuit.state = CLOSED
+                    circuit.outcomes.clear()
+                return
+            if circuit.state != CLOSED or failed is None:
+                return
+            outcomes = circuit.outcomes
+            outcomes.append((now, failed, slow))
+            while outcomes and outcomes[0][0] < now - self.window:
+                outcomes.popleft()
+            if len(outcomes) < self.min_calls:
+                return
+            failures = sum(1 for _, f, _ in outcomes if f)
+            slow_calls = sum(1 for _, _, s in outcomes if s)
+            if (
+                failures >= self.failure_rate_threshold * len(outcomes)
+                or (
+                    self.slow_call_threshold is not None
+                    and slow_calls >= self.slow_call_rate_threshold * len(outcomes)
+                )
+            ):
+                self._open(circuit, now)
+
+    def _open(self, circuit: _Circuit, now: float) -> None:
+        circuit.state = OPEN
+        circuit.opened_at = now
+        circuit.outcomes.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Snapshot of every circuit, e.g. for dashboards."""
+        now = self._clock()
+        with self._lock:
+            result = []
+            for (endpoint, model), circuit in self._circuits.items():
+                self._refresh(circuit, now)
+                result.append(
+                    {
+                        "endpoint": endpoint,
+                        "model": model,
+                        "state": circuit.state,
+                        "recent_calls": len(circuit.outcomes),
+                        "recent_failures": sum(1 for _, f, _ in circuit.outcomes if f),
+                    }
+                )
+            return result
@@ -0,0 +1,110 @@
+"""Process-wide registry of io Intelligence HTTP clients.
+
+Each model instance normally builds its own sync session, async client,
+streamer and utils client, so a process with many model instances (or
+many short-lived chains) holds as many connection pools. Models created
+with ``share_clients=True`` fetch their clients from
+:class:`IOIntelligenceClientPool` instead, where one client per kind is
+kept for every distinct (API URL, API key, transport settings) combination.
+A shared async client may serve several threads and event loops at once;
+it keeps one httpx connection pool per running loop.
+
+Shared clients outlive the models that use them: ``model.close()`` only
+drops the model's reference. Release the pooled connections with
+:meth:`IOIntelligenceClientPool.close` / :meth:`~IOIntelligenceClientPool.aclose`
+(or the module-level :func:`close_shared_clients` /
+:func:`aclose_shared_clients`), e.g. at worker shutdown.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar, cast
+
+T = TypeVar("T")
+
+
+def _registry_key(kind: str, settings: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """Build a hashable key, never keeping the raw API key in the registry."""
+    items = []
+    for name, value in sorted(settings.items()):
+        if name == "api_key":
+            value = hashlib.sha256(str(value).encode()).hexdigest()
+        items.append((name, value))
+    return (kind, tuple(items))
+
+
+class IOIntelligenceClientPool:
+    """Thread-safe registry handing out one shared client per settings key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[Hashable, ...], Any] = {}
+
+    def get(self, kind: str, settings: Dict[str, Any], factory: Callable[[], T]) -> T:
+        """Return the shared ``kind`` client for ``settings``, creating it once.
+
+        Args:
+            kind: Client type, e.g. ``"http"``, ``"async"``, ``"streamer"``
+            settings: Everything that distinguishes one client from another
+                (URL, API key, timeouts, retry and pool settings)
+            factory: Builds the client on first use
+        """
+        key = _registry_key(kind, settings)
+        with self._lock:
+            client = self._clients.get(key)
+        if client is not None:
+            return cast(T, client)
+        # Build outside the lock: factories may fetch other pooled clients.
+        # If another thread wins the race its client is kept and ours dropped.
+        built = factory()
+        with self._lock:
+            return cast(T, self._clients.setdefault(key, built))
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _pop_all(self) -> list:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        return clients
+
+    def close(self) -> None:
+        """Close every shared sync client and empty the pool.
+
+        Async clients are dropped without awaiting their shutdown; use
+        :meth:`aclose` from a running event loop to close them cleanly.
+        """
+        for client in self._pop_all():
+            close = getattr(client, "close", None)
+            if callable(close):
+                close()
+
+    async def aclose(self) -> None:
+        """Close every shared client (sync and async) and empty the pool."""
+        for client in self._pop_all():
+            aclose = getattr(client, "aclose", None)
+            if callable(aclose):
+                await aclose()
+                continue
+            close = getattr(client, "close", None)
+            if callable(close):
+                close()
+
+
+_default_pool = IOIntelligenceClientPool()
+
+
+def get_client_pool() -> IOIntelligenceClientPool:
+    """Return the process-wide pool used by models with ``share_clients=True``."""
+    return _default_pool
+
+
+def close_shared_clients() -> None:
+    """Close the sync clients of the process-wide pool."""
+    _default_pool.close()
+
+
+async def aclose_shared_clients() -> None:
+    """Close every client of the process-wide pool."""
+    await _default_pool.aclose()
@@ -0,0 +1,138 @@
+"""JSON codec for request bodies, responses and SSE chunks.
+
+The HTTP clients serialise request payloads to bytes once and send them
+as the raw body, and decode responses and stream chunks straight from
+bytes. The fastest installed backend is chosen at import time:
+
+* ``orjson`` (``pip install "langchain-iointelligence[fast-json]"``);
+* ``msgspec``;
+* the standard library ``json`` module as the fallback.
+
+:func:`set_json_codec` switches backends at runtime (by name or with a
+custom :class:`JSONCodec`), e.g. to compare them or to pin the stdlib.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+
+class JSONCodec:
+    """A named pair of ``dumps`` (object -> bytes) and ``loads`` functions.
+
+    ``loads`` accepts ``bytes`` or ``str`` and raises ``ValueError`` on
+    malformed input, whatever the backend.
+    """
+
+    __slots__ = ("name", "dumps", "loads")
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[Union[bytes, bytearray, memoryview, str]], Any],
+    ):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"JSONCodec({self.name!r})"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _make_orjson() -> Optional[JSONCodec]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    # orjson.JSONDecodeError already subclasses ValueError.
+    return JSONCodec("orjson", _dumps, orjson.loads)
+
+
+def _make_msgspec() -> Optional[JSONCodec]:
+    try:
+        import msgspec
+    except ImportError:
+        return None
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def _loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+    return JSONCodec("msgspec", encoder.encode, _loads)
+
+
+STDLIB_CODEC = JSONCodec("json", _stdlib_dumps, _stdlib_loads)
+
+_FACTORIES: Dict[str, Callable[[], Optional[JSONCodec]]] = {
+    "orjson": _make_orjson,
+    "msgspec": _make_msgspec,
+    "json": lambda: STDLIB_CODEC,
+}
+
+
+def _best_available() -> JSONCodec:
+    for factory in (_make_orjson, _make_msgspec):
+        codec = factory()
+        if codec is not None:
+            return codec
+    return STDLIB_CODEC
+
+
+_codec = _best_available()
+
+
+def get_json_codec() -> JSONCodec:
+    """Return the codec currently used by the clients."""
+    return _codec
+
+
+def set_json_codec(codec: Union[str, JSONCodec]) -> JSONCodec:
+    """Select the codec by backend name (``"orjson"``, ``"msgspec"``, ``"json"``)
+    or install a custom :class:`JSONCodec`. Returns the codec now in use.
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the named backend is not installed
+    """
+    global _codec
+    if isinstance(codec, str):
+        factory = _FACTORIES.get(codec)
+        if factory is None:
+            raise ValueError(
+                f"Unknown JSON codec '{codec}'. Expected one of {sorted(_FACTORIES)}."
+            )
+        resolved = factory()
+        if resolved is None:
+            raise ImportError(f"JSON codec '{codec}' is not installed")
+        codec = resolved
+    _codec = codec
+    return _codec
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialise ``obj`` to JSON bytes with the active codec."""
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON ``data`` with the active codec (``ValueError`` if malformed)."""
+    return _codec.loads(data)
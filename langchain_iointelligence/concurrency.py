@@ -0,0 +1,228 @@
+"""Adaptive (AIMD) concurrency limit for the async client.
+
+A fixed semaphore size is a guess: too small leaves capacity unused, too
+large turns into 429s, timeouts and queueing on the server. An
+:class:`AdaptiveConcurrencyLimiter` instead finds the limit the way TCP
+finds a congestion window:
+
+* **additive increase** - every healthy response grows the limit by
+  ``increase / limit``, i.e. by ``increase`` per round of requests, as
+  long as the limit is actually being used;
+* **multiplicative decrease** - a 429 or 503, a timeout, or latency
+  inflation (the short-term latency average rising above
+  ``latency_tolerance`` times the long-term one) multiplies the limit by
+  ``backoff``, at most once per round: responses to requests sent before
+  the last decrease do not shrink it again.
+
+Requests beyond the limit wait in FIFO order. Waiting works across event
+loops and threads, so one limiter can be shared by several clients.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Statuses that mean "too much load" rather than "bad request".
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class ConcurrencySlot:
+    """Permission to send one request; see :meth:`AdaptiveConcurrencyLimiter.acquire`.
+
+    Report the outcome once with :meth:`observe` (or
+    :meth:`observe_overload` for a timeout), then :meth:`release` the slot
+    - or use it as a ``with`` block, which releases on exit. A slot
+    released without an observation frees its place and changes nothing.
+    """
+
+    __slots__ = ("_limiter", "started", "_observed", "_released")
+
+    def __init__(self, limiter: "AdaptiveConcurrencyLimiter", started: float):
+        self._limiter = limiter
+        self.started = started
+        self._observed = False
+        self._released = False
+
+    def observe(self, status_code: Optional[int] = None) -> None:
+        """Record the response (headers received) and its latency."""
+        if self._observed:
+            return
+        self._observed = True
+        overloaded = status_code in OVERLOAD_STATUSES
+        if status_code is not None and status_code >= 500 and not overloaded:
+            return  # A server bug says nothing about capacity.
+        self._limiter._on_sample(self, self._limiter._clock() - self.started, overloaded)
+
+    def observe_overload(self) -> None:
+        """Record a request that timed out or was shed."""
+        if self._observed:
+            return
+        self._observed = True
+        self._limiter._on_sample(self, self._limiter._clock() - self.started, True)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release()
+
+    def __enter__(self) -> "ConcurrencySlot":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.release()
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limit requests in flight, adapting the limit with AIMD.
+
+    Pass one instance to every model (``concurrency_limiter=...``) whose
+    requests should share the learned capacity.
+
+    Args:
+        initial_limit: Requests allowed in flight before anything is learned
+        min_limit: Lowest the limit goes on backoff
+        max_limit: Highest the limit grows
+        increase: Limit added per round of healthy responses
+        backoff: Factor applied to the limit on overload (0 < backoff < 1)
+        latency_tolerance: Short-term over long-term latency ratio that
+            counts as overload (None = ignore latency)
+        min_samples: Healthy responses needed before latency is judged
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        min_samples: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("need 1 <= min_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be in (0, 1)")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_samples = min_samples
+        self.backoffs = 0
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = (
+            collections.deque()
+        )
+        self._samples = 0
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._last_backoff = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> ConcurrencySlot:
+        """Wait for a free slot (FIFO) and take it."""
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return ConcurrencySlot(self, self._clock())
+            loop = asyncio.get_running_loop()
+            waiter: "asyncio.Future[None]" = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except BaseException:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    granted = False
+                except ValueError:
+                    # Handed a slot already; give it back unless the grant
+                    # callback sees the cancellation and does it itself.
+                    granted = waiter.done() and not waiter.cancelled()
+            if granted:
+                self._release()
+            raise
+        return ConcurrencySlot(self, self._clock())
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        while self._waiters and self._in_flight < int(self._limit):
+            loop, waiter = self._waiters.popleft()
+            self._in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, waiter)
+            except RuntimeError:  # Waiter's loop is closed.
+                self._in_flight -= 1
+
+    def _grant(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.done():
+            self._release()  # Cancelled while the slot was on its way.
+        else:
+            waiter.set_result(None)
+
+    def _on_sample(self, slot: ConcurrencySlot, latency: float, overloaded: bool) -> None:
+        with self._lock:
+            if not overloaded:
+                overloaded = self._update_latency(latency)
+            if overloaded:
+                if slot.started >= self._last_backoff:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_backoff = self._clock()
+                    self.backoffs += 1
+                return
+            # Only grow a limit that is being used, or an idle client would
+            # drift to max_limit and then flood the server when busy.
+            if self._in_flight * 2 >= int(self._limit):
+                self._limit = min(
+                    float(self.max_limit), self._limit + self.increase / self._limit
+                )
+                self._wake_locked()
+
+    def _update_latency(self, latency: float) -> bool:
+        """Fold ``latency`` into the averages; True if latency is inflated."""
+        self._samples += 1
+        if self._short_latency is None or self._long_latency is None:
+            self._short_latency = self._long_latency = latency
+            return False
+        self._short_latency += 0.3 * (latency - self._short_latency)
+        self._long_latency += 0.05 * (latency - self._long_latency)
+        return (
+            self.latency_tolerance is not None
+            and self._samples >= self.min_samples
+            and self._short_latency > self.latency_tolerance * self._long_latency
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the limiter's state, e.g. for dashboards."""
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "backoffs": self.backoffs,
+                "short_latency_ms": (
+                    None if self._short_latency is None else self._short_latency * 1000.0
+                ),
+                "long_latency_ms": (
+                    None if self._long_latency is None else self._long_latency * 1000.0
+                ),
+            }
@@ -1,9 +1,11 @@
 """IOIntelligence specific exceptions for better error handling."""
 
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from langchain_core.exceptions import OutputParserException as GenerationError
 
+from .retry import RateLimitInfo, parse_rate_limit_headers
+
 
 class IOIntelligenceError(GenerationError):
     """Base exception for io Intelligence API errors."""
@@ -12,12 +14,28 @@ class IOIntelligenceError(GenerationError):
 
 
 class IOIntelligenceAPIError(IOIntelligenceError):
-    """General API error."""
-
-    def __init__(self, message: str, status_code: Optional[int] = None, response_text: Optional[str] = None):
+    """General API error.
+
+    ``rate_limit`` holds any ``Retry-After`` / ``x-ratelimit-*`` hints the
+    server sent with the failed response.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_text: Optional[str] = None,
+        rate_limit: Optional[RateLimitInfo] = None,
+    ):
         super().__init__(message)
         self.status_code = status_code
         self.response_text = response_text
+        self.rate_limit = rate_limit or RateLimitInfo()
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """Seconds the server asked us to wait before retrying, if it said."""
+        return self.rate_limit.suggested_delay
 
 
 class IOIntelligenceRateLimitError(IOIntelligenceAPIError):
@@ -56,11 +74,44 @@ class IOIntelligenceInvalidResponseError(IOIntelligenceError):
     pass
 
 
-def classify_api_error(status_code: int, response_text: str = "") -> IOIntelligenceAPIError:
-    """Classify HTTP error into specific exception type."""
+class IOIntelligenceCircuitOpenError(IOIntelligenceError):
+    """Request rejected without being sent: the circuit for its endpoint
+    and model is open (see :class:`~.circuit_breaker.CircuitBreaker`).
+
+    ``retry_after`` is the number of seconds until probe requests are let
+    through again.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        endpoint: str = "",
+        model: str = "",
+        retry_after: float = 0.0,
+    ):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.model = model
+        self.retry_after = retry_after
+
+
+def classify_api_error(
+    status_code: int,
+    response_text: str = "",
+    headers: Optional[Mapping[str, Any]] = None,
+) -> IOIntelligenceAPIError:
+    """Classify HTTP error into specific exception type.
+
+    ``headers`` (optional) are parsed for rate-limit hints, which are attached
+    to the returned error as ``rate_limit`` / ``retry_after``.
+    """
+    rate_limit = parse_rate_limit_headers(headers)
     if status_code == 429:
         return IOIntelligenceRateLimitError(
-            "Rate limit exceeded. Please try again later.", status_code, response_text
+            "Rate limit exceeded. Please try again later.",
+            status_code,
+            response_text,
+            rate_limit,
         )
     elif status_code in (401, 403):
         return IOIntelligenceAuthenticationError(
@@ -71,6 +122,7 @@ def classify_api_error(status_code: int, response_text: str = "") -> IOIntellige
             f"Server error (HTTP {status_code}). Please try again later.",
             status_code,
             response_text,
+            rate_limit,
         )
     elif 400 <= status_code < 500:
         return IOIntelligenceAPIError(
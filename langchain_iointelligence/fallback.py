@@ -0,0 +1,110 @@
+"""Ordered model fallback on rate limits and overload.
+
+Quotas are per model, so a 429 on the primary model says nothing about
+the next one. A :class:`ModelFallbackChain` lists the models a request
+may be served by; the chat model sends the request to the first one
+that is not cooling down and, on a rate limit, 5xx, timeout or open
+circuit, moves on to the next at once instead of sleeping. A model that
+failed sits out a cooldown (the server's ``Retry-After`` for a 429, if
+it sent one) and is tried only after the others meanwhile.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Container, Dict, Iterable, List, Optional, Sequence
+
+from .exceptions import (IOIntelligenceCircuitOpenError,
+                         IOIntelligenceRateLimitError,
+                         IOIntelligenceServerError, IOIntelligenceTimeoutError)
+
+logger = logging.getLogger(__name__)
+
+# Failures that say "this model, right now" rather than "this request".
+FALLBACK_ERRORS = (
+    IOIntelligenceRateLimitError,
+    IOIntelligenceServerError,
+    IOIntelligenceTimeoutError,
+    IOIntelligenceCircuitOpenError,
+)
+
+
+def known_models(models: Iterable[str], catalog: Optional[Container[str]]) -> List[str]:
+    """Return ``models`` that are in the catalog, warning about the rest.
+
+    With no catalog (it could not be fetched) every model is kept.
+    """
+    if catalog is None:
+        logger.warning("Model catalog unavailable; fallback models not validated")
+        return list(models)
+    known: List[str] = []
+    unknown: List[str] = []
+    for model in models:
+        (known if model in catalog else unknown).append(model)
+    if unknown:
+        logger.warning("Ignoring fallback models missing from the catalog: %s", unknown)
+    return known
+
+
+class ModelFallbackChain:
+    """Fallback models with per-model cooldowns.
+
+    Args:
+        fallback_models: Models to try, in order, after the requested one
+        cooldown: Seconds a failed model is tried last (a 429's
+            ``Retry-After`` takes precedence)
+    """
+
+    def __init__(
+        self,
+        fallback_models: Sequence[str],
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fallback_models = list(fallback_models)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._cooling_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, model: str) -> List[str]:
+        """Models to try for a request to ``model``, in order.
+
+        Models cooling down go last, the one recovering soonest first.
+        """
+        models = [model] + [m for m in self.fallback_models if m != model]
+        now = self._clock()
+        with self._lock:
+            ready = [m for m in models if self._cooling_until.get(m, 0.0) <= now]
+            cooling = sorted(
+                (m for m in models if m not in ready),
+                key=lambda m: self._cooling_until[m],
+            )
+        return ready + cooling
+
+    def mark_failed(self, model: str, error: Exception) -> None:
+        """Start ``model``'s cooldown after ``error``."""
+        cooldown: Optional[float] = None
+        if isinstance(error, IOIntelligenceRateLimitError):
+            cooldown = error.retry_after
+        elif isinstance(error, IOIntelligenceCircuitOpenError):
+            cooldown = error.retry_after
+        if cooldown is None:
+            cooldown = self.cooldown
+        with self._lock:
+            self._cooling_until[model] = self._clock() + cooldown
+
+    def mark_ok(self, model: str) -> None:
+        """End ``model``'s cooldown."""
+        with self._lock:
+            self._cooling_until.pop(model, None)
+
+    def cooling_down(self) -> Dict[str, float]:
+        """Seconds of cooldown left per model."""
+        now = self._clock()
+        with self._lock:
+            return {
+                model: until - now
+                for model, until in self._cooling_until.items()
+                if until > now
+            }
@@ -0,0 +1,100 @@
+"""Hedged requests: cut tail latency by racing a late duplicate.
+
+Retries only start after a request has failed or timed out, so one slow
+response sets the p99. With a :class:`HedgePolicy` the async client sends
+a duplicate of a request that has not answered within the hedge delay
+(fixed, or the learned p95 of recent latencies), returns whichever copy
+succeeds first and cancels the other.
+
+Duplicates cost capacity, so hedging is budgeted: every request earns
+``budget`` credits (at most ``max_credits``) and every hedge spends one,
+which caps the extra load at about ``budget`` of the request rate even
+when the whole service is slow.
+"""
+
+import collections
+import math
+import threading
+from typing import Any, Deque, Dict, Optional
+
+
+class HedgePolicy:
+    """When and how the async client hedges a request.
+
+    One policy may be shared by several clients; it keeps the latency
+    window and the hedge budget.
+
+    Args:
+        delay: Seconds to wait before hedging; None learns it as the
+            ``percentile`` of recent request latencies
+        percentile: Latency percentile used as the learned delay
+        min_samples: Latencies needed before a learned delay is used (no
+            hedging until then)
+        window: Number of recent latencies kept
+        budget: Hedges allowed per request, on average
+        max_credits: Largest burst of hedges the budget allows
+        fallback_model: Send the hedge to this model instead of the
+            request's own (e.g. a smaller, faster one)
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        budget: float = 0.1,
+        max_credits: float = 10.0,
+        fallback_model: Optional[str] = None,
+    ):
+        if not 0 < percentile <= 1:
+            raise ValueError("percentile must be in (0, 1]")
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget = budget
+        self.max_credits = max_credits
+        self.fallback_model = fallback_model
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+        self._credits = 1.0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging (None = do not hedge yet)."""
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < max(1, self.min_samples):
+                return None
+            latencies = sorted(self._latencies)
+        rank = max(0, math.ceil(self.percentile * len(latencies)) - 1)
+        return latencies[rank]
+
+    def on_request(self) -> None:
+        """Earn hedge budget for one request."""
+        with self._lock:
+            self._credits = min(self.max_credits, self._credits + self.budget)
+
+    def try_hedge(self) -> bool:
+        """Spend budget on a hedge; False when the budget is used up."""
+        with self._lock:
+            if self._credits < 1.0:
+                return False
+            self._credits -= 1.0
+            self.hedges += 1
+            return True
+
+    def record(self, latency: float, hedge_won: bool = False) -> None:
+        """Record the latency (seconds) of a completed request."""
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def hedge_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The request body to send as the hedge."""
+        if self.fallback_model is None:
+            return data
+        return {**data, "model": self.fallback_model}
@@ -4,8 +4,12 @@ import time
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from . import codec
+from .circuit_breaker import CircuitBreaker
 from .exceptions import (
+    IOIntelligenceCircuitOpenError,
     IOIntelligenceConnectionError,
     IOIntelligenceError,
     IOIntelligenceRateLimitError,
@@ -13,6 +17,52 @@ from .exceptions import (
     IOIntelligenceTimeoutError,
     classify_api_error,
 )
+from .rate_limit import IOIntelligenceRateLimiter
+from .retry import compute_retry_delay, parse_rate_limit_headers
+from .routing import EndpointRouter
+from .timing import RequestTiming, parse_server_timing
+
+# Connections kept alive per host (matches requests' own default).
+DEFAULT_POOL_MAXSIZE = 10
+
+# Errors after which a routed request moves to another endpoint.
+ROUTER_FAILOVER_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    IOIntelligenceCircuitOpenError,
+)
+
+
+def is_server_error_response(response: requests.Response) -> bool:
+    """True for 5xx responses, which count against the endpoint."""
+    return response.status_code >= 500
+
+
+def is_rate_limited_response(response: requests.Response) -> bool:
+    """True for 429 responses, which count against the endpoint without failing over."""
+    return response.status_code == 429
+
+
+def create_session(
+    api_key: str, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, pool_connections: int = 1
+) -> requests.Session:
+    """Create an authenticated keep-alive session with a sized connection pool.
+
+    Shared by the sync HTTP client and the streamer so streams reuse the
+    connections (and TLS sessions) of regular requests. ``pool_connections``
+    is the number of hosts whose pools are kept (one per routed endpoint).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+    )
+    return session
 
 
 class IOIntelligenceHTTPClient:
@@ -25,46 +75,109 @@ class IOIntelligenceHTTPClient:
         timeout: int = 30,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        rate_limiter: Optional[IOIntelligenceRateLimiter] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        router: Optional[EndpointRouter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         self.api_key = api_key
         self.api_url = api_url
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.rate_limiter = rate_limiter
+        # Spreads requests over several endpoints (``api_url`` is unused then).
+        self.router = router
+        # Fails fast while an endpoint/model is known to be down.
+        self.circuit_breaker = circuit_breaker
+
+        self.session = create_session(
+            api_key, pool_maxsize, pool_connections=len(router) if router else 1
+        )
 
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
+    def _post(self, body: bytes, model: str) -> requests.Response:
+        """POST ``body`` to the API, failing over between routed endpoints."""
+
+        def _send(url: str) -> requests.Response:
+            if self.circuit_breaker is None:
+                return self.session.post(url, data=body, timeout=self.timeout)
+            with self.circuit_breaker.guard(url, model) as call:
+                response = self.session.post(url, data=body, timeout=self.timeout)
+                call.record_status(response.status_code)
+            return response
+
+        if self.router is None:
+            return _send(self.api_url)
+        return self.router.call(
+            _send,
+            is_failure=is_server_error_response,
+            errors=ROUTER_FAILOVER_ERRORS,
+            is_throttled=is_rate_limited_response,
         )
 
-    def post_with_retry(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Post request with automatic retry logic."""
+    def post_with_retry(
+        self,
+        data: Dict[str, Any],
+        timing: Optional[RequestTiming] = None,
+        max_retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Post request with automatic retry logic.
+
+        Args:
+            data: Request body
+            timing: Filled in with the retry count, time to response headers,
+                server-reported timings and the total time
+            max_retries: Override the client's ``max_retries`` for this call
+        """
         last_exception: Optional[IOIntelligenceError] = None
-
-        for attempt in range(self.max_retries + 1):
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        for attempt in range(max_retries + 1):
+            reserved_tokens = self.rate_limiter.acquire(data) if self.rate_limiter else 0
+            settled = False
+            if timing is not None:
+                timing.retries = attempt
             try:
-                response = self.session.post(self.api_url, json=data, timeout=self.timeout)
+                sent = time.perf_counter()
+                response = self._post(codec.dumps(data), str(data.get("model", "")))
+                if timing is not None:
+                    timing.mark_headers(sent + response.elapsed.total_seconds())
 
                 # Handle HTTP errors with detailed classification
                 if not response.ok:
-                    error = classify_api_error(response.status_code, response.text)
-
-                    # Retry on rate limit or server errors
+                    error = classify_api_error(
+                        response.status_code, response.text, response.headers
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.observe(str(data.get("model", "")), error.rate_limit)
+
+                    # Retry on rate limit or server errors, honouring any
+                    # Retry-After / x-ratelimit-reset hint from the server.
                     if isinstance(error, (IOIntelligenceRateLimitError, IOIntelligenceServerError)):
-                        if attempt < self.max_retries:
-                            retry_delay = self.retry_delay * (2**attempt)  # Exponential backoff
-                            if isinstance(error, IOIntelligenceRateLimitError):
-                                retry_delay = max(retry_delay, 60)  # Minimum 60s for rate limits
-
-                            time.sleep(retry_delay)
+                        if attempt < max_retries:
+                            time.sleep(
+                                compute_retry_delay(
+                                    attempt,
+                                    self.retry_delay,
+                                    error.rate_limit,
+                                    is_rate_limit=isinstance(error, IOIntelligenceRateLimitError),
+                                )
+                            )
                             continue
 
                     raise error
 
-                result: Dict[str, Any] = response.json()
+                result: Dict[str, Any] = codec.loads(response.content)
+                if self.rate_limiter:
+                    self.rate_limiter.observe(
+                        str(data.get("model", "")), parse_rate_limit_headers(response.headers)
+                    )
+                    self.rate_limiter.record_usage(data, reserved_tokens, result)
+                    settled = True
+                if timing is not None:
+                    timing.server = parse_server_timing(response.headers, result.get("usage"))
+                    timing.finish()
                 return result
 
             except IOIntelligenceError:
@@ -76,25 +189,29 @@ class IOIntelligenceHTTPClient:
                 last_exception = IOIntelligenceTimeoutError(
                     f"Request timeout after {self.timeout} seconds"
                 )
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * (2**attempt))
+                if attempt < max_retries:
+                    time.sleep(compute_retry_delay(attempt, self.retry_delay))
                     continue
 
             except requests.exceptions.ConnectionError as e:
                 last_exception = IOIntelligenceConnectionError(f"Connection error: {str(e)}")
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * (2**attempt))
+                if attempt < max_retries:
+                    time.sleep(compute_retry_delay(attempt, self.retry_delay))
                     continue
 
             except requests.exceptions.RequestException as e:
                 last_exception = IOIntelligenceError(f"Request failed: {str(e)}")
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * (2**attempt))
+                if attempt < max_retries:
+                    time.sleep(compute_retry_delay(attempt, self.retry_delay))
                     continue
 
             except ValueError as e:  # JSON decode error
                 last_exception = IOIntelligenceError(f"Invalid JSON response: {str(e)}")
                 break  # Don't retry on JSON errors
+            finally:
+                # A failed attempt spent no tokens; the next one reserves anew.
+                if self.rate_limiter and not settled:
+                    self.rate_limiter.refund(data, reserved_tokens)
 
         # If we get here, all retries failed
         raise last_exception or IOIntelligenceError("All retry attempts failed")
@@ -8,7 +8,9 @@ from langchain_core.exceptions import OutputParserException as GenerationError
 from langchain_core.language_models.llms import LLM
 
 from .exceptions import IOIntelligenceError
-from .http_client import IOIntelligenceHTTPClient
+from .client_pool import get_client_pool
+from .http_client import DEFAULT_POOL_MAXSIZE, IOIntelligenceHTTPClient
+from .rate_limit import get_rate_limiter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -35,6 +37,9 @@ class IOIntelligenceLLM(LLM):
     timeout: int = 30
     max_retries: int = 3
     retry_delay: float = 1.0
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    share_clients: bool = False
 
     def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None, **kwargs):
         """Initialize IOIntelligenceLLM.
@@ -48,6 +53,10 @@ class IOIntelligenceLLM(LLM):
             timeout: Request timeout in seconds (default: 30)
             max_retries: Maximum number of retries (default: 3)
             retry_delay: Initial retry delay in seconds (default: 1.0)
+            requests_per_minute: Client-side request budget, shared per API key (default: None)
+            tokens_per_minute: Client-side token budget, shared per API key (default: None)
+            share_clients: Use the process-wide client pool, sharing the HTTP
+                session with chat models of the same settings (default: False)
         """
         # Extract and set API credentials
         api_key = api_key or os.getenv("IO_API_KEY")
@@ -79,13 +88,35 @@ class IOIntelligenceLLM(LLM):
     def http_client(self):
         """Get or create HTTP client."""
         if self._http_client is None:
-            self._http_client = IOIntelligenceHTTPClient(
-                api_key=self.io_api_key,
-                api_url=self.io_api_url,
-                timeout=self.timeout,
-                max_retries=self.max_retries,
-                retry_delay=self.retry_delay,
-            )
+
+            def _factory() -> IOIntelligenceHTTPClient:
+                return IOIntelligenceHTTPClient(
+                    api_key=self.io_api_key,
+                    api_url=self.io_api_url,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                    retry_delay=self.retry_delay,
+                    rate_limiter=get_rate_limiter(
+                        self.io_api_key, self.requests_per_minute, self.tokens_per_minute
+                    ),
+                )
+
+            if self.share_clients:
+                # Same settings keys as IOIntelligenceChatModel, so an LLM and
+                # a chat model configured alike share one session.
+                settings = {
+                    "api_key": self.io_api_key,
+                    "api_url": self.io_api_url,
+                    "timeout": self.timeout,
+                    "max_retries": self.max_retries,
+                    "retry_delay": self.retry_delay,
+                    "requests_per_minute": self.requests_per_minute,
+                    "tokens_per_minute": self.tokens_per_minute,
+                    "pool_maxsize": DEFAULT_POOL_MAXSIZE,
+                }
+                self._http_client = get_client_pool().get("http", settings, _factory)
+            else:
+                self._http_client = _factory()
         return self._http_client
 
     def _call(
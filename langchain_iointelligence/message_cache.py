@@ -0,0 +1,113 @@
+"""Memoised conversion of LangChain messages to the API wire format.
+
+Every request re-sends the whole conversation, so without a cache each
+call converts every prior message again (including a ``json.dumps`` of
+every earlier tool call's arguments), which is O(n) per step and O(n^2)
+over an agent run. :class:`MessageSerializationCache` converts each
+message object once and hands back the same dict (and, on request, the
+same encoded JSON bytes) until the message is garbage collected.
+
+Messages are treated as immutable: a message mutated after it was sent
+must be dropped with :meth:`MessageSerializationCache.invalidate`.
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from . import codec
+
+_Entry = Tuple["weakref.ref[BaseMessage]", Dict[str, Any], Optional[bytes]]
+
+
+class MessageSerializationCache:
+    """Cache wire-format dicts per message object.
+
+    Entries are keyed on object identity and removed when the message is
+    garbage collected, so the cache never keeps a conversation alive. One
+    instance may be shared by several models and threads.
+
+    Args:
+        convert: Message -> wire dict function (defaults to the chat
+            model's converter)
+    """
+
+    def __init__(
+        self, convert: Optional[Callable[[BaseMessage], Dict[str, Any]]] = None
+    ):
+        if convert is None:
+            # Imported lazily: chat.py imports this module.
+            from .chat import _convert_message_to_dict
+
+            convert = _convert_message_to_dict
+        self._convert = convert
+        self._entries: Dict[int, _Entry] = {}
+        # Re-entrant: a weakref callback may fire (and take the lock) while
+        # this thread is already holding it.
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, message: BaseMessage) -> Optional[_Entry]:
+        entry = self._entries.get(id(message))
+        if entry is not None and entry[0]() is message:
+            return entry
+        return None
+
+    def _store(
+        self, message: BaseMessage, converted: Dict[str, Any], encoded: Optional[bytes]
+    ) -> None:
+        key = id(message)
+        entries = self._entries
+
+        def _discard(ref: "weakref.ref[BaseMessage]") -> None:
+            with self._lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] is ref:
+                    del entries[key]
+
+        with self._lock:
+            entries[key] = (weakref.ref(message, _discard), converted, encoded)
+
+    def convert(self, message: BaseMessage) -> Dict[str, Any]:
+        """Return the wire dict of ``message`` (shared - do not mutate it)."""
+        entry = self._lookup(message)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        converted = self._convert(message)
+        self._store(message, converted, None)
+        return converted
+
+    def convert_all(self, messages: Sequence[BaseMessage]) -> List[Dict[str, Any]]:
+        """Convert a conversation; only messages not seen before are converted."""
+        return [self.convert(message) for message in messages]
+
+    def encode(self, message: BaseMessage) -> bytes:
+        """Return the JSON encoding of ``message``'s wire dict (memoised)."""
+        entry = self._lookup(message)
+        if entry is not None and entry[2] is not None:
+            self.hits += 1
+            return entry[2]
+        converted = entry[1] if entry is not None else self.convert(message)
+        encoded = codec.dumps(converted)
+        self._store(message, converted, encoded)
+        return encoded
+
+    def encode_all(self, messages: Sequence[BaseMessage]) -> bytes:
+        """Return the JSON array of a conversation, splicing cached encodings."""
+        return b"[" + b",".join(self.encode(message) for message in messages) + b"]"
+
+    def invalidate(self, message: Optional[BaseMessage] = None) -> None:
+        """Drop ``message`` (after mutating it), or everything if None."""
+        with self._lock:
+            if message is None:
+                self._entries.clear()
+            elif self._lookup(message) is not None:
+                del self._entries[id(message)]
@@ -0,0 +1,258 @@
+"""Client-side token-bucket rate limiting for io Intelligence API requests.
+
+The HTTP clients only learn about quota exhaustion from an HTTP 429. A
+:class:`IOIntelligenceRateLimiter` paces requests *before* they are sent,
+using a requests-per-minute and a tokens-per-minute bucket per model. One
+limiter is shared per API key (see :func:`get_rate_limiter`) so the sync
+client, the async client and the streamer draw from the same budget.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .retry import RateLimitInfo
+
+# Rough characters-per-token ratio used to estimate prompt size up front.
+_CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """A token bucket that hands out reservations instead of blocking.
+
+    :meth:`reserve` always deducts the requested amount, up to ``capacity``
+    (the balance may go negative), and returns how long the caller must
+    wait before the reservation is covered. This lets sync and async
+    callers share a bucket without holding a lock while they sleep.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available (negative while reservations are owed)."""
+        self._refill()
+        return self._tokens
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Deduct ``amount`` and return the wait (seconds) until it is covered."""
+        self._refill()
+        # A single request larger than the bucket would otherwise never fit.
+        amount = min(float(amount), self.capacity)
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.refill_per_second
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens from an earlier reservation."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+def estimate_request_tokens(data: Dict[str, Any]) -> int:
+    """Estimate the tokens a chat request will consume (prompt + completion).
+
+    Uses a characters-per-token heuristic over message text; the estimate is
+    reconciled against the real ``usage`` once the response arrives.
+    """
+    chars = 0
+    for message in data.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and isinstance(block.get("text"), str):
+                    chars += len(block["text"])
+    prompt_tokens = chars // _CHARS_PER_TOKEN + 1
+    return prompt_tokens + int(data.get("max_tokens") or 0)
+
+
+class IOIntelligenceRateLimiter:
+    """Requests/min and tokens/min buckets, tracked separately per model."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget per model (``None`` = unlimited)
+            tokens_per_minute: Token budget per model (``None`` = unlimited)
+            clock: Monotonic clock, injectable for tests
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._paused_until: Dict[str, float] = {}
+
+    def _model_buckets(self, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            request_bucket = (
+                TokenBucket(self.requests_per_minute, self.requests_per_minute / 60.0, self._clock)
+                if self.requests_per_minute
+                else None
+            )
+            token_bucket = (
+                TokenBucket(self.tokens_per_minute, self.tokens_per_minute / 60.0, self._clock)
+                if self.tokens_per_minute
+                else None
+            )
+            buckets = (request_bucket, token_bucket)
+            self._buckets[model] = buckets
+        return buckets
+
+    def reserve(self, model: str, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` for ``model``; return the wait in seconds."""
+        return self._reserve(model, tokens)[0]
+
+    def _reserve(self, model: str, tokens: int) -> Tuple[float, int]:
+        """Like :meth:`reserve`, also returning the tokens actually deducted.
+
+        A request larger than the token bucket is clipped to its capacity,
+        so that is all a later :meth:`reconcile` may refund or top up.
+        """
+        with self._lock:
+            request_bucket, token_bucket = self._model_buckets(model)
+            wait = request_bucket.reserve(1) if request_bucket else 0.0
+            if token_bucket and tokens:
+                tokens = min(tokens, int(token_bucket.capacity))
+                wait = max(wait, token_bucket.reserve(tokens))
+            else:
+                tokens = 0
+            paused_until = self._paused_until.get(model)
+            if paused_until is not None:
+                wait = max(wait, paused_until - self._clock())
+            return wait, tokens
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Hold back every request for ``model`` for the next ``seconds``."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            until = self._clock() + seconds
+            self._paused_until[model] = max(self._paused_until.get(model, 0.0), until)
+
+    def observe(self, model: str, rate_limit: RateLimitInfo) -> None:
+        """Feed server rate-limit hints back into the limiter.
+
+        A ``Retry-After`` or an exhausted ``x-ratelimit-remaining-*`` budget
+        pauses the model until the server's reset time, so other callers
+        sharing this limiter wait instead of collecting their own 429s.
+        """
+        if rate_limit.retry_after is not None or rate_limit.exhausted:
+            delay = rate_limit.suggested_delay
+            if delay:
+                self.pause(model, delay)
+
+    def reconcile(self, model: str, reserved_tokens: int, used_tokens: int) -> None:
+        """Adjust the token bucket once the real usage of a request is known."""
+        with self._lock:
+            _, token_bucket = self._model_buckets(model)
+            if token_bucket is None:
+                return
+            if used_tokens < reserved_tokens:
+                token_bucket.refund(reserved_tokens - used_tokens)
+            elif used_tokens > reserved_tokens:
+                token_bucket.reserve(used_tokens - reserved_tokens)
+
+    def acquire(self, data: Dict[str, Any]) -> int:
+        """Block until ``data`` may be sent; return the tokens reserved for it.
+
+        Pass the returned count to :meth:`record_usage` once the response
+        arrives, or to :meth:`refund` if the attempt failed.
+        """
+        tokens = estimate_request_tokens(data) if self.tokens_per_minute else 0
+        wait, tokens = self._reserve(str(data.get("model", "")), tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            except BaseException:
+                self.refund(data, tokens)
+                raise
+        return tokens
+
+    async def aacquire(self, data: Dict[str, Any]) -> int:
+        """Async variant of :meth:`acquire`."""
+        tokens = estimate_request_tokens(data) if self.tokens_per_minute else 0
+        wait, tokens = self._reserve(str(data.get("model", "")), tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:  # Cancelled while waiting: nothing was sent.
+                self.refund(data, tokens)
+                raise
+        return tokens
+
+    def refund(self, data: Dict[str, Any], reserved_tokens: int) -> None:
+        """Give back the tokens of an attempt that got no successful response.
+
+        The request itself still counts against the requests-per-minute
+        budget: the server saw it.
+        """
+        if reserved_tokens:
+            self.reconcile(str(data.get("model", "")), reserved_tokens, 0)
+
+    def record_usage(self, data: Dict[str, Any], reserved_tokens: int, response: Dict[str, Any]) -> None:
+        """Reconcile a reservation against the ``usage`` block of a response."""
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if not reserved_tokens or not isinstance(usage, dict):
+            return
+        used = usage.get("total_tokens")
+        if isinstance(used, int):
+            self.reconcile(str(data.get("model", "")), reserved_tokens, used)
+
+
+_registry: Dict[Tuple[str, Optional[float], Optional[float]], IOIntelligenceRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    api_key: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+) -> Optional[IOIntelligenceRateLimiter]:
+    """Return the process-wide limiter for ``api_key`` (``None`` if no limits are set).
+
+    Every client configured with the same key and limits shares one limiter,
+    so concurrent sync, async and streaming callers pace against a single
+    budget.
+    """
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    key_digest = hashlib.sha256(api_key.encode()).hexdigest()
+    registry_key = (key_digest, requests_per_minute, tokens_per_minute)
+    with _registry_lock:
+        limiter = _registry.get(registry_key)
+        if limiter is None:
+            limiter = IOIntelligenceRateLimiter(requests_per_minute, tokens_per_minute)
+            _registry[registry_key] = limiter
+        return limiter
@@ -0,0 +1,229 @@
+"""Opt-in resumption of streams that drop mid-generation.
+
+When an SSE connection breaks after chunks have been yielded, the stream
+is re-issued and stitched onto what the caller already has:
+
+* ``"continue"`` sends the text received so far back as a trailing
+  assistant message and asks the server to continue it
+  (``continue_final_message``, as supported by vLLM-style servers), so only
+  the missing tokens are generated;
+* ``"restart"`` re-sends the original request and drops the prefix of the
+  new stream that was already emitted.
+
+A ``"continue"`` resume falls back to a restart once tool-call deltas have
+been emitted, since a partial tool call cannot be expressed as a prefix.
+Either way the caller sees one uninterrupted stream of raw chunk dicts.
+
+A restart only reproduces the emitted prefix when sampling is
+deterministic (``temperature=0`` or a fixed ``seed``). The replayed prefix
+is compared with what was already emitted, and a restarted stream that
+diverges raises :class:`~.exceptions.IOIntelligenceInvalidResponseError`
+instead of splicing two different completions together.
+"""
+
+import copy
+import logging
+from typing import (Any, AsyncIterator, Callable, Dict, Iterator, Optional,
+                    Set)
+
+from .exceptions import (IOIntelligenceConnectionError,
+                         IOIntelligenceInvalidResponseError,
+                         IOIntelligenceTimeoutError)
+
+logger = logging.getLogger(__name__)
+
+RESUME_MODES = ("continue", "restart")
+
+# Failures that mean "the link dropped", as opposed to an API error.
+RESUMABLE_ERRORS = (IOIntelligenceConnectionError, IOIntelligenceTimeoutError)
+
+
+class StreamResumeState:
+    """Track what a stream has emitted and deduplicate a re-issued stream."""
+
+    def __init__(self, mode: str = "continue"):
+        if mode not in RESUME_MODES:
+            raise ValueError(
+                f"Unsupported resume mode '{mode}'. Expected one of {RESUME_MODES}."
+            )
+        self.mode = mode
+        self.content = ""
+        self.tool_arguments: Dict[int, str] = {}
+        self._tool_headers: Set[int] = set()
+        self.finished = False
+        self.resumes = 0
+        # Position reached in the current attempt's output (restart mode).
+        self._replayed_content = 0
+        self._replayed_arguments: Dict[int, int] = {}
+        self._skip_replay = False
+
+    def next_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the payload for the next attempt and reset replay tracking."""
+        self._replayed_content = 0
+        self._replayed_arguments = {}
+        if (
+            self.mode == "continue"
+            and self.content
+            and not self.tool_arguments
+            and not self._tool_headers
+        ):
+            # The continuation only produces new tokens; nothing to skip.
+            self._skip_replay = True
+            request = copy.copy(data)
+            request["messages"] = list(data.get("messages", [])) + [
+                {"role": "assistant", "content": self.content}
+            ]
+            request["continue_final_message"] = True
+            request["add_generation_prompt"] = False
+            return request
+        self._skip_replay = False
+        return data
+
+    def accept(self, chunk: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record ``chunk`` and return it minus any already-emitted deltas.
+
+        Returns ``None`` when nothing new is left in the chunk.
+        """
+        choices = chunk.get("choices") or []
+        if not choices:
+            # Usage-only (or empty) chunk - always passed through.
+            return chunk
+        choice = choices[0]
+        delta = choice.get("delta") or {}
+        new_delta: Dict[str, Any] = {
+            k: v for k, v in delta.items() if k not in ("content", "tool_calls")
+        }
+
+        content = delta.get("content") or ""
+        if content:
+            content = self._new_content(content)
+            if content:
+                self.content += content
+                new_delta["content"] = content
+
+        tool_calls = []
+        for raw_tool_call in delta.get("tool_calls") or []:
+            tool_call = self._new_tool_call(raw_tool_call)
+            if tool_call is not None:
+                tool_calls.append(tool_call)
+        if tool_calls:
+            new_delta["tool_calls"] = tool_calls
+
+        finish_reason = choice.get("finish_reason")
+        if finish_reason:
+            self.finished = True
+        if not content and not tool_calls and not finish_reason:
+            if delta.get("content") or delta.get("tool_calls"):
+                return None
+        if new_delta == delta:
+            return chunk
+        new_chunk = dict(chunk)
+        new_chunk["choices"] = [dict(choice, delta=new_delta)] + choices[1:]
+        return new_chunk
+
+    def _new_content(self, content: str) -> str:
+        """Drop the part of ``content`` that repeats already-emitted text."""
+        if self._skip_replay:
+            return content
+        start = self._replayed_content
+        self._replayed_content += len(content)
+        already = len(self.content) - start
+        if already <= 0:
+            return content
+        _check_replay(self.content[start:start + len(content)], content[:already])
+        return content[already:]
+
+    def _new_tool_call(self, raw_tool_call: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Deduplicate one tool-call delta; ``None`` if it carries nothing new."""
+        index = raw_tool_call.get("index", 0)
+        tool_call = dict(raw_tool_call)
+        function = dict(tool_call.get("function") or {})
+        if index in self._tool_headers:
+            # id/name were already emitted for this tool call.
+            tool_call.pop("id", None)
+            tool_call.pop("type", None)
+            function.pop("name", None)
+        elif tool_call.get("id") or function.get("name"):
+            self._tool_headers.add(index)
+
+        arguments = function.get("arguments") or ""
+        if arguments:
+            emitted = self.tool_arguments.get(index, "")
+            start = self._replayed_arguments.get(index, 0)
+            self._replayed_arguments[index] = start + len(arguments)
+            already = len(emitted) - start
+            if already > 0:
+                _check_replay(emitted[start:start + len(arguments)], arguments[:already])
+                arguments = arguments[already:]
+            self.tool_arguments[index] = emitted + arguments
+        if arguments:
+            function["arguments"] = arguments
+        else:
+            function.pop("arguments", None)
+        if function:
+            tool_call["function"] = function
+        else:
+            tool_call.pop("function", None)
+        if set(tool_call) <= {"index"}:
+            return None
+        return tool_call
+
+
+def _check_replay(emitted: str, replayed: str) -> None:
+    """Fail if a restarted stream does not repeat the emitted text."""
+    if replayed != emitted:
+        raise IOIntelligenceInvalidResponseError(
+            "Restarted stream diverged from the text already emitted; "
+            "stream_resume='restart' needs deterministic sampling "
+            "(temperature=0 or a seed)"
+        )
+
+
+def resumable_stream(
+    open_stream: Callable[[Dict[str, Any]], Iterator[Dict[str, Any]]],
+    data: Dict[str, Any],
+    mode: str = "continue",
+    max_resumes: int = 2,
+) -> Iterator[Dict[str, Any]]:
+    """Yield raw chunk dicts from ``open_stream``, resuming after disconnects."""
+    state = StreamResumeState(mode)
+    while True:
+        try:
+            for chunk in open_stream(state.next_request(data)):
+                new_chunk = state.accept(chunk)
+                if new_chunk is not None:
+                    yield new_chunk
+            return
+        except RESUMABLE_ERRORS as exc:
+            if state.finished or state.resumes >= max_resumes:
+                raise
+            state.resumes += 1
+            logger.warning(
+                "Stream dropped after %d chars (%s); resuming (%s, attempt %d)",
+                len(state.content), exc, state.mode, state.resumes,
+            )
+
+
+async def aresumable_stream(
+    open_stream: Callable[[Dict[str, Any]], AsyncIterator[Dict[str, Any]]],
+    data: Dict[str, Any],
+    mode: str = "continue",
+    max_resumes: int = 2,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of :func:`resumable_stream`."""
+    state = StreamResumeState(mode)
+    while True:
+        try:
+            async for chunk in open_stream(state.next_request(data)):
+                new_chunk = state.accept(chunk)
+                if new_chunk is not None:
+                    yield new_chunk
+            return
+        except RESUMABLE_ERRORS as exc:
+            if state.finished or state.resumes >= max_resumes:
+                raise
+            state.resumes += 1
+            logger.warning(
+                "Stream dropped after %d chars (%s); resuming (%s, attempt %d)",
+                len(state.content), exc, state.mode, state.resumes,
+            )
@@ -0,0 +1,181 @@
+"""Retry scheduling shared by the sync and async HTTP clients.
+
+Parses the server's rate-limit hints (``Retry-After``,
+``x-ratelimit-reset-*``, ``x-ratelimit-remaining-*``) and turns them, or a
+jittered exponential backoff when there are none, into a retry delay.
+"""
+
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+# Fallback wait for an HTTP 429 that carries no rate-limit headers at all.
+RATE_LIMIT_FALLBACK_DELAY = 60.0
+
+# Fraction of a server-provided delay added as random jitter, so clients that
+# were throttled together do not all retry in the same instant.
+SERVER_DELAY_JITTER = 0.1
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Reset values larger than this are treated as a unix timestamp, not a delta.
+_EPOCH_THRESHOLD = 10**9
+
+
+class RateLimitInfo:
+    """Rate-limit hints extracted from a response's headers.
+
+    All durations are in seconds from the time the response was received;
+    any field the server did not send is ``None``.
+    """
+
+    __slots__ = (
+        "retry_after",
+        "reset_requests",
+        "reset_tokens",
+        "remaining_requests",
+        "remaining_tokens",
+    )
+
+    def __init__(
+        self,
+        retry_after: Optional[float] = None,
+        reset_requests: Optional[float] = None,
+        reset_tokens: Optional[float] = None,
+        remaining_requests: Optional[int] = None,
+        remaining_tokens: Optional[int] = None,
+    ):
+        self.retry_after = retry_after
+        self.reset_requests = reset_requests
+        self.reset_tokens = reset_tokens
+        self.remaining_requests = remaining_requests
+        self.remaining_tokens = remaining_tokens
+
+    @property
+    def suggested_delay(self) -> Optional[float]:
+        """How long the server asked us to wait, or ``None`` if it gave no hint.
+
+        ``Retry-After`` wins; otherwise the reset time of whichever budget is
+        exhausted (or the later of both resets if neither remaining count is
+        known).
+        """
+        if self.retry_after is not None:
+            return self.retry_after
+        exhausted = []
+        if self.remaining_requests == 0 and self.reset_requests is not None:
+            exhausted.append(self.reset_requests)
+        if self.remaining_tokens == 0 and self.reset_tokens is not None:
+            exhausted.append(self.reset_tokens)
+        if exhausted:
+            return max(exhausted)
+        resets = [r for r in (self.reset_requests, self.reset_tokens) if r is not None]
+        return max(resets) if resets else None
+
+    @property
+    def exhausted(self) -> bool:
+        """True if the server reports a budget with nothing remaining."""
+        return self.remaining_requests == 0 or self.remaining_tokens == 0
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RateLimitInfo({fields})"
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse ``"2"``, ``"1.5s"``, ``"20ms"``, ``"6m0s"`` or an epoch into seconds."""
+    value = value.strip().lower()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if not parts or "".join(n + u for n, u in parts) != value:
+            return None
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    if seconds > _EPOCH_THRESHOLD:
+        seconds -= time.time()
+    return max(seconds, 0.0)
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parse a ``Retry-After`` value (delta-seconds or an HTTP-date)."""
+    seconds = _parse_duration(value)
+    if seconds is not None:
+        return seconds
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(float(value.strip()))
+    except ValueError:
+        return None
+
+
+def parse_rate_limit_headers(headers: Optional[Mapping[str, Any]]) -> RateLimitInfo:
+    """Extract :class:`RateLimitInfo` from response headers (case-insensitive)."""
+    if not headers:
+        return RateLimitInfo()
+    lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+
+    def _duration(name: str) -> Optional[float]:
+        value = lowered.get(name)
+        return _parse_duration(value) if value is not None else None
+
+    retry_after: Optional[float] = None
+    if "retry-after-ms" in lowered:
+        millis = _parse_int(lowered["retry-after-ms"])
+        retry_after = millis / 1000.0 if millis is not None else None
+    if retry_after is None and "retry-after" in lowered:
+        retry_after = _parse_retry_after(lowered["retry-after"])
+
+    return RateLimitInfo(
+        retry_after=retry_after,
+        reset_requests=_duration("x-ratelimit-reset-requests") or _duration("x-ratelimit-reset"),
+        reset_tokens=_duration("x-ratelimit-reset-tokens"),
+        remaining_requests=_parse_int(
+            lowered.get("x-ratelimit-remaining-requests", lowered.get("x-ratelimit-remaining"))
+        ),
+        remaining_tokens=_parse_int(lowered.get("x-ratelimit-remaining-tokens")),
+    )
+
+
+def compute_retry_delay(
+    attempt: int,
+    base_delay: float,
+    rate_limit: Optional[RateLimitInfo] = None,
+    *,
+    is_rate_limit: bool = False,
+) -> float:
+    """Return how long to sleep before retry number ``attempt + 1``.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed.
+        base_delay: The client's initial ``retry_delay``.
+        rate_limit: Hints parsed from the failed response, if any.
+        is_rate_limit: Whether the failure was an HTTP 429.
+
+    Returns:
+        The server's suggested delay plus up to 10% jitter when one was sent;
+        otherwise exponential backoff with jitter (floored at
+        :data:`RATE_LIMIT_FALLBACK_DELAY` for a 429 without hints).
+    """
+    suggested = rate_limit.suggested_delay if rate_limit is not None else None
+    if suggested is not None:
+        return suggested + random.uniform(0, suggested * SERVER_DELAY_JITTER)
+    backoff = base_delay * (2**attempt)
+    # "Equal jitter": keep at least half the backoff, randomise the rest.
+    delay = backoff / 2 + random.uniform(0, backoff / 2)
+    if is_rate_limit:
+        delay = max(delay, RATE_LIMIT_FALLBACK_DELAY)
+    return float(delay)
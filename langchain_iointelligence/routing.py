@@ -0,0 +1,278 @@
+"""Latency-aware routing of requests over several API endpoints.
+
+A model normally talks to one ``api_url``. Given several OpenAI-compatible
+endpoints (regions, self-hosted gateways), an :class:`EndpointRouter`
+picks one per request and fails over to the next on connection errors,
+timeouts and 5xx responses, so one unhealthy endpoint costs a single
+extra round trip instead of a series of retry sleeps.
+
+Selection prefers healthy endpoints and, among them, the lowest
+``EWMA latency x (outstanding requests + 1)`` - fast endpoints get more
+traffic, but never so much that requests queue up behind each other.
+Endpoints that have not answered yet are scored with the mean latency of
+the measured ones; ties go to the endpoint with fewer requests in flight,
+then to the unmeasured one, so a cold burst spreads over every endpoint. An
+endpoint that fails ``failure_threshold`` times in a row is skipped for
+``cooldown`` seconds, then gets traffic again. Rate-limit rejections (429)
+are not failed over - the client honours their Retry-After - but they
+count as failures and stay out of the latency average.
+
+The router only decides where a request goes; retries with backoff, once
+every endpoint has failed, stay with the HTTP clients.
+"""
+
+import threading
+import time
+from typing import (Any, Awaitable, Callable, Dict, List, Optional, Sequence,
+                    Tuple, Type, TypeVar)
+
+R = TypeVar("R")
+
+
+def resolve_api_url(url: str) -> str:
+    """Turn a base URL into the chat completions URL (full URLs pass through)."""
+    url = url.rstrip("/")
+    if url.endswith("/chat/completions"):
+        return url
+    if url.endswith("/v1"):
+        return f"{url}/chat/completions"
+    return f"{url}/v1/chat/completions"
+
+
+class Endpoint:
+    """Health and latency statistics of one endpoint.
+
+    Attributes:
+        url: Chat completions URL
+        ewma_ms: Smoothed latency of successful requests (None until one
+            has completed)
+        outstanding: Requests currently in flight
+        failures: Consecutive failures
+        unavailable_until: ``time.monotonic()`` before which the endpoint
+            is skipped
+    """
+
+    __slots__ = ("url", "ewma_ms", "outstanding", "failures", "unavailable_until")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ewma_ms: Optional[float] = None
+        self.outstanding = 0
+        self.failures = 0
+        self.unavailable_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.unavailable_until
+
+    def score(self, default_ms: float = 0.0) -> float:
+        """Expected cost of one more request (``default_ms`` if unmeasured)."""
+        ewma_ms = default_ms if self.ewma_ms is None else self.ewma_ms
+        return ewma_ms * (self.outstanding + 1)
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint(url={self.url!r}, ewma_ms={self.ewma_ms}, "
+            f"outstanding={self.outstanding}, failures={self.failures})"
+        )
+
+
+class EndpointRouter:
+    """Pick an endpoint per request and fail over between endpoints.
+
+    Shared by a model's sync client, async client and streamer, so all of
+    them see the same health and latency data.
+
+    Args:
+        urls: Chat completions URLs (or base URLs), in order of preference
+            for ties
+        ewma_alpha: Weight of the newest latency sample
+        failure_threshold: Consecutive failures that take an endpoint out
+            of rotation
+        cooldown: Seconds an endpoint stays out of rotation
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 2,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError("EndpointRouter needs at least one endpoint URL")
+        self.endpoints = [Endpoint(resolve_api_url(url)) for url in urls]
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def select(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """Reserve the best endpoint not in ``exclude``.
+
+        Endpoints out of rotation are used only when nothing else is left,
+        the one coming back soonest first. Every selection must be paired
+        with :meth:`release`.
+        """
+        now = self._clock()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+            available = [e for e in candidates if e.is_available(now)]
+            if available:
+                measured = [e.ewma_ms for e in self.endpoints if e.ewma_ms is not None]
+                default_ms = sum(measured) / len(measured) if measured else 0.0
+                endpoint = min(
+                    available,
+                    key=lambda e: (e.score(default_ms), e.outstanding, e.ewma_ms is not None),
+                )
+            else:
+                endpoint = min(candidates, key=lambda e: e.unavailable_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(
+        self, endpoint: Endpoint, latency: Optional[float] = None, failed: bool = False
+    ) -> None:
+        """Finish a request on ``endpoint``.
+
+        Args:
+            endpoint: The endpoint returned by :meth:`select`
+            latency: Seconds the request took (successful requests)
+            failed: Count the request as an endpoint failure
+        """
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if failed:
+                endpoint.failures += 1
+                if endpoint.failures >= self.failure_threshold:
+                    endpoint.unavailable_until = self._clock() + self.cooldown
+                return
+            endpoint.failures = 0
+            endpoint.unavailable_until = 0.0
+            if latency is not None:
+                sample = latency * 1000.0
+                if endpoint.ewma_ms is None:
+                    endpoint.ewma_ms = sample
+                else:
+                    endpoint.ewma_ms += self.ewma_alpha * (sample - endpoint.ewma_ms)
+
+    def _can_fail_over(self, tried: Sequence[Endpoint]) -> bool:
+        now = self._clock()
+        with self._lock:
+            return any(
+                e not in tried and e.is_available(now) for e in self.endpoints
+            )
+
+    def call(
+        self,
+        send: Callable[[str], R],
+        is_failure: Callable[[R], bool],
+        errors: Tuple[Type[BaseException], ...],
+        discard: Optional[Callable[[R], Any]] = None,
+        is_throttled: Optional[Callable[[R], bool]] = None,
+    ) -> R:
+        """Run ``send(url)``, failing over to other endpoints.
+
+        Args:
+            send: Performs the request against a URL
+            is_failure: Whether a response counts as an endpoint failure
+                (e.g. a 5xx status)
+            errors: Transport exceptions that count as endpoint failures
+            discard: Releases a failed response before failing over
+            is_throttled: Whether a response is a rate-limit rejection
+                (e.g. a 429); it is returned to the caller, which honours
+                its Retry-After, but counts against the endpoint and never
+                feeds its latency into the EWMA
+
+        Returns:
+            The first non-failure response, or the last failure response
+            once no endpoint is left; transport errors of the last
+            endpoint are raised.
+        """
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self.select(exclude=tried)
+            tried.append(endpoint)
+            started = time.perf_counter()
+            try:
+                response = send(endpoint.url)
+            except errors:
+                self.release(endpoint, failed=True)
+                if self._can_fail_over(tried):
+                    continue
+                raise
+            except BaseException:
+                self.release(endpoint)
+                raise
+            if is_failure(response):
+                self.release(endpoint, failed=True)
+                if self._can_fail_over(tried):
+                    if discard is not None:
+                        discard(response)
+                    continue
+                return response
+            if is_throttled is not None and is_throttled(response):
+                self.release(endpoint, failed=True)
+                return response
+            self.release(endpoint, time.perf_counter() - started)
+            return response
+
+    async def acall(
+        self,
+        send: Callable[[str], Awaitable[R]],
+        is_failure: Callable[[R], bool],
+        errors: Tuple[Type[BaseException], ...],
+        discard: Optional[Callable[[R], Awaitable[Any]]] = None,
+        is_throttled: Optional[Callable[[R], bool]] = None,
+    ) -> R:
+        """Async counterpart of :meth:`call`."""
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self.select(exclude=tried)
+            tried.append(endpoint)
+            started = time.perf_counter()
+            try:
+                response = await send(endpoint.url)
+            except errors:
+                self.release(endpoint, failed=True)
+                if self._can_fail_over(tried):
+                    continue
+                raise
+            except BaseException:
+                self.release(endpoint)
+                raise
+            if is_failure(response):
+                self.release(endpoint, failed=True)
+                if self._can_fail_over(tried):
+                    if discard is not None:
+                        await discard(response)
+                    continue
+                return response
+            if is_throttled is not None and is_throttled(response):
+                self.release(endpoint, failed=True)
+                return response
+            self.release(endpoint, time.perf_counter() - started)
+            return response
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Snapshot of every endpoint's statistics, e.g. for dashboards."""
+        now = self._clock()
+        with self._lock:
+            return [
+                {
+                    "url": e.url,
+                    "ewma_ms": e.ewma_ms,
+                    "outstanding": e.outstanding,
+                    "failures": e.failures,
+                    "available": e.is_available(now),
+                }
+                for e in self.endpoints
+            ]
@@ -0,0 +1,249 @@
+"""Incremental Server-Sent Events parser working on raw bytes.
+
+Shared by the sync streamer and the async client. Network chunks are
+appended to one ``bytearray`` and complete events are cut out of it with
+C-level ``bytes`` searches and splits, so no line is ever decoded to
+``str``; each event's ``data`` comes out as ``bytes`` ready for the JSON
+codec.
+
+Parsing follows the WHATWG "event stream interpretation" rules:
+
+* lines end with CRLF, LF or CR (a CRLF split across chunks is handled);
+* a leading UTF-8 BOM is ignored;
+* lines starting with ``:`` are comments;
+* one space after the field colon is stripped;
+* consecutive ``data:`` lines are joined with ``\\n``;
+* ``event:``, ``id:`` (unless it contains NUL) and ``retry:`` (digits only)
+  are tracked; unknown fields are ignored;
+* a blank line dispatches the event, and an event without data is dropped;
+* an unterminated event at end of stream is discarded.
+"""
+
+from typing import (Any, AsyncIterable, AsyncIterator, Iterable, Iterator,
+                    List, Optional)
+
+_LF = 0x0A
+_COLON = 0x3A
+_BOM = b"\xef\xbb\xbf"
+
+DONE_SENTINEL = b"[DONE]"
+
+
+class SSEEvent:
+    """One dispatched event. ``data`` is raw bytes (UTF-8 per the spec)."""
+
+    __slots__ = ("data", "event", "id", "retry")
+
+    def __init__(
+        self,
+        data: bytes,
+        event: str = "message",
+        id: Optional[str] = None,
+        retry: Optional[int] = None,
+    ):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, id={self.id!r}, data={self.data!r})"
+
+
+class SSEParser:
+    """Feed raw byte chunks, get back the events they complete.
+
+    Streams using LF line endings (the norm) take a fast path: complete
+    events are cut off the buffer at the last blank line and split with
+    C-level ``bytes`` operations, and a single-line ``data:`` event is
+    sliced out without any per-line parsing. Once a CR is seen the parser
+    switches to line-by-line processing for the rest of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._pending: List[bytes] = []  # LF mode: unparsed tail, unjoined
+        self._buffer = bytearray()  # CR mode: unparsed tail
+        self._bom_prefix = b""
+        self._data: List[bytes] = []
+        self._event_type: Optional[bytes] = None
+        self._cr_mode = False
+        self._skip_lf = False
+        self._at_start = True
+        self.last_event_id: Optional[str] = None
+        self.retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Consume ``chunk`` and return every event it completes."""
+        return self._feed(chunk, False)
+
+    def feed_data(self, chunk: bytes) -> List[bytes]:
+        """Like :meth:`feed`, but return only each event's ``data``.
+
+        Skips building :class:`SSEEvent` objects; this is what the chat
+        streams use.
+        """
+        return self._feed(chunk, True)
+
+    def _feed(self, chunk: bytes, data_only: bool) -> List[Any]:
+        if self._at_start:
+            chunk = self._strip_bom(chunk)
+            if not chunk:
+                return []
+        if not self._cr_mode and b"\r" in chunk:
+            self._cr_mode = True
+            self._buffer += b"".join(self._pending)
+            self._pending = []
+        if self._cr_mode:
+            self._buffer += chunk
+            return self._feed_lines(data_only)
+
+        # LF-only fast path.
+        pending = self._pending
+        if pending:
+            if b"\n" not in chunk:
+                # Cannot complete an event; defer the join so that a large
+                # event arriving in small reads stays linear.
+                pending.append(chunk)
+                return []
+            pending.append(chunk)
+            chunk = b"".join(pending)
+            pending.clear()
+        cut = chunk.rfind(b"\n\n")
+        if cut == -1:
+            pending.append(chunk)
+            return []
+        if cut + 2 < len(chunk):
+            pending.append(chunk[cut + 2:])
+        elif data_only and chunk.startswith(b"data: ") and chunk.find(b"\n", 6) == cut:
+            # One read carrying exactly one single-line event: the usual
+            # shape of a token stream.
+            return [chunk[6:cut]]
+        return self._parse_blocks(chunk[:cut], data_only)
+
+    def _strip_bom(self, chunk: bytes) -> bytes:
+        head = self._bom_prefix + chunk
+        if len(head) < len(_BOM) and _BOM.startswith(head):
+            self._bom_prefix = head
+            return b""
+        self._at_start = False
+        self._bom_prefix = b""
+        return head[len(_BOM):] if head.startswith(_BOM) else head
+
+    def _parse_blocks(self, complete: bytes, data_only: bool) -> List[Any]:
+        """Parse LF-terminated events separated by blank lines."""
+        events: List[Any] = []
+        append = events.append
+        for block in complete.split(b"\n\n"):
+            if block.startswith(b"data: ") and block.find(b"\n", 6) == -1:
+                # The common case: one "data: <json>" line per event.
+                if data_only:
+                    append(block[6:])
+                else:
+                    append(
+                        SSEEvent(block[6:], "message", self.last_event_id, self.retry)
+                    )
+                continue
+            for line in block.split(b"\n"):
+                event = self._process_line(line)
+                if event is not None:
+                    append(event.data if data_only else event)
+            event = self._dispatch()
+            if event is not None:
+                append(event.data if data_only else event)
+        return events
+
+    def _feed_lines(self, data_only: bool) -> List[Any]:
+        """General path handling CRLF and lone-CR line endings."""
+        buffer = self._buffer
+        events: List[Any] = []
+        start = 0
+        if self._skip_lf and buffer:
+            # The previous chunk ended in CR; a leading LF completes that CRLF.
+            if buffer[0] == _LF:
+                start = 1
+            self._skip_lf = False
+
+        size = len(buffer)
+        while start < size:
+            lf = buffer.find(b"\n", start)
+            cr = buffer.find(b"\r", start, size if lf == -1 else lf)
+            if cr != -1:
+                end = cr
+                if cr + 1 < size:
+                    next_start = cr + 2 if buffer[cr + 1] == _LF else cr + 1
+                else:
+                    next_start = cr + 1
+                    self._skip_lf = True
+            elif lf != -1:
+                end = lf
+                next_start = lf + 1
+            else:
+                break
+            event = self._process_line(bytes(buffer[start:end]))
+            if event is not None:
+                events.append(event.data if data_only else event)
+            start = next_start
+        if start:
+            del buffer[:start]
+        return events
+
+    def _process_line(self, line: bytes) -> Optional[SSEEvent]:
+        if not line:
+            return self._dispatch()
+        if line[0] == _COLON:
+            return None  # comment
+
+        field, colon, value = line.partition(b":")
+        if colon and value[:1] == b" ":
+            value = value[1:]
+
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"event":
+            self._event_type = value
+        elif field == b"id":
+            if b"\x00" not in value:
+                self.last_event_id = value.decode("utf-8", "replace")
+        elif field == b"retry":
+            if value.isdigit():
+                self.retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        data, event_type = self._data, self._event_type
+        self._data = []
+        self._event_type = None
+        if not data:
+            return None
+        payload = data[0] if len(data) == 1 else b"\n".join(data)
+        return SSEEvent(
+            payload,
+            event_type.decode("utf-8", "replace") if event_type else "message",
+            self.last_event_id,
+            self.retry,
+        )
+
+
+def _is_done(data: bytes) -> bool:
+    # Length check first: never strip() a large JSON payload.
+    return len(data) < 16 and data.strip() == DONE_SENTINEL
+
+
+def iter_sse_data(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield each event's data from a byte stream, stopping at ``[DONE]``."""
+    feed = SSEParser().feed_data
+    for chunk in chunks:
+        for data in feed(chunk):
+            if _is_done(data):
+                return
+            yield data
+
+
+async def aiter_sse_data(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Async counterpart of :func:`iter_sse_data`."""
+    feed = SSEParser().feed_data
+    async for chunk in chunks:
+        for data in feed(chunk):
+            if _is_done(data):
+                return
+            yield data
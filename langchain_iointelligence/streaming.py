@@ -1,59 +1,88 @@
 """Streaming support for io Intelligence API."""
 
-import json
 import logging
-from typing import Any, Dict, Iterator, List, Optional
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 from langchain_core.messages import AIMessageChunk
-from langchain_core.messages.ai import UsageMetadata
 from langchain_core.messages.tool import ToolCallChunk
 from langchain_core.outputs import ChatGenerationChunk
 
-from .exceptions import IOIntelligenceError, classify_api_error
+from . import codec
+from .circuit_breaker import CircuitBreaker
+from .exceptions import (IOIntelligenceConnectionError, IOIntelligenceError,
+                         IOIntelligenceRateLimitError,
+                         IOIntelligenceServerError, IOIntelligenceTimeoutError,
+                         classify_api_error)
+from .http_client import (DEFAULT_POOL_MAXSIZE, ROUTER_FAILOVER_ERRORS,
+                          create_session, is_rate_limited_response,
+                          is_server_error_response)
+from .rate_limit import IOIntelligenceRateLimiter
+from .retry import compute_retry_delay, parse_rate_limit_headers
+from .routing import EndpointRouter
+from .sse import iter_sse_data
+from .usage import build_usage_metadata
 
 logger = logging.getLogger(__name__)
 
 
-def build_generation_chunk(
-    chunk_data: Dict[str, Any]
-) -> Optional[ChatGenerationChunk]:
-    """Build a ChatGenerationChunk from a raw SSE chunk dict.
+class StreamDelta:
+    """One streamed chunk, kept as plain fields.
 
-    Shared by the sync streamer and the async stream so both paths produce
-    identical chunks (content deltas, tool-call deltas, and the final
-    usage-only chunk emitted when ``stream_options.include_usage`` is set).
-    """
-    try:
-        choices = chunk_data.get("choices") or []
-        usage = chunk_data.get("usage")
+    A lightweight alternative to :class:`ChatGenerationChunk` for consumers
+    that only forward text: no pydantic models are built until
+    :meth:`to_generation_chunk` is called.
 
-        # Final usage-only chunk (no choices) - surface token usage.
-        if not choices:
-            if usage:
-                usage_metadata = UsageMetadata(
-                    input_tokens=usage.get("prompt_tokens", 0),
-                    output_tokens=usage.get("completion_tokens", 0),
-                    total_tokens=usage.get("total_tokens", 0),
-                )
-                return ChatGenerationChunk(
-                    message=AIMessageChunk(content="", usage_metadata=usage_metadata),
-                    generation_info={
-                        "model": chunk_data.get("model"),
-                        "chunk_id": chunk_data.get("id"),
-                    },
-                )
-            return None
+    Attributes:
+        content: Text delta ("" when the chunk carries none)
+        tool_calls: Raw OpenAI ``tool_calls`` deltas, or None
+        finish_reason: Set on the last content chunk
+        usage: Raw ``usage`` dict, if the chunk carries one
+        model: Model name reported by the server
+        id: Completion id
+        index: Choice index; None for the final usage-only chunk
+    """
 
-        choice = choices[0]
-        delta = choice.get("delta", {})
+    __slots__ = ("content", "tool_calls", "finish_reason", "usage", "model", "id", "index")
+
+    def __init__(
+        self,
+        content: str = "",
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        finish_reason: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        id: Optional[str] = None,
+        index: Optional[int] = 0,
+    ):
+        self.content = content
+        self.tool_calls = tool_calls
+        self.finish_reason = finish_reason
+        self.usage = usage
+        self.model = model
+        self.id = id
+        self.index = index
+
+    def __repr__(self) -> str:
+        return (
+            f"StreamDelta(content={self.content!r}, tool_calls={self.tool_calls!r}, "
+            f"finish_reason={self.finish_reason!r})"
+        )
 
-        content = delta.get("content") or ""
-        finish_reason = choice.get("finish_reason")
+    def to_generation_chunk(self) -> ChatGenerationChunk:
+        """Materialise the equivalent LangChain ``ChatGenerationChunk``."""
+        if self.index is None:
+            return ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="", usage_metadata=build_usage_metadata(self.usage)
+                ),
+                generation_info={"model": self.model, "chunk_id": self.id},
+            )
 
         # Incremental tool-call deltas, if any.
         tool_call_chunks: List[ToolCallChunk] = []
-        for raw_tool_call in delta.get("tool_calls") or []:
+        for raw_tool_call in self.tool_calls or []:
             function = raw_tool_call.get("function", {})
             tool_call_chunks.append(
                 ToolCallChunk(
@@ -67,31 +96,111 @@ def build_generation_chunk(
 
         if tool_call_chunks:
             message_chunk = AIMessageChunk(
-                content=content, tool_call_chunks=tool_call_chunks
+                content=self.content, tool_call_chunks=tool_call_chunks
             )
         else:
-            message_chunk = AIMessageChunk(content=content)
+            message_chunk = AIMessageChunk(content=self.content)
 
         return ChatGenerationChunk(
             message=message_chunk,
             generation_info={
-                "finish_reason": finish_reason,
-                "model": chunk_data.get("model"),
-                "chunk_id": chunk_data.get("id"),
+                "finish_reason": self.finish_reason,
+                "model": self.model,
+                "chunk_id": self.id,
             },
         )
 
-    except (KeyError, TypeError):
+
+def parse_stream_delta(chunk_data: Dict[str, Any]) -> Optional[StreamDelta]:
+    """Build a :class:`StreamDelta` from a raw SSE chunk dict.
+
+    Returns None for chunks that carry nothing (no choices and no usage)
+    and for malformed chunks.
+    """
+    try:
+        choices = chunk_data.get("choices") or []
+        usage = chunk_data.get("usage")
+
+        # Final usage-only chunk (no choices) - surface token usage.
+        if not choices:
+            if usage:
+                return StreamDelta(
+                    usage=usage,
+                    model=chunk_data.get("model"),
+                    id=chunk_data.get("id"),
+                    index=None,
+                )
+            return None
+
+        choice = choices[0]
+        delta = choice.get("delta", {})
+        return StreamDelta(
+            delta.get("content") or "",
+            delta.get("tool_calls") or None,
+            choice.get("finish_reason"),
+            usage,
+            chunk_data.get("model"),
+            chunk_data.get("id"),
+            choice.get("index") or 0,
+        )
+
+    except (AttributeError, KeyError, TypeError):
+        return None
+
+
+def build_generation_chunk(
+    chunk_data: Dict[str, Any]
+) -> Optional[ChatGenerationChunk]:
+    """Build a ChatGenerationChunk from a raw SSE chunk dict.
+
+    Shared by the sync streamer and the async stream so both paths produce
+    identical chunks (content deltas, tool-call deltas, and the final
+    usage-only chunk emitted when ``stream_options.include_usage`` is set).
+    """
+    delta = parse_stream_delta(chunk_data)
+    if delta is None:
+        return None
+    try:
+        return delta.to_generation_chunk()
+    except (AttributeError, KeyError, TypeError):
         return None
 
 
 class IOIntelligenceStreamer:
-    """Handles streaming responses from io Intelligence API."""
+    """Handles streaming responses from io Intelligence API.
+
+    Streams go through a keep-alive session (optionally the one owned by
+    :class:`IOIntelligenceHTTPClient`) and are retried on connection errors,
+    429s and 5xx responses until the first byte arrives. Once chunks have
+    been yielded a failure is raised, never retried.
+    """
 
-    def __init__(self, api_key: str, api_url: str, timeout: int = 30):
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str,
+        timeout: int = 30,
+        rate_limiter: Optional[IOIntelligenceRateLimiter] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        session: Optional[requests.Session] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        router: Optional[EndpointRouter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
         self.api_key = api_key
         self.api_url = api_url
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.router = router
+        self.circuit_breaker = circuit_breaker
+        # Only a session created here is closed by close().
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(
+            api_key, pool_maxsize, pool_connections=len(router) if router else 1
+        )
 
     def stream_chat_completion(self, data: Dict[str, Any]) -> Iterator[ChatGenerationChunk]:
         """Stream chat completion responses.
@@ -102,31 +211,134 @@ class IOIntelligenceStreamer:
         Yields:
             ChatGenerationChunk objects for each token/chunk
         """
+        return self.build_chunks(self.stream_raw(data))
+
+    def stream_raw(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the raw SSE chunk dicts of a chat completion.
+
+        Args:
+            data: Request data dictionary
+
+        Yields:
+            Parsed JSON payload of each ``data:`` event, up to ``[DONE]``
+        """
         # Enable streaming in request
         stream_data = data.copy()
         stream_data["stream"] = True
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream",
-        }
-
+        response, reserved_tokens = self._open_stream(stream_data)
         try:
-            with requests.post(
-                self.api_url, headers=headers, json=stream_data, stream=True, timeout=self.timeout
-            ) as response:
-                if not response.ok:
-                    error = classify_api_error(response.status_code, response.text)
+            with response:
+                usage_chunk: Optional[Dict[str, Any]] = None
+                for chunk in self._iter_sse_payloads(response):
+                    if isinstance(chunk, dict) and chunk.get("usage"):
+                        usage_chunk = chunk
+                    yield chunk
+            if self.rate_limiter and usage_chunk is not None:
+                # Settle the estimate against the final usage chunk.
+                self.rate_limiter.record_usage(stream_data, reserved_tokens, usage_chunk)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            # The link dropped mid-stream; resumable (see resume.py).
+            raise IOIntelligenceConnectionError(f"Connection error: {str(e)}")
+        except requests.exceptions.RequestException as e:
+            raise IOIntelligenceError(f"Streaming request failed: {str(e)}")
+
+    def _post(self, body: bytes, model: str) -> requests.Response:
+        """POST a streaming request, failing over between routed endpoints."""
+
+        def _post_to(url: str) -> requests.Response:
+            return self.session.post(
+                url,
+                headers={
+                    "Accept": "text/event-stream",
+                    "Content-Type": "application/json",
+                },
+                data=body,
+                stream=True,
+                timeout=self.timeout,
+            )
+
+        def _send(url: str) -> requests.Response:
+            if self.circuit_breaker is None:
+                return _post_to(url)
+            with self.circuit_breaker.guard(url, model) as call:
+                response = _post_to(url)
+                call.record_status(response.status_code)
+            return response
+
+        if self.router is None:
+            return _send(self.api_url)
+        return self.router.call(
+            _send,
+            is_failure=is_server_error_response,
+            errors=ROUTER_FAILOVER_ERRORS,
+            discard=requests.Response.close,
+            is_throttled=is_rate_limited_response,
+        )
+
+    def _open_stream(self, stream_data: Dict[str, Any]) -> Tuple[requests.Response, int]:
+        """POST the streaming request, retrying until a 2xx response arrives.
+
+        Returns the response and the tokens reserved for it with the rate
+        limiter; failed attempts get their reservation refunded.
+        """
+        model = str(stream_data.get("model", ""))
+        last_exception: Optional[IOIntelligenceError] = None
+
+        for attempt in range(self.max_retries + 1):
+            reserved_tokens = (
+                self.rate_limiter.acquire(stream_data) if self.rate_limiter else 0
+            )
+            opened = False
+            try:
+                response = self._post(codec.dumps(stream_data), model)
+            except requests.exceptions.Timeout:
+                last_exception = IOIntelligenceTimeoutError(
+                    f"Request timeout after {self.timeout} seconds"
+                )
+            except requests.exceptions.ConnectionError as e:
+                last_exception = IOIntelligenceConnectionError(f"Connection error: {str(e)}")
+            except requests.exceptions.RequestException as e:
+                raise IOIntelligenceError(f"Streaming request failed: {str(e)}")
+            else:
+                if response.ok:
+                    if self.rate_limiter:
+                        self.rate_limiter.observe(
+                            model, parse_rate_limit_headers(response.headers)
+                        )
+                    opened = True
+                    return response, reserved_tokens
+
+                error = classify_api_error(
+                    response.status_code, response.text, response.headers
+                )
+                response.close()
+                if self.rate_limiter:
+                    self.rate_limiter.observe(model, error.rate_limit)
+                if not isinstance(
+                    error, (IOIntelligenceRateLimitError, IOIntelligenceServerError)
+                ) or attempt >= self.max_retries:
                     raise error
+                time.sleep(
+                    compute_retry_delay(
+                        attempt,
+                        self.retry_delay,
+                        error.rate_limit,
+                        is_rate_limit=isinstance(error, IOIntelligenceRateLimitError),
+                    )
+                )
+                continue
+            finally:
+                if self.rate_limiter and not opened:
+                    self.rate_limiter.refund(stream_data, reserved_tokens)
 
-                # Process Server-Sent Events
-                for chunk in self._parse_sse_stream(response):
-                    if chunk:
-                        yield chunk
+            if attempt < self.max_retries:
+                time.sleep(compute_retry_delay(attempt, self.retry_delay))
 
-        except requests.exceptions.RequestException as e:
-            raise IOIntelligenceError(f"Streaming request failed: {str(e)}")
+        raise last_exception or IOIntelligenceError("All retry attempts failed")
 
     def _parse_sse_stream(self, response) -> Iterator[ChatGenerationChunk]:
         """Parse Server-Sent Events stream.
@@ -137,31 +349,31 @@ class IOIntelligenceStreamer:
         Yields:
             ChatGenerationChunk objects
         """
-        for line in response.iter_lines(decode_unicode=True):
-            if line is None:
+        return self.build_chunks(self._iter_sse_payloads(response))
+
+    def _iter_sse_payloads(self, response) -> Iterator[Dict[str, Any]]:
+        """Yield the JSON payload of each SSE event, skipping malformed ones."""
+        # chunk_size=None yields bytes as they arrive from the socket.
+        for data in iter_sse_data(response.iter_content(chunk_size=None)):
+            try:
+                yield codec.loads(data)
+            except ValueError:
+                # Skip malformed JSON
                 continue
 
-            # SSE format: "data: {json}" or "data: [DONE]"
-            if line.startswith("data: "):
-                data_part = line[6:]  # Remove "data: " prefix
-
-                # End of stream marker
-                if data_part.strip() == "[DONE]":
-                    break
-
-                try:
-                    chunk_data = json.loads(data_part)
-                    chunk = self._create_chat_chunk(chunk_data)
-                    if chunk:
-                        yield chunk
-
-                except json.JSONDecodeError:
-                    # Skip malformed JSON
-                    continue
-                except Exception as e:
-                    # Log error but continue streaming
-                    logger.warning("Error processing chunk: %s", e)
-                    continue
+    def build_chunks(
+        self, payloads: Iterable[Dict[str, Any]]
+    ) -> Iterator[ChatGenerationChunk]:
+        """Turn raw chunk dicts into ChatGenerationChunks, skipping bad chunks."""
+        for chunk_data in payloads:
+            try:
+                chunk = self._create_chat_chunk(chunk_data)
+                if chunk:
+                    yield chunk
+            except Exception as e:
+                # Log error but continue streaming
+                logger.warning("Error processing chunk: %s", e)
+                continue
 
     def _create_chat_chunk(self, chunk_data: Dict[str, Any]) -> Optional[ChatGenerationChunk]:
         """Create ChatGenerationChunk from API chunk data.
@@ -170,3 +382,8 @@ class IOIntelligenceStreamer:
         compatibility / instance-level access).
         """
         return build_generation_chunk(chunk_data)
+
+    def close(self) -> None:
+        """Close the session if this streamer created it."""
+        if self._owns_session:
+            self.session.close()
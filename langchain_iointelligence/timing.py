@@ -0,0 +1,168 @@
+"""Client-side latency breakdown of a single chat request.
+
+A :class:`RequestTiming` is created by the chat model per request and
+filled in by the HTTP clients: retry count, connection set-up (async
+client only - ``requests`` does not expose it), time to response headers
+and any timing the server reports. The chat model adds time to first
+token for streams and publishes the result as
+``response_metadata["timing"]``, so latency can be attributed to the
+network, the server queue or generation.
+"""
+
+import time
+from typing import Any, Dict, Mapping, Optional
+
+# Seconds-valued timing fields some OpenAI-compatible servers put in ``usage``.
+_USAGE_TIMING_FIELDS = ("queue_time", "prompt_time", "completion_time", "total_time")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def parse_server_timing(
+    headers: Optional[Mapping[str, str]] = None,
+    usage: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, float]:
+    """Collect server-reported timings, in milliseconds.
+
+    Reads ``openai-processing-ms``, the metrics of a ``Server-Timing``
+    header (``name;dur=12.5``) and the ``queue_time``/``prompt_time``/
+    ``completion_time``/``total_time`` fields (seconds) of ``usage``.
+    """
+    server: Dict[str, float] = {}
+    if headers:
+        processing = headers.get("openai-processing-ms")
+        if processing is not None:
+            try:
+                server["processing_ms"] = float(processing)
+            except ValueError:
+                pass
+        for metric in (headers.get("server-timing") or "").split(","):
+            name, _, params = metric.strip().partition(";")
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if name and key == "dur":
+                    try:
+                        server[f"{name}_ms"] = float(value)
+                    except ValueError:
+                        pass
+    if usage:
+        for field in _USAGE_TIMING_FIELDS:
+            seconds = usage.get(field)
+            if isinstance(seconds, (int, float)):
+                server[f"{field}_ms"] = _ms(seconds)
+    return server
+
+
+class RequestTiming:
+    """Timings of one request, measured from its creation.
+
+    All durations are in milliseconds; fields left at None were not
+    measured for this request.
+
+    Attributes:
+        retries: Attempts made after the first one
+        connect_ms: DNS lookup plus TCP connect time of a new connection
+            (0 when a pooled connection was reused)
+        tls_ms: TLS handshake time of a new connection
+        ttfb_ms: Time until the response headers arrived
+        ttft_ms: Time until the first streamed token
+        total_ms: Time until the response was complete
+        server: Server-reported timings (see :func:`parse_server_timing`)
+        hedged: The response came from a hedged duplicate request
+        served_model: Model that answered, when a hedge sent to another
+            model won (None = the requested model)
+    """
+
+    __slots__ = (
+        "started",
+        "retries",
+        "connect_ms",
+        "tls_ms",
+        "ttfb_ms",
+        "ttft_ms",
+        "total_ms",
+        "server",
+        "hedged",
+        "served_model",
+        "_trace_started",
+    )
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.retries = 0
+        self.connect_ms: Optional[float] = None
+        self.tls_ms: Optional[float] = None
+        self.ttfb_ms: Optional[float] = None
+        self.ttft_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.server: Dict[str, float] = {}
+        self.hedged = False
+        self.served_model: Optional[str] = None
+        self._trace_started: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request started."""
+        return _ms(time.perf_counter() - self.started)
+
+    def mark_headers(self, at: Optional[float] = None) -> None:
+        """Record the arrival of the response headers (``perf_counter`` time)."""
+        at = time.perf_counter() if at is None else at
+        self.ttfb_ms = _ms(at - self.started)
+
+    def mark_first_token(self) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = self.elapsed_ms()
+
+    def finish(self) -> None:
+        self.total_ms = self.elapsed_ms()
+
+    async def trace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpx ``trace`` extension hook recording connect/TLS durations."""
+        self._on_trace(event)
+
+    def _on_trace(self, event: str) -> None:
+        # httpcore events look like "connection.connect_tcp.started".
+        scope, _, phase = event.rpartition(".")
+        now = time.perf_counter()
+        if phase == "started":
+            self._trace_started[scope] = now
+            return
+        started = self._trace_started.pop(scope, None)
+        if started is None or phase != "complete":
+            return
+        if scope == "connection.connect_tcp":
+            self.connect_ms = _ms(now - started)
+        elif scope == "connection.start_tls":
+            self.tls_ms = _ms(now - started)
+        elif scope.endswith("send_request_headers") and self.connect_ms is None:
+            # Headers went out without a connect event: pooled connection.
+            self.connect_ms = 0.0
+        elif scope.endswith("receive_response_headers"):
+            self.mark_headers(now)
+
+    def to_metadata(self, output_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """The measured fields as a dict, plus ``tokens_per_sec``.
+
+        Throughput is ``output_tokens`` over the generation time: from the
+        first token to the end for streams, else the server's
+        ``completion_time`` or the whole request.
+        """
+        metadata: Dict[str, Any] = {"retries": self.retries}
+        for field in ("connect_ms", "tls_ms", "ttfb_ms", "ttft_ms", "total_ms"):
+            value = getattr(self, field)
+            if value is not None:
+                metadata[field] = value
+        if self.server:
+            metadata["server"] = dict(self.server)
+        if self.hedged:
+            metadata["hedged"] = True
+        if output_tokens and self.total_ms is not None:
+            if self.ttft_ms is not None:
+                generation_ms = self.total_ms - self.ttft_ms
+            else:
+                generation_ms = self.server.get("completion_time_ms", self.total_ms)
+            if generation_ms > 0:
+                metadata["tokens_per_sec"] = round(output_tokens * 1000.0 / generation_ms, 2)
+        return metadata
@@ -0,0 +1,209 @@
+"""Run the tool calls of one model turn concurrently.
+
+A tool-calling turn often returns several independent ``tool_calls``.
+:class:`ToolExecutor` runs them at the same time - sync tools on a thread
+pool, async tools as concurrent tasks - each with an optional timeout, and
+returns the ``ToolMessage`` results in the order of the calls, ready to be
+appended to the conversation.
+
+Failures (unknown tool, invalid arguments, exceptions, timeouts) become
+``ToolMessage`` objects with ``status="error"`` by default, so the model
+can see and react to them.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import (Any, Callable, Dict, List, Mapping, Optional, Sequence,
+                    Union, cast)
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.tool import InvalidToolCall, ToolCall
+from langchain_core.tools import BaseTool
+from langchain_core.tools import tool as as_tool
+
+from .batch import DEFAULT_BATCH_CONCURRENCY, agather_bounded
+
+ToolCallsInput = Union[AIMessage, Sequence[Union[ToolCall, InvalidToolCall]]]
+
+
+def _error_message(call: Mapping[str, Any], error: str) -> ToolMessage:
+    return ToolMessage(
+        content=error,
+        tool_call_id=call.get("id") or "",
+        name=call.get("name"),
+        status="error",
+    )
+
+
+def _as_tool_call(call: Mapping[str, Any]) -> Dict[str, Any]:
+    # BaseTool returns a ToolMessage only when given a typed ToolCall dict.
+    return {**call, "type": "tool_call", "args": call.get("args") or {}}
+
+
+def _is_async_only(tool: BaseTool) -> bool:
+    """True for tools that only define a coroutine (``async def`` tools)."""
+    return getattr(tool, "func", True) is None and getattr(tool, "coroutine", None) is not None
+
+
+class ToolExecutor:
+    """Execute tool calls concurrently and collect ordered ``ToolMessage``s.
+
+    Args:
+        tools: ``BaseTool`` instances or plain functions (sync or async;
+            wrapped with ``@tool``)
+        max_workers: Maximum number of tool calls running at once
+        timeout: Default per-call timeout in seconds, counted from
+            submission (None = no limit)
+        timeouts: Per-tool-name timeouts overriding ``timeout``
+        handle_errors: Turn failures into error ``ToolMessage``s; when
+            False the first failure is raised instead
+
+    A timed-out sync tool cannot be interrupted: its result is reported as
+    a timeout and the worker thread finishes in the background.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Union[BaseTool, Callable[..., Any]]],
+        max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+        timeout: Optional[float] = None,
+        timeouts: Optional[Mapping[str, float]] = None,
+        handle_errors: bool = True,
+    ):
+        self.tools: Dict[str, BaseTool] = {}
+        for tool in tools:
+            resolved = tool if isinstance(tool, BaseTool) else as_tool(tool)
+            self.tools[resolved.name] = resolved
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self.handle_errors = handle_errors
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="io-tool"
+                )
+            return self._pool
+
+    def _timeout_for(self, name: str) -> Optional[float]:
+        return self.timeouts.get(name, self.timeout)
+
+    @staticmethod
+    def _split_calls(tool_calls: ToolCallsInput) -> List[Mapping[str, Any]]:
+        if isinstance(tool_calls, AIMessage):
+            return list(tool_calls.tool_calls) + list(tool_calls.invalid_tool_calls)
+        return list(tool_calls)
+
+    def _check_call(self, call: Mapping[str, Any]) -> Optional[ToolMessage]:
+        """Return an error message for calls that cannot run, else None.
+
+        Raises:
+            ValueError: If the call cannot run and ``handle_errors`` is False
+        """
+        if call.get("type") == "invalid_tool_call":
+            error = f"invalid tool call: {call.get('error') or 'unparseable arguments'}"
+        elif call.get("name") not in self.tools:
+            error = (
+                f"unknown tool '{call.get('name')}'. "
+                f"Available tools: {sorted(self.tools)}"
+            )
+        else:
+            return None
+        if not self.handle_errors:
+            raise ValueError(error)
+        return _error_message(call, f"Error: {error}")
+
+    def _failure(self, call: Mapping[str, Any], exc: BaseException) -> ToolMessage:
+        if not self.handle_errors:
+            raise exc
+        if isinstance(exc, (concurrent.futures.TimeoutError, asyncio.TimeoutError)):
+            return _error_message(
+                call,
+                f"Error: tool '{call.get('name')}' timed out after "
+                f"{self._timeout_for(call['name'])} seconds",
+            )
+        return _error_message(call, f"Error: {exc!r}")
+
+    def _run_sync(self, call: Mapping[str, Any]) -> ToolMessage:
+        tool = self.tools[call["name"]]
+        # Invoked with a ToolCall, a tool answers with a ToolMessage.
+        if _is_async_only(tool):
+            return cast(ToolMessage, asyncio.run(tool.ainvoke(_as_tool_call(call))))
+        return cast(ToolMessage, tool.invoke(_as_tool_call(call)))
+
+    def execute(self, tool_calls: ToolCallsInput) -> List[ToolMessage]:
+        """Run ``tool_calls`` (or an ``AIMessage``'s calls) on the thread pool.
+
+        Returns:
+            One ``ToolMessage`` per call, in call order
+        """
+        calls = self._split_calls(tool_calls)
+        results: List[Optional[ToolMessage]] = [self._check_call(call) for call in calls]
+        pool = self._get_pool()
+        futures = {
+            index: pool.submit(self._run_sync, call)
+            for index, call in enumerate(calls)
+            if results[index] is None
+        }
+        started = time.monotonic()
+        for index, future in futures.items():
+            call = calls[index]
+            # Timeouts count from submission, not from when we get to wait.
+            timeout = self._timeout_for(call["name"])
+            if timeout is not None:
+                timeout = max(0.0, started + timeout - time.monotonic())
+            try:
+                results[index] = future.result(timeout=timeout)
+            except Exception as exc:  # noqa: BLE001 - reported as a ToolMessage
+                future.cancel()
+                results[index] = self._failure(call, exc)
+        return [message for message in results if message is not None]
+
+    async def aexecute(self, tool_calls: ToolCallsInput) -> List[ToolMessage]:
+        """Async counterpart of :meth:`execute`.
+
+        Async tools run as concurrent tasks; sync tools run in the event
+        loop's default executor (``BaseTool.ainvoke``). As in :meth:`execute`,
+        timeouts count from submission: a call queued behind ``max_workers``
+        others only gets what is left of its budget once it starts.
+        """
+        calls = self._split_calls(tool_calls)
+        results: List[Optional[ToolMessage]] = [self._check_call(call) for call in calls]
+        pending = [index for index, message in enumerate(results) if message is None]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        def _factory(call: Mapping[str, Any]) -> Callable[[], Any]:
+            tool = self.tools[call["name"]]
+
+            def _start() -> Any:
+                timeout = self._timeout_for(call["name"])
+                if timeout is not None:
+                    timeout = max(0.0, started + timeout - loop.time())
+                return asyncio.wait_for(tool.ainvoke(_as_tool_call(call)), timeout)
+
+            return _start
+
+        outcomes = await agather_bounded(
+            [_factory(calls[index]) for index in pending],
+            self.max_workers,
+            return_exceptions=True,
+        )
+        for index, outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = self._failure(calls[index], outcome)
+            results[index] = outcome
+        return [message for message in results if message is not None]
+
+    def close(self) -> None:
+        """Shut down the thread pool (running tools finish in the background)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
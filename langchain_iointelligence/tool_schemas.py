@@ -0,0 +1,102 @@
+"""Cached OpenAI tool schemas.
+
+``convert_to_openai_tool`` regenerates the JSON schema every time it is
+called, which for Pydantic models means a full ``model_json_schema()``
+run. :func:`get_openai_tool_schema` memoises the result per tool object
+(Pydantic model, TypedDict, function or ``BaseTool``), keyed on identity
+plus a cheap version stamp so that a redefined docstring, rebuilt model
+or swapped ``args_schema`` is picked up. Entries go away with their tool.
+
+:class:`Toolset` goes one step further for a fixed set of tools bound on
+every request: the schemas and tool names are computed once and
+``bind_tools`` takes the toolset as is.
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple, Union
+
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+ToolLike = Union[Dict[str, Any], type, Callable[..., Any], BaseTool]
+
+_schemas: Dict[int, Tuple[Any, Hashable, Dict[str, Any]]] = {}
+# Re-entrant: a weakref callback may run while the lock is held.
+_schemas_lock = threading.RLock()
+
+
+def _version(tool: Any) -> Hashable:
+    """Cheap stamp of the parts of ``tool`` its schema is generated from."""
+    if isinstance(tool, BaseTool):
+        return (tool.name, tool.description, id(tool.args_schema))
+    if isinstance(tool, type):
+        return (tool.__doc__, id(getattr(tool, "__pydantic_core_schema__", None)))
+    code = getattr(tool, "__code__", None)
+    return (tool.__doc__, code, id(getattr(tool, "__annotations__", None)))
+
+
+def get_openai_tool_schema(tool: ToolLike) -> Dict[str, Any]:
+    """``convert_to_openai_tool(tool)``, memoised per tool object.
+
+    The returned dict is shared between callers and must not be mutated.
+    Dicts are not cached (they are not weak-referenceable); ones already in
+    OpenAI tool format are returned as is.
+    """
+    if isinstance(tool, dict):
+        if tool.get("type") == "function" and "function" in tool:
+            return tool
+        return convert_to_openai_tool(tool)
+    key = id(tool)
+    version = _version(tool)
+    with _schemas_lock:
+        entry = _schemas.get(key)
+    if entry is not None and entry[0]() is tool and entry[1] == version:
+        return entry[2]
+
+    schema = convert_to_openai_tool(tool)
+    try:
+        def _discard(ref: Any) -> None:
+            with _schemas_lock:
+                current = _schemas.get(key)
+                if current is not None and current[0] is ref:
+                    del _schemas[key]
+
+        ref = weakref.ref(tool, _discard)
+    except TypeError:
+        return schema  # not weak-referenceable; do not risk a stale id
+    with _schemas_lock:
+        _schemas[key] = (ref, version, schema)
+    return schema
+
+
+def clear_tool_schema_cache() -> None:
+    """Forget every cached schema."""
+    with _schemas_lock:
+        _schemas.clear()
+
+
+class Toolset:
+    """A fixed set of tools whose schemas are generated once.
+
+    Pass it to ``bind_tools`` in place of the tool list; rebinding the
+    same toolset per request costs no schema work.
+
+    Args:
+        tools: Anything ``bind_tools`` accepts
+    """
+
+    def __init__(self, tools: Sequence[ToolLike]):
+        self.tools = list(tools)
+        self.schemas: List[Dict[str, Any]] = [
+            get_openai_tool_schema(tool) for tool in self.tools
+        ]
+        self.names: List[str] = [
+            schema.get("function", schema).get("name", "") for schema in self.schemas
+        ]
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def __iter__(self):
+        return iter(self.schemas)
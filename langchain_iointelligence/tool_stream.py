@@ -0,0 +1,236 @@
+"""Assemble streamed tool calls incrementally.
+
+A streamed tool call arrives as fragments keyed by ``index``: the first
+carries ``id`` and ``name``, the rest carry slices of the JSON
+``arguments`` string. :class:`ToolCallAccumulator` buffers the fragments
+per index (a list joined once, not repeated string concatenation), tracks
+JSON nesting as they arrive and reports each tool call the moment its
+arguments object closes, so a tool can start running while the model is
+still emitting the rest of the response.
+
+Example::
+
+    calls = ToolCallAccumulator(on_tool_call=lambda call: pool.submit(run, call))
+    for chunk in chat.bind_tools(tools).stream(messages):
+        calls.add(chunk)
+    calls.finish()
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from langchain_core.messages import BaseMessageChunk
+from langchain_core.messages.tool import (InvalidToolCall, ToolCall,
+                                          invalid_tool_call, tool_call)
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.utils.json import parse_partial_json
+
+from . import codec
+from .streaming import StreamDelta
+
+# Characters that can change nesting depth or string state.
+_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+
+
+class _PendingToolCall:
+    """Fragments and JSON scan state of one tool call."""
+
+    __slots__ = (
+        "index", "id", "name", "parts", "depth", "in_string", "escape",
+        "started", "complete", "_partial", "_partial_len", "_length",
+    )
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id: Optional[str] = None
+        self.name: Optional[str] = None
+        self.parts: List[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self._partial: Dict[str, Any] = {}
+        self._partial_len = 0
+        self._length = 0
+
+    @property
+    def arguments(self) -> str:
+        if len(self.parts) > 1:
+            self.parts = ["".join(self.parts)]
+        return self.parts[0] if self.parts else ""
+
+    def append(self, fragment: str) -> bool:
+        """Buffer ``fragment``; return True once the arguments value closes."""
+        self.parts.append(fragment)
+        self._length += len(fragment)
+        skip = 0
+        if self.escape:
+            # The previous fragment ended in a backslash inside a string.
+            self.escape = False
+            skip = 1
+        for match in _STRUCTURAL.finditer(fragment, skip):
+            position = match.start()
+            if position < skip:
+                continue
+            char = match.group()
+            if self.in_string:
+                if char == "\\":
+                    if position + 1 < len(fragment):
+                        skip = position + 2
+                    else:
+                        self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                self.started = True
+            else:
+                self.depth -= 1
+                if self.depth == 0 and self.started:
+                    return True
+        return False
+
+    def partial_args(self) -> Dict[str, Any]:
+        """Best-effort parse of the arguments received so far."""
+        if self._length != self._partial_len:
+            parsed = parse_partial_json(self.arguments) if self._length else {}
+            self._partial = parsed if isinstance(parsed, dict) else {}
+            self._partial_len = self._length
+        return self._partial
+
+
+class ToolCallAccumulator:
+    """Collect streamed tool-call fragments into complete tool calls.
+
+    Feed it whatever the stream produces - :class:`StreamDelta` records,
+    ``ChatGenerationChunk``/``AIMessageChunk`` objects, raw chunk dicts or
+    raw ``tool_calls`` delta lists. Every ``add`` returns the tool calls
+    completed by that input (and passes each to ``on_tool_call``). Call
+    :meth:`finish` at the end of the stream to flush tool calls whose
+    arguments never formed a closed JSON object; a stream chunk with a
+    ``finish_reason`` does this automatically.
+
+    Arguments that do not parse as a JSON object are reported in
+    :attr:`invalid_tool_calls` instead.
+    """
+
+    def __init__(self, on_tool_call: Optional[Callable[[ToolCall], Any]] = None):
+        self.on_tool_call = on_tool_call
+        self._pending: Dict[int, _PendingToolCall] = {}
+        self.tool_calls: List[ToolCall] = []
+        self.invalid_tool_calls: List[InvalidToolCall] = []
+
+    def add(
+        self,
+        item: Union[StreamDelta, ChatGenerationChunk, BaseMessageChunk, Dict[str, Any]],
+    ) -> List[ToolCall]:
+        """Consume one streamed item; return the tool calls it completed."""
+        finish_reason = None
+        if isinstance(item, StreamDelta):
+            completed = self.add_deltas(item.tool_calls or [])
+            finish_reason = item.finish_reason
+        elif isinstance(item, dict):
+            choices = item.get("choices") or []
+            choice = choices[0] if choices else {}
+            delta = choice.get("delta") or {}
+            completed = self.add_deltas(delta.get("tool_calls") or [])
+            finish_reason = choice.get("finish_reason")
+        else:
+            if isinstance(item, ChatGenerationChunk):
+                finish_reason = (item.generation_info or {}).get("finish_reason")
+                item = item.message
+            completed = [
+                call
+                for chunk in getattr(item, "tool_call_chunks", None) or []
+                for call in self._add_fragment(
+                    chunk.get("index"), chunk.get("id"), chunk.get("name"), chunk.get("args")
+                )
+            ]
+        if finish_reason:
+            completed.extend(self.finish())
+        return completed
+
+    def add_deltas(self, raw_tool_calls: List[Dict[str, Any]]) -> List[ToolCall]:
+        """Consume raw OpenAI ``delta.tool_calls`` entries."""
+        completed: List[ToolCall] = []
+        for raw_tool_call in raw_tool_calls:
+            function = raw_tool_call.get("function") or {}
+            completed.extend(
+                self._add_fragment(
+                    raw_tool_call.get("index"),
+                    raw_tool_call.get("id"),
+                    function.get("name"),
+                    function.get("arguments"),
+                )
+            )
+        return completed
+
+    def _add_fragment(
+        self,
+        index: Optional[int],
+        id: Optional[str],
+        name: Optional[str],
+        arguments: Optional[str],
+    ) -> List[ToolCall]:
+        if index is None:
+            index = 0
+        pending = self._pending.get(index)
+        if pending is None:
+            pending = self._pending[index] = _PendingToolCall(index)
+        if id:
+            pending.id = id
+        if name and not pending.name:
+            pending.name = name
+        if not arguments or pending.complete:
+            return []
+        if pending.append(arguments):
+            return self._complete(pending)
+        return []
+
+    def _complete(self, pending: _PendingToolCall) -> List[ToolCall]:
+        pending.complete = True
+        raw_arguments = pending.arguments
+        error = None
+        try:
+            args = codec.loads(raw_arguments) if raw_arguments.strip() else {}
+            if not isinstance(args, dict):
+                error = "arguments are not a JSON object"
+        except ValueError as exc:
+            error = str(exc)
+        if error is not None:
+            self.invalid_tool_calls.append(
+                invalid_tool_call(
+                    name=pending.name,
+                    args=raw_arguments,
+                    id=pending.id,
+                    error=f"Invalid tool call arguments: {error}",
+                )
+            )
+            return []
+        call = tool_call(name=pending.name or "", args=args, id=pending.id)
+        self.tool_calls.append(call)
+        if self.on_tool_call is not None:
+            self.on_tool_call(call)
+        return [call]
+
+    def partial_args(self, index: int = 0) -> Dict[str, Any]:
+        """Arguments of tool call ``index`` parsed so far (``{}`` if unknown)."""
+        pending = self._pending.get(index)
+        return pending.partial_args() if pending is not None else {}
+
+    def is_complete(self, index: int = 0) -> bool:
+        """Whether tool call ``index`` has been reported."""
+        pending = self._pending.get(index)
+        return pending is not None and pending.complete
+
+    def finish(self) -> List[ToolCall]:
+        """Complete every tool call still pending (end of stream)."""
+        completed: List[ToolCall] = []
+        for index in sorted(self._pending):
+            pending = self._pending[index]
+            if not pending.complete:
+                completed.extend(self._complete(pending))
+        return completed
@@ -0,0 +1,47 @@
+"""Mapping of the API's ``usage`` object onto LangChain ``UsageMetadata``."""
+
+from typing import Any, Dict, Optional
+
+from langchain_core.messages.ai import (InputTokenDetails, OutputTokenDetails,
+                                        UsageMetadata)
+
+# API detail field -> LangChain token-details key.
+_INPUT_DETAILS = {"cached_tokens": "cache_read", "audio_tokens": "audio"}
+_OUTPUT_DETAILS = {"reasoning_tokens": "reasoning", "audio_tokens": "audio"}
+
+
+def _token_details(
+    raw_details: Optional[Dict[str, Any]], fields: Dict[str, str]
+) -> Dict[str, int]:
+    raw_details = raw_details or {}
+    return {
+        key: raw_details[field]
+        for field, key in fields.items()
+        if isinstance(raw_details.get(field), int)
+    }
+
+
+def build_usage_metadata(raw_usage: Optional[Dict[str, Any]]) -> UsageMetadata:
+    """Convert an OpenAI-style ``usage`` dict to ``UsageMetadata``.
+
+    ``prompt_tokens_details`` becomes ``input_token_details`` (prompt
+    tokens served from the server's prefix cache as ``cache_read``, plus
+    ``audio``) and ``completion_tokens_details`` becomes
+    ``output_token_details`` (``reasoning`` and ``audio``). Details the
+    server does not report are left out.
+    """
+    raw_usage = raw_usage or {}
+    usage_metadata = UsageMetadata(
+        input_tokens=raw_usage.get("prompt_tokens", 0),
+        output_tokens=raw_usage.get("completion_tokens", 0),
+        total_tokens=raw_usage.get("total_tokens", 0),
+    )
+    input_details = _token_details(raw_usage.get("prompt_tokens_details"), _INPUT_DETAILS)
+    if input_details:
+        usage_metadata["input_token_details"] = InputTokenDetails(**input_details)  # type: ignore[typeddict-item]
+    output_details = _token_details(
+        raw_usage.get("completion_tokens_details"), _OUTPUT_DETAILS
+    )
+    if output_details:
+        usage_metadata["output_token_details"] = OutputTokenDetails(**output_details)  # type: ignore[typeddict-item]
+    return usage_metadata
@@ -1,21 +1,112 @@
-"""Utility functions for io Intelligence API."""
+"""Utility functions for io Intelligence API.
 
+The model listing is cached per (base URL, API key) for the whole process:
+a fresh catalog is served from memory, a stale one is served while it is
+revalidated in the background (``stale_while_revalidate``), and
+revalidation sends ``If-None-Match`` so an unchanged catalog costs a 304.
+"""
+
+import asyncio
+import hashlib
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
+import httpx
 import requests
 from dotenv import load_dotenv
 
 from .exceptions import IOIntelligenceError, classify_api_error
+from .http_client import create_session
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_TTL = 300.0
+DEFAULT_STALE_WHILE_REVALIDATE = 60.0
+
+
+class ModelCatalog:
+    """One snapshot of the model listing with O(1) lookup by id or name.
+
+    Entries that are not objects (malformed catalogs) are ignored.
+    """
+
+    __slots__ = ("models", "etag", "fetched_at", "_index")
+
+    def __init__(
+        self, models: List[Dict[str, Any]], etag: Optional[str], fetched_at: float
+    ):
+        self.models = [model for model in models if isinstance(model, dict)]
+        self.etag = etag
+        self.fetched_at = fetched_at
+        self._index: Dict[str, Dict[str, Any]] = {}
+        for model in self.models:
+            # Ids win over names if the two ever collide.
+            name = model.get("name")
+            if name and name not in self._index:
+                self._index[name] = model
+        for model in self.models:
+            if model.get("id"):
+                self._index[model["id"]] = model
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Return the model whose id or name is ``model_id`` (None if absent)."""
+        return self._index.get(model_id)
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._index
+
+
+class _CatalogSlot:
+    """Process-wide cache entry for one (base URL, API key)."""
+
+    def __init__(self) -> None:
+        self.catalog: Optional[ModelCatalog] = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+_catalog_slots: Dict[Tuple[str, str], _CatalogSlot] = {}
+_catalog_slots_lock = threading.Lock()
+
+
+def _catalog_slot(base_url: str, api_key: str) -> _CatalogSlot:
+    key = (base_url, hashlib.sha256(api_key.encode()).hexdigest())
+    with _catalog_slots_lock:
+        slot = _catalog_slots.get(key)
+        if slot is None:
+            slot = _catalog_slots[key] = _CatalogSlot()
+        return slot
+
+
+def _parse_models(data: Any) -> List[Dict[str, Any]]:
+    """Extract the model list from a ``/models`` response body."""
+    # Handle OpenAI-compatible format
+    if isinstance(data, dict) and "data" in data:
+        models: List[Dict[str, Any]] = data["data"]
+        return models
+    # Handle direct list format
+    if isinstance(data, list):
+        return data
+    raise IOIntelligenceError("Unexpected models response format")
+
 
 class IOIntelligenceUtils:
     """Utility class for io Intelligence API operations."""
 
     def __init__(
-        self, api_key: Optional[str] = None, api_url: Optional[str] = None, timeout: int = 30
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        timeout: int = 30,
+        catalog_ttl: float = DEFAULT_CATALOG_TTL,
+        stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE,
+        clock: Callable[[], float] = time.monotonic,
     ):
         """Initialize utility client.
 
@@ -23,15 +114,24 @@ class IOIntelligenceUtils:
             api_key: API key (defaults to IO_API_KEY env var)
             api_url: API base URL (defaults to IO_API_URL env var)
             timeout: Request timeout in seconds
+            catalog_ttl: Seconds a fetched model catalog is served without
+                revalidation (0 = revalidate on every call)
+            stale_while_revalidate: Further seconds a stale catalog is still
+                served while a background refresh runs
+            clock: Monotonic clock, injectable for tests
         """
-        self.api_key = api_key or os.getenv("IO_API_KEY")
-        self.api_url = api_url or os.getenv("IO_API_URL")
-        self.timeout = timeout
-
-        if not self.api_key:
+        api_key = api_key or os.getenv("IO_API_KEY")
+        api_url = api_url or os.getenv("IO_API_URL")
+        if not api_key:
             raise ValueError("API key must be provided or set in IO_API_KEY environment variable")
-        if not self.api_url:
+        if not api_url:
             raise ValueError("API URL must be provided or set in IO_API_URL environment variable")
+        self.api_key: str = api_key
+        self.api_url: str = api_url
+        self.timeout = timeout
+        self.catalog_ttl = catalog_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._clock = clock
 
         # Extract base URL for models endpoint
         if "/chat/completions" in self.api_url:
@@ -39,42 +139,192 @@ class IOIntelligenceUtils:
         else:
             self.base_url = self.api_url.rstrip("/")
 
-    def list_models(self) -> List[Dict[str, Any]]:
-        """List available models from the API.
-
-        Returns:
-            List of model information dictionaries
-
-        Raises:
-            IOIntelligenceError: If the API request fails
-        """
-        models_url = f"{self.base_url}/models"
+        self.models_url = f"{self.base_url}/models"
+        self._slot = _catalog_slot(self.base_url, self.api_key)
+        self._session: Optional[requests.Session] = None
+        # One httpx client per event loop (a shared utils client may be used
+        # from several threads/loops at once).
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._async_clients_lock = threading.Lock()
+        # Strong references to background refresh tasks until they finish.
+        self._refresh_tasks: Set["asyncio.Task[Any]"] = set()
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session for catalog requests."""
+        if self._session is None:
+            self._session = create_session(self.api_key)
+        return self._session
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return a pooled httpx client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    timeout=self.timeout
+                )
+        return client
+
+    def _revalidation_headers(self) -> Dict[str, str]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        catalog = self._slot.catalog
+        if catalog is not None and catalog.etag:
+            headers["If-None-Match"] = catalog.etag
+        return headers
+
+    def _store_response(
+        self,
+        status_code: int,
+        text: str,
+        headers: Any,
+        load_json: Callable[[], Any],
+    ) -> ModelCatalog:
+        """Turn a ``/models`` response (200 or 304) into the cached catalog."""
+        previous = self._slot.catalog
+        if status_code == 304 and previous is not None:
+            catalog = ModelCatalog(previous.models, previous.etag, self._clock())
+        elif status_code >= 400:
+            raise classify_api_error(status_code, text, headers)
+        else:
+            catalog = ModelCatalog(
+                _parse_models(load_json()), headers.get("ETag"), self._clock()
+            )
+        self._slot.catalog = catalog
+        return catalog
 
+    def _cached_catalog(self) -> Tuple[Optional[ModelCatalog], bool]:
+        """Return ``(catalog, needs_background_refresh)``.
+
+        The catalog is None when it is missing or too old to serve.
+        """
+        catalog = self._slot.catalog
+        if catalog is None:
+            return None, False
+        age = self._clock() - catalog.fetched_at
+        if age <= self.catalog_ttl:
+            return catalog, False
+        if age <= self.catalog_ttl + self.stale_while_revalidate:
+            return catalog, True
+        return None, False
+
+    def _claim_refresh(self) -> bool:
+        """Mark a background refresh as running; False if one already is."""
+        with self._slot.lock:
+            if self._slot.refreshing:
+                return False
+            self._slot.refreshing = True
+            return True
+
+    def fetch_catalog(self) -> ModelCatalog:
+        """Download (or revalidate) the model catalog, bypassing the cache."""
         try:
-            response = requests.get(models_url, headers=headers, timeout=self.timeout)
+            response = self.session.get(
+                self.models_url, headers=self._revalidation_headers(), timeout=self.timeout
+            )
+            return self._store_response(
+                response.status_code, response.text, response.headers, response.json
+            )
+        except requests.exceptions.RequestException as e:
+            raise IOIntelligenceError(f"Failed to fetch models: {str(e)}")
+        except ValueError as e:
+            if isinstance(e, IOIntelligenceError):
+                raise
+            raise IOIntelligenceError(f"Invalid models response: {str(e)}")
 
-            if not response.ok:
-                error = classify_api_error(response.status_code, response.text)
-                raise error
+    async def afetch_catalog(self) -> ModelCatalog:
+        """Async counterpart of :meth:`fetch_catalog`."""
+        try:
+            response = await self._get_async_client().get(
+                self.models_url, headers=self._revalidation_headers()
+            )
+            return self._store_response(
+                response.status_code, response.text, response.headers, response.json
+            )
+        except httpx.HTTPError as e:
+            raise IOIntelligenceError(f"Failed to fetch models: {str(e)}")
+        except ValueError as e:
+            if isinstance(e, IOIntelligenceError):
+                raise
+            raise IOIntelligenceError(f"Invalid models response: {str(e)}")
+
+    def _refresh_in_background(self) -> None:
+        def _run() -> None:
+            try:
+                self.fetch_catalog()
+            except Exception as e:  # noqa: BLE001 - keep serving the stale copy
+                logger.warning("Background model catalog refresh failed: %s", e)
+            finally:
+                self._slot.refreshing = False
+
+        if self._claim_refresh():
+            threading.Thread(target=_run, daemon=True).start()
+
+    def _arefresh_in_background(self) -> None:
+        async def _run() -> None:
+            try:
+                await self.afetch_catalog()
+            except Exception as e:  # noqa: BLE001 - keep serving the stale copy
+                logger.warning("Background model catalog refresh failed: %s", e)
+            finally:
+                self._slot.refreshing = False
+
+        if self._claim_refresh():
+            task = asyncio.get_running_loop().create_task(_run())
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+
+    def get_catalog(self, refresh: bool = False) -> ModelCatalog:
+        """Return the model catalog, from cache when it is fresh enough.
 
-            data = response.json()
+        Args:
+            refresh: Revalidate with the API even if the cache is fresh
+        """
+        if not refresh:
+            catalog, stale = self._cached_catalog()
+            if catalog is not None:
+                if stale:
+                    self._refresh_in_background()
+                return catalog
+        return self.fetch_catalog()
+
+    async def aget_catalog(self, refresh: bool = False) -> ModelCatalog:
+        """Async counterpart of :meth:`get_catalog`."""
+        if not refresh:
+            catalog, stale = self._cached_catalog()
+            if catalog is not None:
+                if stale:
+                    self._arefresh_in_background()
+                return catalog
+        return await self.afetch_catalog()
+
+    def invalidate_catalog(self) -> None:
+        """Drop the cached catalog for this base URL and API key."""
+        self._slot.catalog = None
+
+    def list_models(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """List available models from the API.
 
-            # Handle OpenAI-compatible format
-            if isinstance(data, dict) and "data" in data:
-                models: List[Dict[str, Any]] = data["data"]
-                return models
-            # Handle direct list format
-            elif isinstance(data, list):
-                return data
-            else:
-                raise IOIntelligenceError("Unexpected models response format")
+        Args:
+            refresh: Revalidate with the API even if the cached catalog is fresh
 
-        except requests.exceptions.RequestException as e:
-            raise IOIntelligenceError(f"Failed to fetch models: {str(e)}")
+        Returns:
+            List of model information dictionaries
+
+        Raises:
+            IOIntelligenceError: If the API request fails
+        """
+        return list(self.get_catalog(refresh).models)
+
+    async def alist_models(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Async counterpart of :meth:`list_models`."""
+        return list((await self.aget_catalog(refresh)).models)
 
     def get_model_info(self, model_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific model.
@@ -88,18 +338,17 @@ class IOIntelligenceUtils:
         Raises:
             IOIntelligenceError: If the model is not found or API request fails
         """
-        try:
-            models = self.list_models()
-            for model in models:
-                if model.get("id") == model_id or model.get("name") == model_id:
-                    return model
-
+        model = self.get_catalog().get(model_id)
+        if model is None:
             raise IOIntelligenceError(f"Model '{model_id}' not found")
+        return model
 
-        except IOIntelligenceError:
-            raise
-        except Exception as e:
-            raise IOIntelligenceError(f"Failed to get model info: {str(e)}")
+    async def aget_model_info(self, model_id: str) -> Dict[str, Any]:
+        """Async counterpart of :meth:`get_model_info`."""
+        model = (await self.aget_catalog()).get(model_id)
+        if model is None:
+            raise IOIntelligenceError(f"Model '{model_id}' not found")
+        return model
 
     def validate_model(self, model_id: str) -> bool:
         """Check if a model exists and is available.
@@ -116,6 +365,14 @@ class IOIntelligenceUtils:
         except IOIntelligenceError:
             return False
 
+    async def avalidate_model(self, model_id: str) -> bool:
+        """Async counterpart of :meth:`validate_model`."""
+        try:
+            await self.aget_model_info(model_id)
+            return True
+        except IOIntelligenceError:
+            return False
+
     def get_recommended_models(self) -> List[str]:
         """Get list of recommended model IDs for common use cases.
 
@@ -154,6 +411,31 @@ class IOIntelligenceUtils:
 
         return recommended
 
+    def close(self) -> None:
+        """Close the catalog session (if one was created)."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    async def aclose(self) -> None:
+        """Close the sync session and the pooled async clients.
+
+        The running loop's client is closed here; clients of other loops
+        that still run are closed on their own loop.
+        """
+        self.close()
+        current = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in clients:
+            if client.is_closed:
+                continue
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
 
 # Convenience function for quick model listing
 def list_available_models(
@@ -3,8 +3,12 @@
 import os
 from unittest.mock import patch
 
+import httpx
 import pytest
 
+from langchain_iointelligence.async_http_client import IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+
 
 # GitHub Actions用のテスト環境変数設定
 @pytest.fixture(autouse=True)
@@ -28,3 +32,58 @@ def disable_dotenv():
         with patch("langchain_iointelligence.chat.load_dotenv"):
             with patch("langchain_iointelligence.utils.load_dotenv"):
                 yield
+
+
+TEST_API_URL = "https://test.api.com/v1/chat/completions"
+
+
+class FakeClock:
+    """Manually advanced stand-in for ``time.monotonic``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def chat_body(content="ok"):
+    """Minimal non-streaming chat completion response body."""
+    return {
+        "choices": [{"finish_reason": "stop", "message": {"content": content}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+@pytest.fixture
+def clock():
+    """A :class:`FakeClock` starting at 0."""
+    return FakeClock()
+
+
+@pytest.fixture
+def chat_response():
+    """Builder for chat completion response bodies (see :func:`chat_body`)."""
+    return chat_body
+
+
+@pytest.fixture
+def make_model():
+    """Factory for chat models pointed at the test endpoint."""
+
+    def _make(**kwargs):
+        return IOIntelligenceChatModel(api_key="k", api_url=TEST_API_URL, **kwargs)
+
+    return _make
+
+
+@pytest.fixture
+def make_async_client():
+    """Factory for async clients whose requests go to an httpx MockTransport handler."""
+
+    def _make(handler, **kwargs):
+        client = IOIntelligenceAsyncHTTPClient("k", TEST_API_URL, retry_delay=0, **kwargs)
+        client._build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    return _make
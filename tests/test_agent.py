@@ -0,0 +1,175 @@
+"""Tests for the tool-calling agent loop."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from langchain_iointelligence.agent import IOIntelligenceAgent
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+
+
+def _model():
+    return IOIntelligenceChatModel(
+        api_key="k", api_url="https://test.api.com/v1/chat/completions"
+    )
+
+
+def _tool_turn(*calls):
+    chunks = []
+    for index, (call_id, name, arguments) in enumerate(calls):
+        chunks.append({"choices": [{"index": 0, "delta": {"tool_calls": [
+            {"index": index, "id": call_id, "function": {"name": name, "arguments": ""}}]}}]})
+        chunks.append({"choices": [{"index": 0, "delta": {"tool_calls": [
+            {"index": index, "function": {"arguments": arguments}}]}}]})
+    chunks.append({"choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}]})
+    chunks.append({"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}})
+    return chunks
+
+
+def _text_turn(text):
+    return [
+        {"choices": [{"index": 0, "delta": {"content": text}}]},
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+        {"choices": [], "usage": {"prompt_tokens": 20, "completion_tokens": 3, "total_tokens": 23}},
+    ]
+
+
+class _FakeStream:
+    """Serve one scripted turn per request and record each payload."""
+
+    def __init__(self, turns, on_chunk=None):
+        self.turns = list(turns)
+        self.payloads = []
+        self.on_chunk = on_chunk
+
+    async def astream(self, data):
+        self.payloads.append(data)
+        for chunk in self.turns.pop(0):
+            yield chunk
+            if self.on_chunk is not None:
+                self.on_chunk(chunk)
+            await asyncio.sleep(0)
+
+
+@tool
+def get_weather(city: str) -> str:
+    """Get the weather for a city."""
+    return f"sunny in {city}"
+
+
+def _run(agent, fake, prompt="weather?"):
+    client = MagicMock()
+    client.astream = fake.astream
+    with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+        return asyncio.run(agent.arun(prompt))
+
+
+class TestAgentLoop:
+    def test_runs_tools_then_answers(self):
+        fake = _FakeStream([
+            _tool_turn(("c1", "get_weather", '{"city": "Tokyo"}'), ("c2", "get_weather", '{"city": "Paris"}')),
+            _text_turn("Tokyo and Paris are sunny."),
+        ])
+        result = _run(IOIntelligenceAgent(_model(), [get_weather]), fake)
+
+        assert result.stop_reason == "final_answer"
+        assert result.output == "Tokyo and Paris are sunny."
+        assert result.iterations == 2
+        assert result.usage["total_tokens"] == 38
+        kinds = [type(m).__name__ for m in result.messages]
+        assert kinds == ["HumanMessage", "AIMessage", "ToolMessage", "ToolMessage", "AIMessage"]
+        assert [m.content for m in result.messages if isinstance(m, ToolMessage)] == [
+            "sunny in Tokyo",
+            "sunny in Paris",
+        ]
+        first, second = fake.payloads
+        assert first["tools"][0]["function"]["name"] == "get_weather"
+        # The second turn extends the first turn's serialised prefix.
+        assert second["messages"][: len(first["messages"])] == first["messages"]
+        assert second["messages"][1]["tool_calls"][0]["id"] == "c1"
+        assert second["messages"][2] == {"role": "tool", "content": "sunny in Tokyo", "tool_call_id": "c1"}
+
+    def test_tool_dispatched_before_turn_finishes(self):
+        started = []
+
+        @tool
+        async def record(x: int) -> int:
+            """Record that the tool ran."""
+            started.append(x)
+            return x
+
+        seen_at_finish = []
+
+        def _on_chunk(chunk):
+            choices = chunk.get("choices") or []
+            if choices and choices[0].get("finish_reason"):
+                seen_at_finish.append(list(started))
+
+        fake = _FakeStream(
+            [_tool_turn(("c1", "record", '{"x": 1}'), ("c2", "record", '{"x": 2}')), _text_turn("done")],
+            on_chunk=_on_chunk,
+        )
+        _run(IOIntelligenceAgent(_model(), [record]), fake)
+        # The first call was already running while the stream continued.
+        assert seen_at_finish[0][:1] == [1]
+
+    def test_iteration_and_token_caps(self):
+        looping = [_tool_turn(("c%d" % i, "get_weather", '{"city": "X"}')) for i in range(3)]
+        result = _run(IOIntelligenceAgent(_model(), [get_weather], max_iterations=2), _FakeStream(looping))
+        assert (result.stop_reason, result.iterations) == ("max_iterations", 2)
+
+        result = _run(
+            IOIntelligenceAgent(_model(), [get_weather], max_total_tokens=10), _FakeStream(looping)
+        )
+        assert (result.stop_reason, result.iterations) == ("max_tokens", 1)
+        assert isinstance(result.messages[-1], ToolMessage)
+
+    def test_canonical_requests_apply_to_agent_payloads(self):
+        chat = IOIntelligenceChatModel(
+            api_key="k", api_url="https://test.api.com/v1/chat/completions", canonical_requests=True
+        )
+        agent = IOIntelligenceAgent(chat, [get_weather], tool_choice="get_weather")
+        fake = _FakeStream([_text_turn("hi")])
+        _run(agent, fake, prompt=[("human", "weather?"), ("system", "be brief")])
+        (payload,) = fake.payloads
+        assert list(payload)[:4] == ["model", "tools", "tool_choice", "messages"]
+        assert [m["role"] for m in payload["messages"]] == ["system", "user"]
+
+    def test_astream_events(self):
+        fake = _FakeStream([_tool_turn(("c1", "get_weather", '{"city": "Oslo"}')), _text_turn("ok")])
+        agent = IOIntelligenceAgent(_model(), [get_weather])
+
+        async def _collect():
+            return [event async for event in agent.astream("hi")]
+
+        client = MagicMock()
+        client.astream = fake.astream
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            events = asyncio.run(_collect())
+        assert [e.type for e in events] == [
+            "tool_call", "message", "tool_result", "token", "message", "done",
+        ]
+        assert isinstance(events[1].data, AIMessage)
+
+    def test_run_refuses_inside_event_loop(self):
+        agent = IOIntelligenceAgent(_model(), [get_weather])
+
+        async def _call():
+            agent.run("hi")
+
+        with pytest.raises(RuntimeError, match="arun"):
+            asyncio.run(_call())
+
+    def test_run_releases_only_its_loop(self):
+        chat = _model()
+        fake = _FakeStream([_text_turn("hi")])
+        client = MagicMock(aclose=AsyncMock(), aclose_loop=AsyncMock())
+        client.astream = fake.astream
+        chat._async_http_client = client
+        assert IOIntelligenceAgent(chat, [get_weather]).run("hello").output == "hi"
+        client.aclose_loop.assert_awaited_once()
+        client.aclose.assert_not_awaited()
+        assert chat._async_http_client is client
@@ -1,9 +1,11 @@
 """Tests for native async support and streaming usage metadata."""
 
 import asyncio
+import json
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from langchain_iointelligence.async_http_client import \
@@ -134,13 +136,15 @@ class TestAsyncHTTPClient:
         """Patch httpx.AsyncClient to return queued fake responses for post()."""
 
         class _Resp:
-            def __init__(self, status_code, json_data=None, text=""):
+            def __init__(self, status_code, json_data=None, text="", headers=None):
                 self.status_code = status_code
                 self._json = json_data
                 self.text = text
+                self.headers = headers or {}
 
-            def json(self):
-                return self._json
+            @property
+            def content(self):
+                return json.dumps(self._json).encode()
 
         queue = list(responses)
 
@@ -156,7 +160,7 @@ class TestAsyncHTTPClient:
             async def aclose(self):
                 pass
 
-            async def post(self, url, headers=None, json=None):
+            async def post(self, url, headers=None, content=None):
                 return queue.pop(0)
 
         import langchain_iointelligence.async_http_client as mod
@@ -306,3 +310,33 @@ class TestChatModelClose:
         assert chat._async_http_client is None
         asyncio.run(chat.aclose())  # must not raise
         assert chat._async_http_client is None
+
+
+class TestHTTP2Option:
+    def test_limits_and_http2_forwarded_to_httpx(self):
+        chat = IOIntelligenceChatModel(
+            api_key="k",
+            api_url="https://x",
+            http2=True,
+            max_connections=8,
+            max_keepalive_connections=4,
+            keepalive_expiry=30.0,
+        )
+        client = chat.async_http_client
+        with patch(
+            "langchain_iointelligence.async_http_client.httpx.AsyncClient"
+        ) as async_client:
+            client._build_client()
+        kwargs = async_client.call_args.kwargs
+        assert kwargs["http2"] is True
+        assert kwargs["limits"].max_connections == 8
+        assert kwargs["limits"].max_keepalive_connections == 4
+        assert kwargs["limits"].keepalive_expiry == 30.0
+
+    def test_http2_without_h2_raises_helpful_error(self):
+        with patch.dict("sys.modules", {"h2": None}):
+            with pytest.raises(ImportError, match=r"\[http2\]"):
+                IOIntelligenceAsyncHTTPClient("k", "https://x", http2=True)
+
+    def test_http1_is_default(self):
+        assert IOIntelligenceAsyncHTTPClient("k", "https://x").http2 is False
@@ -0,0 +1,131 @@
+"""Tests for the bounded-concurrency batch engine."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from conftest import chat_body
+
+from langchain_iointelligence.batch import agather_bounded
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.exceptions import IOIntelligenceServerError
+
+
+class _TrackingClient:
+    """Fake async client echoing the prompt and recording peak concurrency."""
+
+    def __init__(self, fail_on=()):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.fail_on = set(fail_on)
+
+    async def apost_with_retry(self, data, timing=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            prompt = data["messages"][-1]["content"]
+            if prompt in self.fail_on:
+                raise IOIntelligenceServerError("boom", 503)
+            return chat_body(prompt.upper())
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self):
+        pass
+
+
+class TestAgatherBounded:
+    def test_preserves_order_and_bounds_concurrency(self):
+        active = 0
+        peak = 0
+
+        def _factory(i):
+            async def _run():
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.001 * (5 - i % 5))
+                active -= 1
+                return i
+
+            return _run
+
+        out = asyncio.run(agather_bounded([_factory(i) for i in range(20)], 3))
+        assert out == list(range(20))
+        assert peak == 3
+
+    def test_return_exceptions_keeps_partial_results(self):
+        async def _ok():
+            return "ok"
+
+        async def _bad():
+            raise ValueError("bad")
+
+        out = asyncio.run(
+            agather_bounded([_ok, _bad, _ok], 2, return_exceptions=True)
+        )
+        assert out[0] == "ok" and out[2] == "ok"
+        assert isinstance(out[1], ValueError)
+
+    def test_first_error_raises_without_return_exceptions(self):
+        async def _bad():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError, match="bad"):
+            asyncio.run(agather_bounded([_bad, _bad], 2))
+
+    def test_empty(self):
+        assert asyncio.run(agather_bounded([], 4)) == []
+
+
+class TestChatModelBatch:
+    def test_abatch_uses_async_client_with_limit(self, make_model):
+        chat = make_model(batch_max_concurrency=2)
+        client = _TrackingClient()
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            out = asyncio.run(chat.abatch([f"p{i}" for i in range(6)]))
+        assert [m.content for m in out] == [f"P{i}" for i in range(6)]
+        assert client.calls == 6
+        assert client.peak == 2
+
+    def test_config_max_concurrency_overrides_model_default(self, make_model):
+        chat = make_model(batch_max_concurrency=2)
+        client = _TrackingClient()
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            asyncio.run(
+                chat.abatch([f"p{i}" for i in range(6)], {"max_concurrency": 1})
+            )
+        assert client.peak == 1
+
+    def test_sync_batch_routes_through_async_client(self, make_model):
+        chat = make_model()
+        client = _TrackingClient(fail_on={"p1"})
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            out = chat.batch(["p0", "p1", "p2"], return_exceptions=True)
+        assert out[0].content == "P0"
+        assert isinstance(out[1], IOIntelligenceServerError)
+        assert out[2].content == "P2"
+
+    def test_sync_batch_raises_first_error_by_default(self, make_model):
+        chat = make_model()
+        client = _TrackingClient(fail_on={"p0"})
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            with pytest.raises(IOIntelligenceServerError):
+                chat.batch(["p0", "p1"])
+
+    def test_batch_empty_inputs(self, make_model):
+        assert make_model().batch([]) == []
+
+    def test_sync_batch_releases_loop_bound_client(self, make_model, chat_response):
+        chat = make_model()
+        mock_client = AsyncMock()
+        mock_client.apost_with_retry.return_value = chat_response("x")
+        chat._async_http_client = mock_client
+        chat.batch(["a"])
+        # Only the private loop's connections go; the client stays shared.
+        mock_client.aclose_loop.assert_awaited_once()
+        mock_client.aclose.assert_not_awaited()
+        assert chat._async_http_client is mock_client
@@ -0,0 +1,267 @@
+"""Tests for the opt-in response cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_iointelligence.cache import (BaseResponseCache,
+                                            InMemoryResponseCache,
+                                            SQLiteResponseCache,
+                                            StreamRecorder,
+                                            TieredResponseCache,
+                                            replay_stream, request_cache_key)
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+
+
+_TOOL_RESPONSE = {
+    "id": "resp-1",
+    "model": "m",
+    "choices": [
+        {
+            "finish_reason": "tool_calls",
+            "message": {
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "lookup", "arguments": '{"q": "x"}'},
+                    }
+                ],
+            },
+        }
+    ],
+    "usage": {"prompt_tokens": 4, "completion_tokens": 6, "total_tokens": 10},
+}
+
+
+_STREAM_CHUNKS = [
+    {"id": "c1", "model": "m", "choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+    {"id": "c1", "model": "m", "choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+    {"id": "c1", "model": "m", "choices": [], "usage": {"prompt_tokens": 2, "completion_tokens": 2, "total_tokens": 4}},
+]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class TestCacheKey:
+    def test_key_ignores_dict_order(self):
+        a = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+        b = {"temperature": 0, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+        assert request_cache_key(a) == request_cache_key(b)
+
+    def test_key_changes_with_payload(self):
+        assert request_cache_key({"a": 1}) != request_cache_key({"a": 2})
+
+
+class TestInMemoryCache:
+    def test_lru_eviction(self):
+        cache = InMemoryResponseCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_ttl_expiry(self, clock):
+        cache = InMemoryResponseCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 5
+        assert cache.get("a") == 1
+        clock.now = 11
+        assert cache.get("a") is None
+
+    def test_entries_are_copied_in_and_out(self):
+        cache = InMemoryResponseCache()
+        stored = {"usage": {"total_tokens": 2}}
+        cache.set("a", stored)
+        stored["usage"]["total_tokens"] = 0
+        cache.get("a")["usage"]["total_tokens"] = 99
+        assert cache.get("a") == {"usage": {"total_tokens": 2}}
+
+    def test_base_cache_is_abstract(self):
+        with pytest.raises(TypeError):
+            BaseResponseCache()
+
+
+class TestSQLiteCache:
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache" / "responses.sqlite")
+        cache = SQLiteResponseCache(path)
+        cache.set("k", _TOOL_RESPONSE)
+        cache.close()
+        assert SQLiteResponseCache(path).get("k") == _TOOL_RESPONSE
+
+    def test_ttl_and_purge(self, tmp_path, clock):
+        cache = SQLiteResponseCache(str(tmp_path / "c.sqlite"), ttl=10, clock=clock)
+        cache.set("old", 1)
+        clock.now = 20
+        cache.set("new", 2)
+        assert cache.purge_expired() == 1
+        assert cache.get("new") == 2
+        clock.now = 40
+        assert cache.get("new") is None
+
+
+class TestTieredCache:
+    def test_disk_hit_promoted_to_memory(self, tmp_path):
+        disk = SQLiteResponseCache(str(tmp_path / "c.sqlite"))
+        disk.set("k", {"v": 1})
+        memory = InMemoryResponseCache()
+        tiered = TieredResponseCache(memory, disk)
+        assert tiered.get("k") == {"v": 1}
+        assert memory.get("k") == {"v": 1}
+
+
+class TestChatModelCaching:
+    def test_deterministic_request_served_from_cache(self, make_model):
+        chat = make_model(temperature=0, response_cache=InMemoryResponseCache())
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            first = chat._generate([HumanMessage(content="hi")])
+            second = chat._generate([HumanMessage(content="hi")])
+        mock_client.post_with_retry.assert_called_once()
+        cached = second.generations[0].message
+        assert cached.tool_calls == first.generations[0].message.tool_calls
+        assert cached.tool_calls[0]["args"] == {"q": "x"}
+        assert cached.usage_metadata["total_tokens"] == 10
+        assert cached.response_metadata["cache_hit"] is True
+        assert "cache_hit" not in first.generations[0].message.response_metadata
+
+    def test_mutating_a_result_leaves_the_cache_entry_alone(self, make_model):
+        chat = make_model(temperature=0, response_cache=InMemoryResponseCache())
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = {
+            **_TOOL_RESPONSE, "usage": dict(_TOOL_RESPONSE["usage"])
+        }
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            live = chat._generate([HumanMessage(content="hi")])
+            live.generations[0].message.response_metadata["token_usage"]["total_tokens"] = 0
+            hit = chat._generate([HumanMessage(content="hi")])
+            hit.generations[0].message.response_metadata["token_usage"]["total_tokens"] = 0
+            again = chat._generate([HumanMessage(content="hi")])
+        assert again.generations[0].message.response_metadata["token_usage"]["total_tokens"] == 10
+
+    def test_nondeterministic_request_not_cached_by_default(self, make_model):
+        chat = make_model(temperature=0.7, response_cache=InMemoryResponseCache())
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            chat._generate([HumanMessage(content="hi")])
+            chat._generate([HumanMessage(content="hi")])
+        assert mock_client.post_with_retry.call_count == 2
+
+    def test_cache_nondeterministic_opt_in(self, make_model):
+        chat = make_model(
+            temperature=0.7,
+            response_cache=InMemoryResponseCache(),
+            cache_nondeterministic=True,
+        )
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            chat._generate([HumanMessage(content="hi")])
+            chat._generate([HumanMessage(content="hi")])
+        mock_client.post_with_retry.assert_called_once()
+
+    def test_different_prompts_miss(self, make_model):
+        chat = make_model(temperature=0, response_cache=InMemoryResponseCache())
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            chat._generate([HumanMessage(content="a")])
+            chat._generate([HumanMessage(content="b")])
+        assert mock_client.post_with_retry.call_count == 2
+
+    def test_async_path_shares_cache(self, make_model):
+        cache = InMemoryResponseCache()
+        chat = make_model(temperature=0, response_cache=cache)
+        mock_client = AsyncMock()
+        mock_client.apost_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(IOIntelligenceChatModel, "async_http_client", mock_client):
+            asyncio.run(chat._agenerate([HumanMessage(content="hi")]))
+            result = asyncio.run(chat._agenerate([HumanMessage(content="hi")]))
+        mock_client.apost_with_retry.assert_awaited_once()
+        assert result.generations[0].message.response_metadata["cache_hit"] is True
+
+
+class TestStreamReplay:
+    def test_recording_round_trips_through_sqlite(self, tmp_path, clock):
+        recorder = StreamRecorder(clock=clock)
+        for offset, chunk in zip([0.1, 0.3, 0.35], _STREAM_CHUNKS):
+            clock.now = offset
+            recorder.record(chunk)
+        cache = SQLiteResponseCache(str(tmp_path / "c.sqlite"))
+        cache.set("k", recorder.to_cache_value())
+        sleeps = []
+        replayed = list(replay_stream(cache.get("k"), realtime=True, sleep=sleeps.append))
+        assert replayed == _STREAM_CHUNKS
+        assert [round(s, 6) for s in sleeps] == [0.1, 0.2, 0.05]
+
+    def test_replay_without_timing_never_sleeps(self):
+        recorder = StreamRecorder()
+        for chunk in _STREAM_CHUNKS:
+            recorder.record(chunk)
+        sleeps = []
+        list(replay_stream(recorder.to_cache_value(), sleep=sleeps.append))
+        assert sleeps == []
+
+    def test_sync_stream_replayed_from_cache(self, make_model):
+        chat = make_model(temperature=0, response_cache=InMemoryResponseCache())
+        mock_streamer = Mock(wraps=chat.streamer)
+        mock_streamer.stream_raw = Mock(return_value=iter(_STREAM_CHUNKS))
+        with patch.object(type(chat), "streamer", new_callable=PropertyMock, return_value=mock_streamer):
+            live = list(chat._stream([HumanMessage(content="hi")]))
+            replayed = list(chat._stream([HumanMessage(content="hi")]))
+        mock_streamer.stream_raw.assert_called_once()
+        assert [c.text for c in replayed] == [c.text for c in live] == ["Hel", "lo", ""]
+        assert replayed[-1].message.usage_metadata["total_tokens"] == 4
+        assert all(c.message.response_metadata["cache_hit"] for c in replayed)
+        assert "cache_hit" not in live[0].message.response_metadata
+
+    def test_partial_sync_stream_not_cached(self, make_model):
+        cache = InMemoryResponseCache()
+        chat = make_model(temperature=0, response_cache=cache)
+        mock_streamer = Mock(wraps=chat.streamer)
+        mock_streamer.stream_raw = Mock(return_value=iter(_STREAM_CHUNKS))
+        with patch.object(type(chat), "streamer", new_callable=PropertyMock, return_value=mock_streamer):
+            stream = chat._stream([HumanMessage(content="hi")])
+            next(stream)
+            stream.close()
+        assert len(cache) == 0
+
+    def test_async_stream_replayed_from_cache(self, make_model):
+        chat = make_model(temperature=0, response_cache=InMemoryResponseCache())
+        mock_client = Mock()
+        mock_client.astream = Mock(side_effect=lambda data: _aiter(_STREAM_CHUNKS))
+
+        async def _collect():
+            return [c async for c in chat._astream([HumanMessage(content="hi")])]
+
+        with patch.object(IOIntelligenceChatModel, "async_http_client", mock_client):
+            live = asyncio.run(_collect())
+            replayed = asyncio.run(_collect())
+        mock_client.astream.assert_called_once()
+        assert [c.text for c in replayed] == [c.text for c in live]
+        assert replayed[0].message.response_metadata["cache_hit"] is True
+
+    def test_stream_and_invoke_use_separate_entries(self, make_model):
+        cache = InMemoryResponseCache()
+        chat = make_model(temperature=0, response_cache=cache)
+        mock_streamer = Mock(wraps=chat.streamer)
+        mock_streamer.stream_raw = Mock(return_value=iter(_STREAM_CHUNKS))
+        mock_client = Mock()
+        mock_client.post_with_retry.return_value = _TOOL_RESPONSE
+        with patch.object(type(chat), "streamer", new_callable=PropertyMock, return_value=mock_streamer), \
+                patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=mock_client):
+            list(chat._stream([HumanMessage(content="hi")]))
+            chat._generate([HumanMessage(content="hi")])
+        mock_client.post_with_retry.assert_called_once()
+        assert len(cache) == 2
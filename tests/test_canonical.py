@@ -0,0 +1,75 @@
+"""Tests for canonical (prefix-cache friendly) request layout."""
+
+from unittest.mock import Mock, PropertyMock, patch
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+from langchain_iointelligence import codec
+from langchain_iointelligence.canonical import (cacheable_prefix,
+                                                canonicalize_request)
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+
+
+class Alpha(BaseModel):
+    """First tool."""
+
+    a: int
+
+
+class Beta(BaseModel):
+    """Second tool."""
+
+    b: str
+
+
+def _model(**kwargs):
+    return IOIntelligenceChatModel(
+        api_key="k", api_url="https://x", canonical_requests=True, **kwargs
+    )
+
+
+class TestCanonicalizeRequest:
+    def test_layout(self):
+        data = {
+            "temperature": 0.7,
+            "messages": [
+                {"role": "user", "content": "hi"},
+                {"role": "system", "content": "be brief"},
+            ],
+            "tools": [
+                {"type": "function", "function": {"parameters": {}, "name": "b"}},
+                {"function": {"name": "a", "parameters": {}}, "type": "function"},
+            ],
+            "model": "m",
+        }
+        canonical = canonicalize_request(data)
+        assert list(canonical) == ["model", "tools", "messages", "temperature"]
+        assert [t["function"]["name"] for t in canonical["tools"]] == ["a", "b"]
+        assert list(canonical["tools"][1]) == ["function", "type"]
+        assert [m["role"] for m in canonical["messages"]] == ["system", "user"]
+
+    def test_prefix_bytes_identical_across_calls(self):
+        system = SystemMessage(content="You are a helpful assistant. " * 50)
+        first = _model().bind_tools([Beta, Alpha])
+        second = _model().bind_tools([Alpha, Beta])
+        bodies = []
+        for bound, question in ((first, "q1"), (second, "a different question")):
+            llm = bound.bound
+            data = llm._build_request_data(
+                [HumanMessage(content=question), system], None, **bound.kwargs
+            )
+            bodies.append(codec.dumps(data))
+        prefix = cacheable_prefix(codec.loads(bodies[0]))
+        assert prefix["bytes"] > len(system.content)
+        common = len(bodies[0][: prefix["bytes"]])
+        assert bodies[0][:common] == bodies[1][:common]
+
+    def test_result_reports_prefix(self):
+        chat = _model()
+        client = Mock()
+        client.post_with_retry.return_value = {"choices": [{"message": {"content": "ok"}}]}
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock, return_value=client):
+            result = chat._generate([SystemMessage(content="sys"), HumanMessage(content="hi")])
+        prefix = result.generations[0].message.response_metadata["cacheable_prefix"]
+        assert prefix["bytes"] == len(codec.dumps({"role": "system", "content": "sys"}))
@@ -0,0 +1,119 @@
+"""Tests for the per-endpoint/per-model circuit breaker."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from langchain_iointelligence.async_http_client import IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.circuit_breaker import CircuitBreaker
+from langchain_iointelligence.exceptions import IOIntelligenceCircuitOpenError
+from langchain_iointelligence.http_client import IOIntelligenceHTTPClient
+from langchain_iointelligence.routing import EndpointRouter
+
+_A = "https://a.example/v1/chat/completions"
+_B = "https://b.example/v1/chat/completions"
+
+
+def _call(breaker, status=200, endpoint=_A, model="m"):
+    with breaker.guard(endpoint, model) as call:
+        call.record_status(status)
+
+
+def _response(status):
+    response = MagicMock()
+    response.status_code = status
+    response.ok = status < 400
+    response.content = b'{"ok": true}'
+    response.text = "boom"
+    response.headers = {}
+    return response
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate_and_fails_fast(self, clock):
+        breaker = CircuitBreaker(min_calls=4, failure_rate_threshold=0.5, open_duration=10, clock=clock)
+        for status in (200, 503, 200):
+            _call(breaker, status)
+        assert breaker.state(_A, "m") == "closed"
+        _call(breaker, 502)
+        assert breaker.state(_A, "m") == "open"
+        assert breaker.state(_A, "other") == "closed"  # per model
+
+        clock.now = 4
+        with pytest.raises(IOIntelligenceCircuitOpenError) as info:
+            breaker.guard(_A, "m")
+        assert info.value.retry_after == 6
+        assert (info.value.endpoint, info.value.model) == (_A, "m")
+
+    def test_half_open_probes(self, clock):
+        breaker = CircuitBreaker(min_calls=1, open_duration=10, half_open_max_calls=2, clock=clock)
+        _call(breaker, 500)
+        clock.now = 10
+        assert breaker.state(_A, "m") == "half_open"
+        first = breaker.guard(_A, "m")
+        second = breaker.guard(_A, "m")
+        with pytest.raises(IOIntelligenceCircuitOpenError):
+            breaker.guard(_A, "m")  # both probes in flight
+        with first:
+            first.record_status(200)
+        with pytest.raises(ValueError), second:
+            raise ValueError("connection reset")
+        assert breaker.state(_A, "m") == "open"
+
+        clock.now = 20
+        _call(breaker)
+        _call(breaker)
+        assert breaker.state(_A, "m") == "closed"
+
+    def test_slow_calls_and_rate_limits(self):
+        breaker = CircuitBreaker(min_calls=2, slow_call_threshold=0.0, slow_call_rate_threshold=1.0)
+        for _ in range(2):
+            _call(breaker, 429)  # neither success nor failure
+        assert breaker.stats()[0]["recent_calls"] == 0
+        _call(breaker)
+        _call(breaker)
+        assert breaker.state(_A, "m") == "open"
+
+
+class TestClientsUseBreaker:
+    def test_sync_client_stops_retrying_once_open(self):
+        breaker = CircuitBreaker(min_calls=2, failure_rate_threshold=1.0)
+        client = IOIntelligenceHTTPClient("k", _A, max_retries=5, retry_delay=0, circuit_breaker=breaker)
+        with patch.object(client.session, "post", return_value=_response(503)) as post:
+            with pytest.raises(IOIntelligenceCircuitOpenError):
+                client.post_with_retry({"model": "m"})
+        assert post.call_count == 2
+
+    def test_routed_client_skips_open_endpoint(self):
+        breaker = CircuitBreaker(min_calls=1)
+        _call(breaker, 500, endpoint=_A)
+        client = IOIntelligenceHTTPClient(
+            "k", _A, max_retries=0, router=EndpointRouter([_A, _B]), circuit_breaker=breaker
+        )
+        with patch.object(client.session, "post", return_value=_response(200)) as post:
+            assert client.post_with_retry({"model": "m"}) == {"ok": True}
+        assert [c.args[0] for c in post.call_args_list] == [_B]
+
+    def test_async_client_records_transport_errors(self):
+        breaker = CircuitBreaker(min_calls=1)
+        client = IOIntelligenceAsyncHTTPClient("k", _A, max_retries=3, retry_delay=0, circuit_breaker=breaker)
+        calls = []
+
+        def _handler(request):
+            calls.append(request)
+            raise httpx.ConnectError("down", request=request)
+
+        client._build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        with pytest.raises(IOIntelligenceCircuitOpenError):
+            asyncio.run(client.apost_with_retry({"model": "m"}))
+        assert len(calls) == 1
+
+    def test_chat_model_passes_breaker_to_clients(self):
+        breaker = CircuitBreaker()
+        chat = IOIntelligenceChatModel(api_key="k", api_url=_A, circuit_breaker=breaker)
+        assert chat.http_client.circuit_breaker is breaker
+        assert chat.async_http_client.circuit_breaker is breaker
+        assert chat.streamer.circuit_breaker is breaker
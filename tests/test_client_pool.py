@@ -0,0 +1,177 @@
+"""Tests for the process-wide shared client pool."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.client_pool import (IOIntelligenceClientPool,
+                                                  get_client_pool)
+from langchain_iointelligence.llm import IOIntelligenceLLM
+
+_URL = "https://test.api.com/v1/chat/completions"
+
+
+def _without_deadlock(fn, timeout=5):
+    """Run ``fn`` in a daemon thread and fail if it is still blocked after ``timeout``."""
+    result = []
+    worker = threading.Thread(target=lambda: result.append(fn()), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert result, "deadlocked on the pool lock"
+    return result[0]
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    get_client_pool().close()
+    yield
+    get_client_pool().close()
+
+
+class TestClientPool:
+    def test_factory_called_once_per_key(self):
+        pool = IOIntelligenceClientPool()
+        factory = MagicMock(side_effect=lambda: object())
+        first = pool.get("http", {"api_key": "k", "timeout": 30}, factory)
+        again = pool.get("http", {"timeout": 30, "api_key": "k"}, factory)
+        other = pool.get("http", {"api_key": "k", "timeout": 60}, factory)
+        assert first is again
+        assert other is not first
+        assert factory.call_count == 2
+
+    def test_raw_api_key_not_stored(self):
+        pool = IOIntelligenceClientPool()
+        pool.get("http", {"api_key": "secret-key"}, object)
+        assert "secret-key" not in repr(list(pool._clients))
+
+    def test_close_closes_and_empties(self):
+        pool = IOIntelligenceClientPool()
+        client = MagicMock()
+        pool.get("http", {}, lambda: client)
+        pool.close()
+        client.close.assert_called_once()
+        assert len(pool) == 0
+
+    def test_aclose_awaits_async_clients(self):
+        pool = IOIntelligenceClientPool()
+        client = MagicMock(aclose=AsyncMock())
+        pool.get("async", {}, lambda: client)
+        asyncio.run(pool.aclose())
+        client.aclose.assert_awaited_once()
+
+    def test_factory_may_fetch_other_pooled_clients(self):
+        pool = IOIntelligenceClientPool()
+        inner = pool.get("inner", {}, object)
+        outer = _without_deadlock(
+            lambda: pool.get("outer", {}, lambda: ("outer", pool.get("inner", {}, object)))
+        )
+        assert outer == ("outer", inner)
+
+
+class TestSharedModels:
+    def test_models_with_same_settings_share_clients(self):
+        a = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        b = IOIntelligenceChatModel(
+            api_key="k", api_url=_URL, share_clients=True, temperature=0
+        )
+        assert a.http_client is b.http_client
+        assert a.async_http_client is b.async_http_client
+        assert a.streamer is b.streamer
+        assert a.streamer.session is b.http_client.session
+
+    def test_streamer_first_does_not_deadlock(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        streamer = _without_deadlock(lambda: chat.streamer)
+        assert streamer.session is chat.http_client.session
+
+    def test_transport_settings_split_pools(self):
+        a = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        b = IOIntelligenceChatModel(
+            api_key="k", api_url=_URL, share_clients=True, timeout=99
+        )
+        c = IOIntelligenceChatModel(
+            api_key="k", api_url=_URL, share_clients=True, http2=False, max_connections=5
+        )
+        assert a.http_client is not b.http_client
+        assert a.http_client is c.http_client
+        assert a.async_http_client is not c.async_http_client
+
+    def test_unshared_by_default(self):
+        a = IOIntelligenceChatModel(api_key="k", api_url=_URL)
+        b = IOIntelligenceChatModel(api_key="k", api_url=_URL)
+        assert a.http_client is not b.http_client
+        assert len(get_client_pool()) == 0
+
+    def test_llm_shares_session_with_chat_model(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        llm = IOIntelligenceLLM(api_key="k", api_url=_URL, share_clients=True)
+        assert llm.http_client is chat.http_client
+
+    def test_close_releases_without_closing_shared_client(self):
+        a = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        b = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        shared = a.http_client
+        shared.close = MagicMock()
+        a.close()
+        shared.close.assert_not_called()
+        assert a._http_client is None
+        assert b.http_client is shared
+
+
+class TestSharedAsyncClientAcrossLoops:
+    def test_each_loop_keeps_its_own_httpx_client(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        shared = chat.async_http_client
+        started, release = threading.Barrier(2), threading.Event()
+        seen = {}
+
+        def _worker(name):
+            async def _run():
+                first = shared._get_client()
+                started.wait()
+                release.wait(1)
+                seen[name] = (first, shared._get_client(), first.is_closed)
+                await shared.aclose_loop()
+
+            asyncio.run(_run())
+
+        threads = [threading.Thread(target=_worker, args=(n,)) for n in "ab"]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        (a_first, a_again, a_closed), (b_first, b_again, b_closed) = seen["a"], seen["b"]
+        assert a_first is a_again and b_first is b_again
+        assert a_first is not b_first
+        assert not a_closed and not b_closed
+        assert a_first.is_closed and b_first.is_closed  # closed by aclose_loop
+
+    def test_aclose_loop_leaves_other_loops_alone(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url=_URL, share_clients=True)
+        shared = chat.async_http_client
+
+        async def _open():
+            return shared._get_client()
+
+        loop = asyncio.new_event_loop()
+        try:
+            other = loop.run_until_complete(_open())
+
+            async def _private():
+                mine = shared._get_client()
+                await shared.aclose_loop()
+                return mine
+
+            mine = asyncio.run(_private())
+            assert mine.is_closed
+            assert not other.is_closed
+            assert loop.run_until_complete(_open()) is other
+            loop.run_until_complete(shared.aclose())
+            assert other.is_closed
+        finally:
+            loop.close()
@@ -0,0 +1,68 @@
+"""Tests for the pluggable JSON codec."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_iointelligence import codec
+from langchain_iointelligence.http_client import IOIntelligenceHTTPClient
+from langchain_iointelligence.streaming import IOIntelligenceStreamer
+
+_BACKENDS = [
+    name for name, factory in codec._FACTORIES.items() if factory() is not None
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    original = codec.get_json_codec()
+    yield
+    codec.set_json_codec(original)
+
+
+@pytest.mark.parametrize("backend", _BACKENDS)
+class TestBackends:
+    def test_round_trip_bytes_and_str(self, backend):
+        codec.set_json_codec(backend)
+        payload = {"messages": [{"role": "user", "content": "こんにちは"}], "n": 1.5}
+        encoded = codec.dumps(payload)
+        assert isinstance(encoded, bytes)
+        assert codec.loads(encoded) == payload
+        assert codec.loads(encoded.decode()) == payload
+
+    def test_malformed_input_raises_value_error(self, backend):
+        codec.set_json_codec(backend)
+        with pytest.raises(ValueError):
+            codec.loads(b'{"truncated": ')
+
+
+class TestSelection:
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            codec.set_json_codec("yaml")
+
+    def test_custom_codec(self):
+        custom = codec.JSONCodec("custom", lambda obj: b"{}", lambda data: {"custom": True})
+        codec.set_json_codec(custom)
+        assert codec.loads(b"[]") == {"custom": True}
+
+
+class TestClientsUseCodec:
+    def test_sync_client_sends_preserialized_body(self):
+        client = IOIntelligenceHTTPClient("k", "https://x", max_retries=0)
+        response = MagicMock(ok=True, headers={}, content=b'{"ok": true}')
+        with patch.object(client.session, "post", return_value=response) as post:
+            assert client.post_with_retry({"model": "m"}) == {"ok": True}
+        body = post.call_args.kwargs["data"]
+        assert isinstance(body, bytes)
+        assert codec.loads(body) == {"model": "m"}
+        assert "json" not in post.call_args.kwargs
+
+    def test_streamer_sends_preserialized_body(self):
+        streamer = IOIntelligenceStreamer("k", "https://x", max_retries=0)
+        response = MagicMock(ok=True, status_code=200, headers={})
+        response.iter_content.return_value = iter([b"data: [DONE]\n\n"])
+        response.__enter__.return_value = response
+        with patch.object(streamer.session, "post", return_value=response) as post:
+            list(streamer.stream_raw({"model": "m"}))
+        assert codec.loads(post.call_args.kwargs["data"]) == {"model": "m", "stream": True}
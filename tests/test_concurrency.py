@@ -0,0 +1,190 @@
+"""Tests for the adaptive (AIMD) concurrency limiter."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from conftest import chat_body
+
+from langchain_iointelligence.concurrency import AdaptiveConcurrencyLimiter
+from langchain_iointelligence.exceptions import IOIntelligenceRateLimitError
+
+
+class _Server:
+    """Async MockTransport handler recording peak concurrency."""
+
+    def __init__(self, status=200, delay=0.005):
+        self.status = status
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def __call__(self, request):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "busy"})
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        return httpx.Response(200, json=chat_body(prompt.upper()))
+
+
+def _take(limiter, count):
+    async def _run():
+        return [await limiter.acquire() for _ in range(count)]
+
+    return asyncio.run(_run())
+
+
+class TestAdaptiveConcurrencyLimiter:
+    def test_grows_additively_only_while_saturated(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, latency_tolerance=None)
+        for _ in range(4):
+            with _take(limiter, 1)[0] as slot:  # 1 of 4 in flight: idle
+                slot.observe(200)
+        assert limiter.limit == 4
+
+        for _ in range(4):
+            slots = _take(limiter, limiter.limit)
+            for slot in slots:
+                slot.observe(200)
+            for slot in slots:
+                slot.release()
+        assert 5 <= limiter.limit <= 8  # about +1 per full round
+
+    def test_backs_off_once_per_round(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, clock=clock)
+        slots = _take(limiter, 3)
+        clock.now = 1.0
+        slots[0].observe(429)
+        assert limiter.limit == 8
+        slots[1].observe_overload()  # sent before the backoff
+        assert limiter.limit == 8
+        for slot in slots:
+            slot.release()
+
+        with _take(limiter, 1)[0] as slot:
+            slot.observe(503)
+        assert limiter.limit == 4
+        assert limiter.backoffs == 2
+
+    def test_server_errors_are_neutral_and_min_limit_holds(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+        with _take(limiter, 1)[0] as slot:
+            slot.observe(500)
+        assert limiter.limit == 2
+        with _take(limiter, 1)[0] as slot:
+            slot.observe(429)
+        assert limiter.limit == 2
+        assert limiter.in_flight == 0
+
+    def test_latency_inflation_backs_off(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=8, latency_tolerance=2.0, min_samples=5, clock=clock
+        )
+
+        def _request(latency):
+            with _take(limiter, 1)[0] as slot:
+                clock.now += latency
+                slot.observe(200)
+
+        for _ in range(10):
+            _request(0.1)
+        assert limiter.backoffs == 0
+        for _ in range(5):
+            _request(2.0)
+        assert limiter.backoffs >= 1
+        assert limiter.limit < 8
+
+    def test_waiters_queue_and_cancelled_waiter_does_not_leak(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, latency_tolerance=None)
+
+        async def _run():
+            first = await limiter.acquire()
+            cancelled = asyncio.ensure_future(limiter.acquire())
+            waiting = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.stats()["waiting"] == 2
+            cancelled.cancel()
+            first.release()
+            second = await asyncio.wait_for(waiting, 1)
+            assert limiter.in_flight == 1
+            second.release()
+            await asyncio.gather(cancelled, return_exceptions=True)
+
+        asyncio.run(_run())
+        assert limiter.in_flight == 0
+        assert limiter.stats()["waiting"] == 0
+
+    def test_rejects_bad_settings(self):
+        with pytest.raises(ValueError):
+            AdaptiveConcurrencyLimiter(min_limit=5, max_limit=2)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrencyLimiter(backoff=1.0)
+
+
+class TestAsyncClientUsesLimiter:
+    def test_caps_requests_in_flight(self, make_async_client):
+        server = _Server()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        client = make_async_client(server, concurrency_limiter=limiter)
+
+        async def _run():
+            data = {"model": "m", "messages": [{"role": "user", "content": "x"}]}
+            return await asyncio.gather(*(client.apost_with_retry(data) for _ in range(6)))
+
+        assert len(asyncio.run(_run())) == 6
+        assert server.peak == 2
+        assert limiter.in_flight == 0
+
+    def test_rate_limit_shrinks_limit(self, make_async_client):
+        server = _Server(status=429)
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        client = make_async_client(server, concurrency_limiter=limiter, max_retries=0)
+        with pytest.raises(IOIntelligenceRateLimitError):
+            asyncio.run(client.apost_with_retry({"model": "m"}))
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    def test_stream_holds_slot_until_finished(self, make_async_client):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+        def _handler(request):
+            return httpx.Response(
+                200,
+                content=b'data: {"choices": []}\n\ndata: [DONE]\n\n',
+                headers={"content-type": "text/event-stream"},
+            )
+
+        client = make_async_client(_handler, concurrency_limiter=limiter)
+
+        async def _run():
+            stream = client.astream({"model": "m"})
+            await stream.__anext__()
+            assert limiter.in_flight == 1
+            async for _ in stream:
+                pass
+
+        asyncio.run(_run())
+        assert limiter.in_flight == 0
+
+
+class TestChatModelUsesLimiter:
+    def test_abatch_is_paced_by_limiter(self, make_model):
+        server = _Server()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=16)
+        chat = make_model(batch_max_concurrency=1, concurrency_limiter=limiter)
+        assert chat.async_http_client.concurrency_limiter is limiter
+        chat.async_http_client._build_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(server)
+        )
+        out = asyncio.run(chat.abatch([f"p{i}" for i in range(12)]))
+        assert [m.content for m in out] == [f"P{i}" for i in range(12)]
+        # More than batch_max_concurrency, never more than the limiter allows.
+        assert 1 < server.peak <= limiter.max_limit
@@ -0,0 +1,100 @@
+"""Tests for the model fallback chain."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+import pytest
+
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.exceptions import (IOIntelligenceAuthenticationError,
+                                                 IOIntelligenceRateLimitError,
+                                                 IOIntelligenceServerError)
+from langchain_iointelligence.fallback import ModelFallbackChain
+from langchain_iointelligence.retry import RateLimitInfo
+
+
+def _answer(data, timing=None, max_retries=None):
+    return {"choices": [{"message": {"content": f"from {data['model']}"}}]}
+
+
+@pytest.fixture
+def chat(make_model):
+    return make_model(model="big", fallback_models=["medium", "unknown", "small"])
+
+
+def _utils():
+    utils = MagicMock()
+    utils.get_catalog.return_value = {"big", "medium", "small"}
+    utils.aget_catalog = AsyncMock(return_value={"big", "medium", "small"})
+    return utils
+
+
+class TestModelFallbackChain:
+    def test_cooling_models_go_last(self, clock):
+        chain = ModelFallbackChain(["b", "c"], cooldown=10, clock=clock)
+        assert chain.candidates("a") == ["a", "b", "c"]
+        chain.mark_failed("a", IOIntelligenceServerError("boom", 503))
+        limited = IOIntelligenceRateLimitError("slow down", 429, rate_limit=RateLimitInfo(retry_after=5))
+        chain.mark_failed("b", limited)
+        assert chain.candidates("a") == ["c", "b", "a"]
+        assert chain.cooling_down() == {"a": 10, "b": 5}
+        clock.now = 6
+        assert chain.candidates("a") == ["b", "c", "a"]
+        chain.mark_ok("a")
+        assert chain.candidates("a") == ["a", "b", "c"]
+
+
+class TestChatFallback:
+    def test_rate_limited_model_falls_back_immediately(self, chat):
+        client = MagicMock()
+
+        def _post(data, timing=None, max_retries=None):
+            if data["model"] == "big":
+                raise IOIntelligenceRateLimitError("slow down", 429)
+            return _answer(data)
+
+        client.post_with_retry.side_effect = _post
+        with patch.object(IOIntelligenceChatModel, "http_client", new_callable=PropertyMock, return_value=client), \
+                patch.object(IOIntelligenceChatModel, "utils", new_callable=PropertyMock, return_value=_utils()):
+            message = chat.invoke("hi")
+            calls = [(c.args[0]["model"], c.kwargs["max_retries"]) for c in client.post_with_retry.call_args_list]
+            assert calls == [("big", 0), ("medium", 0)]
+            assert message.content == "from medium"
+            assert message.response_metadata["model"] == "medium"
+            assert message.response_metadata["fallback_from"] == "big"
+
+            # "big" is cooling down: the next request starts with "medium".
+            client.post_with_retry.reset_mock()
+            chat.invoke("again")
+            assert client.post_with_retry.call_args.args[0]["model"] == "medium"
+        assert chat._fallbacks.fallback_models == ["medium", "small"]
+
+    def test_last_resort_keeps_retries_and_other_errors_propagate(self, chat):
+        client = MagicMock()
+        client.post_with_retry.side_effect = IOIntelligenceServerError("down", 503)
+        with patch.object(IOIntelligenceChatModel, "http_client", new_callable=PropertyMock, return_value=client), \
+                patch.object(IOIntelligenceChatModel, "utils", new_callable=PropertyMock, return_value=_utils()):
+            with pytest.raises(IOIntelligenceServerError):
+                chat.invoke("hi")
+            assert [c.kwargs["max_retries"] for c in client.post_with_retry.call_args_list] == [0, 0, None]
+
+            client.post_with_retry.reset_mock()
+            client.post_with_retry.side_effect = IOIntelligenceAuthenticationError("bad key", 401)
+            with pytest.raises(IOIntelligenceAuthenticationError):
+                chat.invoke("hi")
+            assert client.post_with_retry.call_count == 1
+
+    def test_async_fallback(self, chat):
+        client = MagicMock()
+
+        async def _apost(data, timing=None, max_retries=None):
+            if data["model"] == "big":
+                raise IOIntelligenceServerError("overloaded", 503)
+            return _answer(data)
+
+        client.apost_with_retry = _apost
+        with patch.object(IOIntelligenceChatModel, "async_http_client", new_callable=PropertyMock, return_value=client), \
+                patch.object(IOIntelligenceChatModel, "utils", new_callable=PropertyMock, return_value=_utils()):
+            message = asyncio.run(chat.ainvoke("hi"))
+        assert message.content == "from medium"
+        assert message.response_metadata["fallback_from"] == "big"
@@ -0,0 +1,123 @@
+"""Tests for hedged async requests."""
+
+import asyncio
+
+import pytest
+
+from langchain_iointelligence.async_http_client import IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.cache import InMemoryResponseCache
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.exceptions import IOIntelligenceServerError
+from langchain_iointelligence.hedging import HedgePolicy
+from langchain_iointelligence.timing import RequestTiming
+
+
+def _client(policy, delays, fail=()):
+    """Client whose attempts answer after ``delays[model]`` seconds."""
+    client = IOIntelligenceAsyncHTTPClient("k", "https://x", hedge=policy)
+    client.calls = []
+    client.cancelled = []
+
+    async def _post(data, timing=None, max_retries=None):
+        model = data["model"]
+        client.calls.append(model)
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            client.cancelled.append(model)
+            raise
+        if model in fail:
+            raise IOIntelligenceServerError("boom", 503)
+        return {"model": model}
+
+    client._apost_with_retry = _post
+    return client
+
+
+class TestHedgePolicy:
+    def test_learned_delay_is_percentile(self):
+        policy = HedgePolicy(percentile=0.9, min_samples=10)
+        for latency in range(1, 10):
+            policy.record(latency / 10)
+        assert policy.hedge_delay() is None
+        policy.record(1.0)
+        assert policy.hedge_delay() == 0.9
+        assert HedgePolicy(delay=0.2).hedge_delay() == 0.2
+
+    def test_budget_caps_hedges(self):
+        policy = HedgePolicy(budget=0.5, max_credits=2)
+        assert policy.try_hedge()  # initial credit
+        assert not policy.try_hedge()
+        policy.on_request()
+        policy.on_request()
+        assert policy.try_hedge()
+        assert policy.hedge_request({"model": "a"}) == {"model": "a"}
+        assert HedgePolicy(fallback_model="b").hedge_request({"model": "a"}) == {"model": "b"}
+
+
+class TestHedgedClient:
+    def test_slow_primary_loses_to_hedge(self):
+        policy = HedgePolicy(delay=0.01, fallback_model="fast")
+        client = _client(policy, {"slow": 1.0, "fast": 0.0})
+        timing = RequestTiming()
+        result = asyncio.run(client.apost_with_retry({"model": "slow"}, timing=timing))
+        assert result == {"model": "fast"}
+        assert client.cancelled == ["slow"]
+        assert timing.hedged and timing.to_metadata()["hedged"] is True
+        assert timing.served_model == "fast"
+        assert (policy.hedges, policy.hedge_wins) == (1, 1)
+
+    def test_fast_primary_is_not_hedged(self):
+        policy = HedgePolicy(delay=0.5, fallback_model="other")
+        client = _client(policy, {"m": 0.0, "other": 0.0})
+        assert asyncio.run(client.apost_with_retry({"model": "m"})) == {"model": "m"}
+        assert client.calls == ["m"]
+        assert policy.hedges == 0
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        policy = HedgePolicy(delay=0.01, fallback_model="backup")
+        client = _client(policy, {"m": 0.05, "backup": 0.1}, fail={"m"})
+        assert asyncio.run(client.apost_with_retry({"model": "m"})) == {"model": "backup"}
+
+        client = _client(HedgePolicy(delay=0.01, fallback_model="b"), {"m": 0.02, "b": 0.03}, fail={"m", "b"})
+        with pytest.raises(IOIntelligenceServerError):
+            asyncio.run(client.apost_with_retry({"model": "m"}))
+
+    def test_exhausted_budget_waits_for_primary(self):
+        policy = HedgePolicy(delay=0.0, budget=0.0, fallback_model="other")
+        client = _client(policy, {"m": 0.02, "other": 0.0})
+
+        async def _run():
+            return [await client.apost_with_retry({"model": "m"}) for _ in range(3)]
+
+        # Only the initial credit is spent; later requests wait for the primary.
+        assert asyncio.run(_run()) == [{"model": "other"}, {"model": "m"}, {"model": "m"}]
+        assert client.calls.count("other") == 1
+
+
+class TestHedgedChatModel:
+    def test_fallback_model_hedge_is_reported_and_not_cached(self):
+        cache = InMemoryResponseCache()
+        chat = IOIntelligenceChatModel(
+            api_key="k",
+            api_url="https://x",
+            model="slow",
+            temperature=0,
+            response_cache=cache,
+            hedge_policy=HedgePolicy(delay=0.01, fallback_model="fast"),
+        )
+        client = chat.async_http_client
+        delays = {"slow": 1.0, "fast": 0.0}
+
+        async def _post(data, timing=None, max_retries=None):
+            await asyncio.sleep(delays[data["model"]])
+            return {
+                "choices": [{"finish_reason": "stop", "message": {"content": data["model"]}}],
+            }
+
+        client._apost_with_retry = _post
+        message = asyncio.run(chat.ainvoke("hi"))
+        assert message.content == "fast"
+        assert message.response_metadata["fallback_from"] == "slow"
+        assert message.response_metadata["model"] == "fast"
+        assert len(cache) == 0
@@ -0,0 +1,74 @@
+"""Tests for the message serialization cache."""
+
+import gc
+import json
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from langchain_iointelligence.chat import (IOIntelligenceChatModel,
+                                           _convert_message_to_dict)
+from langchain_iointelligence.message_cache import MessageSerializationCache
+
+
+def _conversation(turns):
+    messages = [HumanMessage(content="start")]
+    for i in range(turns):
+        messages.append(
+            AIMessage(content="", tool_calls=[{"name": "f", "args": {"i": i}, "id": f"c{i}"}])
+        )
+        messages.append(ToolMessage(content=str(i), tool_call_id=f"c{i}"))
+    return messages
+
+
+class TestMessageSerializationCache:
+    def test_matches_uncached_conversion(self):
+        messages = _conversation(3)
+        cache = MessageSerializationCache()
+        assert cache.convert_all(messages) == [_convert_message_to_dict(m) for m in messages]
+
+    def test_appending_a_turn_converts_only_new_messages(self):
+        messages = _conversation(50)
+        cache = MessageSerializationCache()
+        cache.convert_all(messages)
+        messages.append(HumanMessage(content="next"))
+        with patch("langchain_iointelligence.chat._lc_tool_call_to_openai") as convert_tool_call:
+            cache.convert_all(messages)
+        convert_tool_call.assert_not_called()
+        assert (cache.misses, cache.hits) == (102, 101)
+
+    def test_encode_all_is_valid_json(self):
+        messages = _conversation(2)
+        cache = MessageSerializationCache()
+        encoded = cache.encode_all(messages)
+        assert json.loads(encoded) == cache.convert_all(messages)
+        assert cache.encode(messages[1]) is cache.encode(messages[1])
+
+    def test_entries_dropped_with_their_messages(self):
+        cache = MessageSerializationCache()
+        messages = _conversation(2)
+        cache.convert_all(messages)
+        assert len(cache) == 5
+        del messages
+        gc.collect()
+        assert len(cache) == 0
+
+    def test_invalidate_after_mutation(self):
+        cache = MessageSerializationCache()
+        message = HumanMessage(content="a")
+        cache.convert(message)
+        message.content = "b"
+        cache.invalidate(message)
+        assert cache.convert(message)["content"] == "b"
+
+
+class TestChatModelMessageCache:
+    def test_request_uses_cache(self):
+        cache = MessageSerializationCache()
+        chat = IOIntelligenceChatModel(api_key="k", api_url="https://x", message_cache=cache)
+        messages = _conversation(2)
+        first = chat._build_request_data(messages, None)
+        second = chat._build_request_data(messages, None)
+        assert first["messages"] == second["messages"]
+        assert first["messages"][1] is second["messages"][1]
+        assert cache.hits == len(messages)
@@ -0,0 +1,248 @@
+"""Tests for the client-side token-bucket rate limiter."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from langchain_iointelligence.async_http_client import IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.concurrency import AdaptiveConcurrencyLimiter
+from langchain_iointelligence.exceptions import IOIntelligenceRateLimitError
+from langchain_iointelligence.http_client import IOIntelligenceHTTPClient
+from langchain_iointelligence.rate_limit import (IOIntelligenceRateLimiter,
+                                                 TokenBucket,
+                                                 estimate_request_tokens,
+                                                 get_rate_limiter)
+from langchain_iointelligence.streaming import IOIntelligenceStreamer
+
+
+class TestTokenBucket:
+    def test_reserve_within_capacity_does_not_wait(self, clock):
+        bucket = TokenBucket(2, 1.0, clock)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+
+    def test_reserve_beyond_capacity_returns_wait(self, clock):
+        bucket = TokenBucket(2, 1.0, clock)
+        bucket.reserve(2)
+        assert bucket.reserve() == 1.0
+        # A second caller queues behind the first reservation.
+        assert bucket.reserve() == 2.0
+
+    def test_refill_over_time(self, clock):
+        bucket = TokenBucket(2, 1.0, clock)
+        bucket.reserve(2)
+        clock.now = 1.5
+        assert bucket.available == 1.5
+
+    def test_refund_caps_at_capacity(self, clock):
+        bucket = TokenBucket(10, 1.0, clock)
+        bucket.reserve(4)
+        bucket.refund(100)
+        assert bucket.available == 10
+
+
+class TestRateLimiter:
+    def test_request_bucket_is_per_model(self, clock):
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1, clock=clock)
+        assert limiter.reserve("a") == 0.0
+        assert limiter.reserve("b") == 0.0
+        assert limiter.reserve("a") == 60.0
+
+    def test_token_bucket_paces_large_requests(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        assert limiter.reserve("m", 600) == 0.0
+        # 300 more tokens at 10 tokens/s.
+        assert limiter.reserve("m", 300) == 30.0
+
+    def test_reconcile_refunds_unused_tokens(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        limiter.reserve("m", 600)
+        limiter.reconcile("m", 600, 100)
+        assert limiter.reserve("m", 500) == 0.0
+
+    def test_acquire_sleeps_for_wait(self, clock):
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1, clock=clock)
+        with patch("langchain_iointelligence.rate_limit.time.sleep") as sleep:
+            limiter.acquire({"model": "m"})
+            limiter.acquire({"model": "m"})
+        sleep.assert_called_once_with(60.0)
+
+    def test_aacquire_sleeps_for_wait(self, clock):
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1, clock=clock)
+
+        async def _fake_sleep(seconds):
+            slept.append(seconds)
+
+        slept = []
+        with patch("langchain_iointelligence.rate_limit.asyncio.sleep", _fake_sleep):
+            asyncio.run(limiter.aacquire({"model": "m"}))
+            asyncio.run(limiter.aacquire({"model": "m"}))
+        assert slept == [60.0]
+
+    def test_estimate_request_tokens(self):
+        data = {
+            "max_tokens": 100,
+            "messages": [
+                {"role": "user", "content": "x" * 40},
+                {"role": "user", "content": [{"type": "text", "text": "y" * 40}]},
+            ],
+        }
+        assert estimate_request_tokens(data) == 121
+
+
+class TestSharedLimiter:
+    def test_no_limits_returns_none(self):
+        assert get_rate_limiter("key") is None
+
+    def test_shared_per_api_key(self):
+        a = get_rate_limiter("shared-key", 60)
+        b = get_rate_limiter("shared-key", 60)
+        c = get_rate_limiter("other-key", 60)
+        assert a is b
+        assert a is not c
+
+    def test_chat_model_clients_share_limiter(self):
+        chat = IOIntelligenceChatModel(
+            api_key="limit-key",
+            api_url="https://test.api.com/v1/chat/completions",
+            requests_per_minute=30,
+        )
+        limiter = chat.http_client.rate_limiter
+        assert limiter is not None
+        assert chat.async_http_client.rate_limiter is limiter
+        assert chat.streamer.rate_limiter is limiter
+
+    def test_http_client_consults_limiter_before_sending(self):
+        limiter = MagicMock()
+        limiter.acquire.return_value = 50
+        client = IOIntelligenceHTTPClient("k", "https://x", max_retries=0, rate_limiter=limiter)
+        response = MagicMock(ok=True, headers={})
+        response.content = b'{"usage": {"total_tokens": 10}}'
+        with patch.object(client.session, "post", return_value=response):
+            client.post_with_retry({"model": "m"})
+        limiter.acquire.assert_called_once_with({"model": "m"})
+        limiter.record_usage.assert_called_once_with(
+            {"model": "m"}, 50, {"usage": {"total_tokens": 10}}
+        )
+
+
+def _sse_response(status_code=200, lines=()):
+    response = MagicMock(ok=status_code < 400, status_code=status_code, text="", headers={})
+    response.content = b'{"usage": {"total_tokens": 30}}'
+    response.iter_content.return_value = iter(f"{line}\n\n".encode() for line in lines)
+    response.__enter__.return_value = response
+    return response
+
+
+class TestReservationAccounting:
+    def test_acquire_returns_clipped_reservation(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=100, clock=clock)
+        reserved = limiter.acquire({"model": "m", "max_tokens": 500})
+        assert reserved == 100
+        limiter.record_usage({"model": "m"}, reserved, {"usage": {"total_tokens": 40}})
+        # 40 of 100 used: 60 back, never more than was deducted.
+        assert limiter.reserve("m", 60) == 0.0
+        assert limiter.reserve("m", 1) > 0
+
+    def test_failed_attempt_is_refunded(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        client = IOIntelligenceHTTPClient("k", "https://x", max_retries=1, rate_limiter=limiter)
+        data = {"model": "m", "max_tokens": 100}
+        with patch.object(client.session, "post", side_effect=[_sse_response(503), _sse_response()]), \
+                patch("langchain_iointelligence.http_client.time.sleep"):
+            client.post_with_retry(data)
+        # Only the successful attempt's 30 tokens stay charged.
+        assert limiter.reserve("m", 570) == 0.0
+        assert limiter.reserve("m", 1) > 0
+
+    def test_stream_reconciles_final_usage_chunk(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        streamer = IOIntelligenceStreamer("k", "https://x", max_retries=1, rate_limiter=limiter)
+        lines = [
+            'data: {"choices": [{"delta": {"content": "hi"}}]}',
+            'data: {"choices": [], "usage": {"total_tokens": 30}}',
+            "data: [DONE]",
+        ]
+        with patch.object(streamer.session, "post", side_effect=[_sse_response(429), _sse_response(lines=lines)]), \
+                patch("langchain_iointelligence.streaming.time.sleep"):
+            list(streamer.stream_raw({"model": "m", "max_tokens": 100}))
+        assert limiter.reserve("m", 570) == 0.0
+        assert limiter.reserve("m", 1) > 0
+
+    def test_async_stream_refunds_error_and_reconciles_usage(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        body = (
+            b'data: {"choices": [], "usage": {"total_tokens": 30}}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        statuses = [429, 200]
+
+        def _handler(request):
+            status = statuses.pop(0)
+            return httpx.Response(status, content=body if status == 200 else b"{}")
+
+        client = IOIntelligenceAsyncHTTPClient("k", "https://x", rate_limiter=limiter)
+        client._build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+
+        async def _consume():
+            return [chunk async for chunk in client.astream({"model": "m", "max_tokens": 100})]
+
+        with pytest.raises(IOIntelligenceRateLimitError):
+            asyncio.run(_consume())
+        asyncio.run(_consume())
+        assert limiter.reserve("m", 570) == 0.0
+        assert limiter.reserve("m", 1) > 0
+
+    def test_cancelled_wait_refunds_reservation(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        limiter.reserve("m", 600)
+
+        async def _run():
+            waiter = asyncio.ensure_future(limiter.aacquire({"model": "m", "max_tokens": 99}))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(_run())
+        # Only the 600 reserved up front is owed: one more token is 0.1s away.
+        assert limiter.reserve("m", 1) == pytest.approx(0.1)
+
+    def test_async_stream_cancelled_before_sending_refunds(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+        slots = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        client = IOIntelligenceAsyncHTTPClient(
+            "k", "https://x", rate_limiter=limiter, concurrency_limiter=slots
+        )
+
+        async def _run():
+            held = await slots.acquire()
+            stream = client.astream({"model": "m", "max_tokens": 100})
+            waiter = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            held.release()
+
+        asyncio.run(_run())
+        assert limiter.reserve("m", 600) == 0.0
+
+    def test_async_stream_rate_limit_pauses_model(self, clock):
+        limiter = IOIntelligenceRateLimiter(tokens_per_minute=600, clock=clock)
+
+        def _handler(request):
+            return httpx.Response(429, headers={"Retry-After": "30"}, content=b"{}")
+
+        client = IOIntelligenceAsyncHTTPClient("k", "https://x", rate_limiter=limiter)
+        client._build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+
+        async def _consume():
+            return [chunk async for chunk in client.astream({"model": "m"})]
+
+        with pytest.raises(IOIntelligenceRateLimitError):
+            asyncio.run(_consume())
+        assert limiter.reserve("m", 0) == pytest.approx(30.0)
@@ -0,0 +1,158 @@
+"""Tests for mid-stream resumption of dropped streams."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.exceptions import (
+    IOIntelligenceConnectionError, IOIntelligenceInvalidResponseError,
+    IOIntelligenceServerError)
+from langchain_iointelligence.resume import (StreamResumeState,
+                                             aresumable_stream,
+                                             resumable_stream)
+
+
+def _content(text, finish_reason=None):
+    return {"choices": [{"delta": {"content": text}, "finish_reason": finish_reason}]}
+
+
+def _tool(index, arguments, call_id=None, name=None):
+    tool_call = {"index": index, "function": {"arguments": arguments}}
+    if call_id:
+        tool_call["id"] = call_id
+        tool_call["function"]["name"] = name
+    return {"choices": [{"delta": {"tool_calls": [tool_call]}, "finish_reason": None}]}
+
+
+class _FlakyStream:
+    """Replays scripted attempts; an exception entry ends the attempt."""
+
+    def __init__(self, *attempts):
+        self.attempts = list(attempts)
+        self.requests = []
+
+    def __call__(self, data):
+        self.requests.append(data)
+        for item in self.attempts.pop(0):
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def _text(chunks):
+    return "".join(c["choices"][0]["delta"].get("content") or "" for c in chunks if c["choices"])
+
+
+_DROP = IOIntelligenceConnectionError("Connection error: reset")
+_DATA = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+
+
+class TestContinueMode:
+    def test_continuation_request_carries_assistant_prefix(self):
+        stream = _FlakyStream(
+            [_content("Hello"), _content(" wor"), _DROP],
+            [_content("ld"), _content("!", "stop")],
+        )
+        chunks = list(resumable_stream(stream, _DATA, "continue"))
+        assert _text(chunks) == "Hello world!"
+        retry = stream.requests[1]
+        assert retry["messages"][-1] == {"role": "assistant", "content": "Hello wor"}
+        assert retry["continue_final_message"] is True
+        assert retry["add_generation_prompt"] is False
+        assert len(_DATA["messages"]) == 1
+
+    def test_falls_back_to_restart_after_tool_call_deltas(self):
+        state = StreamResumeState("continue")
+        state.accept(_tool(0, '{"a"', call_id="c1", name="f"))
+        assert state.next_request(_DATA) is _DATA
+
+
+class TestRestartMode:
+    def test_already_emitted_text_is_skipped(self):
+        stream = _FlakyStream(
+            [_content("Hel"), _content("lo wo"), _DROP],
+            [_content("Hello"), _content(" world"), _content("", "stop")],
+        )
+        chunks = list(resumable_stream(stream, _DATA, "restart"))
+        assert _text(chunks) == "Hello world"
+        assert stream.requests[1] is _DATA
+
+    def test_tool_call_arguments_are_deduplicated(self):
+        stream = _FlakyStream(
+            [_tool(0, '{"q": ', call_id="c1", name="lookup"), _DROP],
+            [_tool(0, "", call_id="c1", name="lookup"), _tool(0, '{"q": "x"}')],
+        )
+        chunks = list(resumable_stream(stream, _DATA, "restart"))
+        tool_calls = [c["choices"][0]["delta"]["tool_calls"][0] for c in chunks]
+        assert [tc.get("id") for tc in tool_calls] == ["c1", None]
+        assert "".join(tc["function"]["arguments"] for tc in tool_calls) == '{"q": "x"}'
+
+
+    def test_diverging_replay_raises(self):
+        stream = _FlakyStream(
+            [_content("Hel"), _content("lo wo"), _DROP],
+            [_content("Hi there"), _content(" friend", "stop")],
+        )
+        with pytest.raises(IOIntelligenceInvalidResponseError, match="diverged"):
+            list(resumable_stream(stream, _DATA, "restart"))
+
+    def test_diverging_tool_arguments_raise(self):
+        stream = _FlakyStream(
+            [_tool(0, '{"q": "a', call_id="c1", name="lookup"), _DROP],
+            [_tool(0, '{"q": "b"}', call_id="c1", name="lookup")],
+        )
+        with pytest.raises(IOIntelligenceInvalidResponseError):
+            list(resumable_stream(stream, _DATA, "restart"))
+
+
+class TestLimits:
+    def test_gives_up_after_max_resumes(self):
+        stream = _FlakyStream([_content("a"), _DROP], [_DROP])
+        with pytest.raises(IOIntelligenceConnectionError):
+            list(resumable_stream(stream, _DATA, "restart", max_resumes=1))
+
+    def test_api_errors_are_not_resumed(self):
+        stream = _FlakyStream([IOIntelligenceServerError("boom")])
+        with pytest.raises(IOIntelligenceServerError):
+            list(resumable_stream(stream, _DATA, "restart"))
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            StreamResumeState("rewind")
+
+
+class TestChatModelResume:
+    def test_astream_resumes_dropped_stream(self):
+        chat = IOIntelligenceChatModel(
+            api_key="k", api_url="https://x", stream_resume="continue"
+        )
+        flaky = _FlakyStream(
+            [_content("one "), _DROP], [_content("two", "stop")]
+        )
+
+        async def _astream(data):
+            for chunk in flaky(data):
+                yield chunk
+
+        mock_client = Mock()
+        mock_client.astream = _astream
+
+        async def _collect():
+            return [c.text async for c in chat._astream([HumanMessage(content="count")])]
+
+        with patch.object(IOIntelligenceChatModel, "async_http_client", mock_client):
+            assert "".join(asyncio.run(_collect())) == "one two"
+        assert len(flaky.requests) == 2
+
+    def test_async_wrapper_passes_through_complete_stream(self):
+        async def _astream(data):
+            for chunk in [_content("hi", "stop")]:
+                yield chunk
+
+        async def _collect():
+            return [c async for c in aresumable_stream(_astream, _DATA)]
+
+        assert _text(asyncio.run(_collect())) == "hi"
@@ -0,0 +1,164 @@
+"""Tests for rate-limit header parsing and retry scheduling."""
+
+import asyncio
+import json
+import time
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_iointelligence.async_http_client import \
+    IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.exceptions import (IOIntelligenceRateLimitError,
+                                                 classify_api_error)
+from langchain_iointelligence.http_client import IOIntelligenceHTTPClient
+from langchain_iointelligence.rate_limit import IOIntelligenceRateLimiter
+from langchain_iointelligence.retry import (RATE_LIMIT_FALLBACK_DELAY,
+                                            RateLimitInfo, compute_retry_delay,
+                                            parse_rate_limit_headers)
+
+
+class TestParseHeaders:
+    def test_retry_after_seconds(self):
+        info = parse_rate_limit_headers({"Retry-After": "2"})
+        assert info.retry_after == 2.0
+        assert info.suggested_delay == 2.0
+
+    def test_retry_after_http_date(self):
+        info = parse_rate_limit_headers(
+            {"Retry-After": formatdate(time.time() + 30, usegmt=True)}
+        )
+        assert 28 <= info.retry_after <= 30
+
+    def test_retry_after_ms(self):
+        info = parse_rate_limit_headers({"retry-after-ms": "250"})
+        assert info.retry_after == 0.25
+
+    @pytest.mark.parametrize(
+        "value,expected", [("1s", 1.0), ("20ms", 0.02), ("6m0s", 360.0), ("1.5", 1.5)]
+    )
+    def test_reset_durations(self, value, expected):
+        info = parse_rate_limit_headers({"x-ratelimit-reset-requests": value})
+        assert info.reset_requests == pytest.approx(expected)
+
+    def test_exhausted_budget_uses_its_reset(self):
+        info = parse_rate_limit_headers(
+            {
+                "x-ratelimit-remaining-requests": "10",
+                "x-ratelimit-remaining-tokens": "0",
+                "x-ratelimit-reset-requests": "30s",
+                "x-ratelimit-reset-tokens": "4s",
+            }
+        )
+        assert info.exhausted
+        assert info.suggested_delay == 4.0
+
+    def test_garbage_is_ignored(self):
+        info = parse_rate_limit_headers(
+            {"Retry-After": "soon", "x-ratelimit-remaining-requests": "n/a"}
+        )
+        assert info.retry_after is None
+        assert info.remaining_requests is None
+        assert info.suggested_delay is None
+
+    def test_no_headers(self):
+        assert parse_rate_limit_headers(None).suggested_delay is None
+
+
+class TestComputeRetryDelay:
+    def test_server_hint_with_bounded_jitter(self):
+        for _ in range(20):
+            delay = compute_retry_delay(0, 1.0, RateLimitInfo(retry_after=2.0), is_rate_limit=True)
+            assert 2.0 <= delay <= 2.2
+
+    def test_rate_limit_without_hint_falls_back(self):
+        assert compute_retry_delay(0, 1.0, RateLimitInfo(), is_rate_limit=True) == RATE_LIMIT_FALLBACK_DELAY
+
+    def test_exponential_backoff_with_jitter(self):
+        for _ in range(20):
+            assert 2.0 <= compute_retry_delay(2, 1.0) <= 4.0
+
+
+class TestClassifyCarriesHints:
+    def test_rate_limit_error_has_retry_after(self):
+        error = classify_api_error(429, "slow down", {"Retry-After": "3"})
+        assert isinstance(error, IOIntelligenceRateLimitError)
+        assert error.retry_after == 3.0
+
+    def test_server_error_retry_after(self):
+        assert classify_api_error(503, "", {"Retry-After": "5"}).retry_after == 5.0
+
+    def test_no_headers(self):
+        assert classify_api_error(429).retry_after is None
+
+
+class TestClientsHonourRetryAfter:
+    def test_sync_client_sleeps_for_server_delay(self):
+        client = IOIntelligenceHTTPClient("k", "https://x", max_retries=1)
+        limited = MagicMock(ok=False, status_code=429, text="", headers={"Retry-After": "2"})
+        ok = MagicMock(ok=True, headers={})
+        ok.content = b'{"ok": true}'
+        with patch.object(client.session, "post", side_effect=[limited, ok]):
+            with patch("langchain_iointelligence.http_client.time.sleep") as sleep:
+                assert client.post_with_retry({"model": "m"}) == {"ok": True}
+        (delay,), _ = sleep.call_args
+        assert 2.0 <= delay <= 2.2
+
+    def test_async_client_sleeps_for_server_delay(self):
+        class _Resp:
+            def __init__(self, status_code, json_data=None, headers=None):
+                self.status_code = status_code
+                self._json = json_data
+                self.text = ""
+                self.headers = headers or {}
+
+            @property
+            def content(self):
+                return json.dumps(self._json).encode()
+
+        queue = [_Resp(429, headers={"Retry-After": "2"}), _Resp(200, {"ok": True})]
+
+        class _FakeClient:
+            is_closed = False
+
+            def __init__(self, *a, **k):
+                pass
+
+            async def post(self, url, headers=None, content=None):
+                return queue.pop(0)
+
+        slept = []
+
+        async def _fake_sleep(seconds):
+            slept.append(seconds)
+
+        import langchain_iointelligence.async_http_client as mod
+
+        client = IOIntelligenceAsyncHTTPClient("k", "https://x", max_retries=1)
+        with patch.object(mod.httpx, "AsyncClient", _FakeClient), patch.object(
+            mod.asyncio, "sleep", _fake_sleep
+        ):
+            assert asyncio.run(client.apost_with_retry({"model": "m"})) == {"ok": True}
+        assert len(slept) == 1 and 2.0 <= slept[0] <= 2.2
+
+
+class TestLimiterObservesHeaders:
+    def test_retry_after_pauses_shared_model(self):
+        now = [0.0]
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1000, clock=lambda: now[0])
+        limiter.observe("m", RateLimitInfo(retry_after=5.0))
+        assert limiter.reserve("m") == pytest.approx(5.0)
+        assert limiter.reserve("other") == 0.0
+        now[0] = 6.0
+        assert limiter.reserve("m") == 0.0
+
+    def test_exhausted_remaining_pauses_until_reset(self):
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1000, clock=lambda: 0.0)
+        limiter.observe("m", RateLimitInfo(remaining_requests=0, reset_requests=3.0))
+        assert limiter.reserve("m") == pytest.approx(3.0)
+
+    def test_healthy_headers_do_not_pause(self):
+        limiter = IOIntelligenceRateLimiter(requests_per_minute=1000, clock=lambda: 0.0)
+        limiter.observe("m", RateLimitInfo(remaining_requests=50, reset_requests=3.0))
+        assert limiter.reserve("m") == 0.0
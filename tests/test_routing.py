@@ -0,0 +1,190 @@
+"""Tests for multi-endpoint routing and failover."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+
+from langchain_iointelligence.async_http_client import IOIntelligenceAsyncHTTPClient
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.client_pool import get_client_pool
+from langchain_iointelligence.exceptions import IOIntelligenceRateLimitError
+from langchain_iointelligence.http_client import IOIntelligenceHTTPClient
+from langchain_iointelligence.routing import EndpointRouter, resolve_api_url
+
+_A = "https://a.example/v1/chat/completions"
+_B = "https://b.example/v1/chat/completions"
+_OK = {"choices": [{"message": {"content": "ok"}}]}
+
+
+def _response(status):
+    response = MagicMock()
+    response.status_code = status
+    response.ok = status < 400
+    response.content = b'{"choices": [{"message": {"content": "ok"}}]}'
+    response.text = "boom"
+    response.headers = {}
+    return response
+
+
+class TestEndpointRouter:
+    def test_resolve_api_url(self):
+        assert resolve_api_url("https://a.example") == _A
+        assert resolve_api_url("https://a.example/v1/") == _A
+        assert resolve_api_url(_A) == _A
+
+    def test_prefers_unmeasured_then_fast_and_idle(self):
+        router = EndpointRouter([_A, _B])
+        a, b = router.endpoints
+        router.release(router.select(), latency=0.2)  # measures A
+        assert router.select() is b  # B is still unmeasured
+        router.release(b, latency=0.1)
+        assert router.select() is b
+        # B now has one request outstanding: 100ms x 2 == 200ms x 1, tie goes to A.
+        assert router.select() is a
+
+    def test_cold_burst_spreads_over_unmeasured_endpoints(self):
+        router = EndpointRouter([_A, _B, "https://c.example"])
+        for _ in range(6):
+            router.select()
+        assert [e["outstanding"] for e in router.stats()] == [2, 2, 2]
+
+    def test_unmeasured_endpoint_is_scored_at_the_fleet_mean(self):
+        router = EndpointRouter([_A, _B])
+        a, b = router.endpoints
+        router.release(router.select(), latency=0.1)
+        for _ in range(3):
+            router.select()
+        # A (100ms) and unmeasured B (scored at 100ms) share the burst.
+        assert (a.outstanding, b.outstanding) == (1, 2)
+
+    def test_failures_take_endpoint_out_of_rotation(self, clock):
+        router = EndpointRouter([_A, _B], failure_threshold=2, cooldown=10, clock=clock)
+        a, b = router.endpoints
+        for _ in range(2):
+            router.release(router.select(exclude=[b]), failed=True)
+        assert router.stats()[0]["available"] is False
+        assert router.select() is b
+        router.release(b, latency=0.5)
+        clock.now = 11
+        assert router.select() is a  # back after the cooldown (and unmeasured)
+
+    def test_call_fails_over_and_raises_when_exhausted(self):
+        router = EndpointRouter([_A, _B])
+        seen = []
+
+        def _send(url):
+            seen.append(url)
+            if url == _A:
+                raise requests.exceptions.ConnectionError("down")
+            return "ok"
+
+        assert router.call(_send, lambda r: False, (requests.exceptions.ConnectionError,)) == "ok"
+        assert seen == [_A, _B]
+
+        def _down(url):
+            raise requests.exceptions.ConnectionError("down")
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            EndpointRouter([_A, _B]).call(_down, lambda r: False, (requests.exceptions.ConnectionError,))
+        assert all(e["outstanding"] == 0 for e in router.stats())
+
+    def test_throttled_response_counts_against_endpoint(self):
+        router = EndpointRouter([_A, _B])
+        a = router.endpoints[0]
+        router.release(router.select(), latency=0.2)
+        router.release(router.select(), latency=0.2)
+        seen = []
+
+        def _send(url):
+            seen.append(url)
+            return 429
+
+        result = router.call(_send, lambda r: r >= 500, (), is_throttled=lambda r: r == 429)
+        assert result == 429
+        assert seen == [_A]  # returned for Retry-After handling, no failover
+        assert a.failures == 1
+        assert a.ewma_ms == pytest.approx(200.0)  # the fast rejection is not a sample
+
+
+class TestRoutedClients:
+    def test_sync_client_fails_over_without_sleeping(self):
+        router = EndpointRouter([_A, _B])
+        client = IOIntelligenceHTTPClient("k", _A, max_retries=0, router=router)
+        urls = []
+
+        def _post(url, **kwargs):
+            urls.append(url)
+            return _response(503 if url == _A else 200)
+
+        with patch.object(client.session, "post", side_effect=_post), \
+                patch("langchain_iointelligence.http_client.time.sleep") as sleep:
+            assert client.post_with_retry({"model": "m"}) == _OK
+        assert urls == [_A, _B]
+        sleep.assert_not_called()
+        assert router.endpoints[0].failures == 1
+
+    def test_sync_client_reports_rate_limits_to_router(self):
+        router = EndpointRouter([_A, _B])
+        client = IOIntelligenceHTTPClient("k", _A, max_retries=0, router=router)
+        with patch.object(client.session, "post", return_value=_response(429)):
+            with pytest.raises(IOIntelligenceRateLimitError):
+                client.post_with_retry({"model": "m"})
+        assert router.endpoints[0].failures == 1
+        assert router.endpoints[0].ewma_ms is None
+
+    def test_async_client_fails_over_for_post_and_stream(self):
+        router = EndpointRouter([_A, _B])
+        client = IOIntelligenceAsyncHTTPClient("k", _A, max_retries=0, router=router)
+        hosts = []
+
+        def _handler(request):
+            hosts.append(request.url.host)
+            if request.url.host == "a.example":
+                raise httpx.ConnectError("down", request=request)
+            if b'"stream": true' in request.content or b'"stream":true' in request.content:
+                return httpx.Response(200, content=b'data: {"x": 1}\n\ndata: [DONE]\n\n')
+            return httpx.Response(200, json=_OK)
+
+        client._build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+
+        async def _run():
+            result = await client.apost_with_retry({"model": "m"})
+            chunks = [chunk async for chunk in client.astream({"model": "m", "stream": True})]
+            await client.aclose()
+            return result, chunks
+
+        result, chunks = asyncio.run(_run())
+        assert result == _OK
+        assert chunks == [{"x": 1}]
+        assert hosts == ["a.example", "b.example", "a.example", "b.example"]
+
+    def test_chat_model_shares_one_router(self):
+        chat = IOIntelligenceChatModel(api_key="k", endpoints=["https://a.example", _B])
+        assert chat.io_api_url == _A
+        router = chat.endpoint_router
+        assert router.urls == [_A, _B]
+        assert chat.http_client.router is router
+        assert chat.async_http_client.router is router
+        assert chat.streamer.router is router
+        assert IOIntelligenceChatModel(api_key="k", api_url=_A).endpoint_router is None
+
+    def test_shared_routed_clients_build_without_deadlock(self):
+        chat = IOIntelligenceChatModel(api_key="k", endpoints=[_A, _B], share_clients=True)
+        built = []
+        worker = threading.Thread(target=lambda: built.append(chat.http_client), daemon=True)
+        worker.start()
+        worker.join(5)
+        try:
+            assert built, "building a routed shared client deadlocked on the pool lock"
+            router = chat.endpoint_router
+            assert built[0].router is router
+            assert chat.streamer.router is router
+            other = IOIntelligenceChatModel(api_key="k", endpoints=[_A, _B], share_clients=True)
+            assert other.http_client is built[0]
+        finally:
+            if built:
+                get_client_pool().close()
@@ -0,0 +1,102 @@
+"""Tests for the byte-level SSE parser."""
+
+import asyncio
+
+import pytest
+
+from langchain_iointelligence.sse import (SSEParser, aiter_sse_data,
+                                          iter_sse_data)
+
+
+def _parse(*chunks):
+    parser = SSEParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+class TestSSEParser:
+    def test_single_event(self):
+        (event,) = _parse(b'data: {"a": 1}\n\n')
+        assert event.data == b'{"a": 1}'
+        assert event.event == "message"
+
+    def test_multi_line_data_joined_with_newline(self):
+        (event,) = _parse(b"data: first\ndata: second\n\n")
+        assert event.data == b"first\nsecond"
+
+    def test_event_id_retry_and_comments(self):
+        events = _parse(b": keep-alive\nevent: delta\nid: 7\nretry: 1500\ndata: x\n\ndata: y\n\n")
+        assert [e.data for e in events] == [b"x", b"y"]
+        assert events[0].event == "delta"
+        assert events[1].event == "message"
+        # The last event id persists across events.
+        assert events[0].id == events[1].id == "7"
+        assert events[1].retry == 1500
+
+    def test_invalid_id_and_retry_ignored(self):
+        (event,) = _parse(b"id: a\x00b\nretry: soon\ndata: x\n\n")
+        assert event.id is None and event.retry is None
+
+    @pytest.mark.parametrize("newline", [b"\n", b"\r\n", b"\r"])
+    def test_line_endings(self, newline):
+        stream = b"data: a" + newline + newline + b"data: b" + newline + newline
+        assert [e.data for e in _parse(stream)] == [b"a", b"b"]
+
+    def test_crlf_split_across_chunks(self):
+        events = _parse(b"data: a\r", b"\n\r", b"\ndata: b\r\n\r\n")
+        assert [e.data for e in events] == [b"a", b"b"]
+
+    def test_event_split_at_every_byte(self):
+        stream = b'event: x\ndata: {"k": "v"}\n\n'
+        events = _parse(*[stream[i:i + 1] for i in range(len(stream))])
+        assert [(e.event, e.data) for e in events] == [("x", b'{"k": "v"}')]
+
+    def test_field_without_space_or_colon(self):
+        events = _parse(b"data:tight\n\ndata\n\n")
+        assert [e.data for e in events] == [b"tight", b""]
+
+    def test_bom_stripped_even_when_split(self):
+        assert [e.data for e in _parse(b"\xef\xbb", b"\xbfdata: a\n\n")] == [b"a"]
+
+    def test_event_without_data_not_dispatched(self):
+        assert _parse(b"event: ping\n\n") == []
+
+    def test_unterminated_event_discarded(self):
+        assert _parse(b"data: partial\n") == []
+
+
+    def test_feed_data_matches_feed(self):
+        stream = b"data: a\n\nevent: x\ndata: b\ndata: c\n\n: ping\n\ndata: d\n\n"
+        for size in (1, 3, 7, len(stream)):
+            reads = [stream[i:i + size] for i in range(0, len(stream), size)]
+            events, data = SSEParser(), SSEParser()
+            expected = [e.data for r in reads for e in events.feed(r)]
+            assert [d for r in reads for d in data.feed_data(r)] == expected
+            assert expected == [b"a", b"b\nc", b"d"]
+
+    def test_large_event_in_small_reads(self):
+        payload = b"x" * 100_000
+        stream = b"data: " + payload + b"\n\n"
+        parser = SSEParser()
+        out = []
+        for i in range(0, len(stream), 64):
+            out.extend(parser.feed_data(stream[i:i + 64]))
+        assert out == [payload]
+
+
+class TestDataIterators:
+    def test_stops_at_done(self):
+        chunks = [b"data: 1\n\ndata: [DONE]\n\ndata: 2\n\n"]
+        assert list(iter_sse_data(chunks)) == [b"1"]
+
+    def test_async_iterator(self):
+        async def _chunks():
+            for chunk in (b"data: a\n", b"\ndata: b\n\n", b"data: [DONE]\n\n"):
+                yield chunk
+
+        async def _collect():
+            return [data async for data in aiter_sse_data(_chunks())]
+
+        assert asyncio.run(_collect()) == [b"a", b"b"]
@@ -1,18 +1,32 @@
 """Tests for streaming.py: resilience and logger warning on chunk errors."""
 
+import asyncio
 import logging
 from unittest.mock import MagicMock, patch
 
+import pytest
+import requests
 from langchain_core.messages import AIMessageChunk
 from langchain_core.outputs import ChatGenerationChunk
 
-from langchain_iointelligence.streaming import IOIntelligenceStreamer
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.exceptions import (IOIntelligenceAPIError,
+                                                 IOIntelligenceRateLimitError)
+from langchain_iointelligence.streaming import (IOIntelligenceStreamer,
+                                                StreamDelta,
+                                                build_generation_chunk,
+                                                parse_stream_delta)
+
+
+def _sse_bytes(data_lines):
+    """Encode each line as its own SSE event (terminated by a blank line)."""
+    return [f"{line}\n\n".encode() for line in data_lines]
 
 
 def _make_fake_response(data_lines):
-    """Return a mock response whose iter_lines yields the given lines."""
+    """Return a mock response whose iter_content yields the given lines as events."""
     mock_response = MagicMock()
-    mock_response.iter_lines.return_value = iter(data_lines)
+    mock_response.iter_content.return_value = iter(_sse_bytes(data_lines))
     return mock_response
 
 
@@ -64,3 +78,126 @@ class TestParseSSEStreamResilience:
 
         assert any("test error" in record.message for record in caplog.records)
         assert any(record.levelno == logging.WARNING for record in caplog.records)
+
+
+def _stream_response(status_code=200, lines=(), headers=None):
+    response = MagicMock(ok=status_code < 400, status_code=status_code, text="", headers=headers or {})
+    response.iter_content.return_value = iter(_sse_bytes(lines))
+    response.__enter__.return_value = response
+    return response
+
+
+class TestStreamRetryBeforeFirstByte:
+    _LINES = [
+        'data: {"choices": [{"delta": {"content": "hi"}, "finish_reason": "stop"}]}',
+        "data: [DONE]",
+    ]
+
+    def test_retries_server_error_then_streams(self):
+        streamer = IOIntelligenceStreamer("key", "https://example.com", max_retries=1)
+        responses = [_stream_response(503), _stream_response(lines=self._LINES)]
+        with patch.object(streamer.session, "post", side_effect=responses) as post, \
+                patch("langchain_iointelligence.streaming.time.sleep") as sleep:
+            chunks = list(streamer.stream_chat_completion({"model": "m"}))
+        assert [c.text for c in chunks] == ["hi"]
+        assert post.call_count == 2
+        sleep.assert_called_once()
+        assert post.call_args.kwargs["stream"] is True
+
+    def test_retries_connection_error(self):
+        streamer = IOIntelligenceStreamer("key", "https://example.com", max_retries=1)
+        side_effect = [requests.exceptions.ConnectionError("reset"), _stream_response(lines=self._LINES)]
+        with patch.object(streamer.session, "post", side_effect=side_effect), \
+                patch("langchain_iointelligence.streaming.time.sleep"):
+            assert list(streamer.stream_raw({"model": "m"}))[0]["choices"][0]["delta"]["content"] == "hi"
+
+    def test_gives_up_after_max_retries(self):
+        streamer = IOIntelligenceStreamer("key", "https://example.com", max_retries=1)
+        with patch.object(streamer.session, "post", side_effect=[_stream_response(429), _stream_response(429)]), \
+                patch("langchain_iointelligence.streaming.time.sleep"):
+            with pytest.raises(IOIntelligenceRateLimitError):
+                list(streamer.stream_raw({"model": "m"}))
+
+    def test_client_error_not_retried(self):
+        streamer = IOIntelligenceStreamer("key", "https://example.com", max_retries=3)
+        with patch.object(streamer.session, "post", return_value=_stream_response(400)) as post:
+            with pytest.raises(IOIntelligenceAPIError):
+                list(streamer.stream_raw({"model": "m"}))
+        post.assert_called_once()
+
+    def test_chat_model_streamer_shares_http_session(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url="https://x", pool_maxsize=4)
+        assert chat.streamer.session is chat.http_client.session
+        assert chat.http_client.session.get_adapter("https://x")._pool_maxsize == 4
+
+
+_RAW_CHUNKS = [
+    {"id": "c1", "model": "m", "choices": [{"index": 0, "delta": {"content": "Hel"}}]},
+    {"id": "c1", "model": "m", "choices": [{"index": 0, "delta": {"content": "lo"}}]},
+    {
+        "id": "c1",
+        "model": "m",
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    },
+    {"id": "c1", "model": "m", "choices": [], "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}},
+]
+
+
+class TestStreamDeltas:
+    def test_parse_stream_delta(self):
+        delta = parse_stream_delta(_RAW_CHUNKS[0])
+        assert isinstance(delta, StreamDelta)
+        assert (delta.content, delta.finish_reason, delta.index) == ("Hel", None, 0)
+        assert not hasattr(delta, "__dict__")
+        usage = parse_stream_delta(_RAW_CHUNKS[-1])
+        assert usage.index is None and usage.usage["total_tokens"] == 3
+        assert parse_stream_delta({"choices": []}) is None
+        assert parse_stream_delta({"choices": ["bad"]}) is None
+
+    def test_to_generation_chunk_matches_build_generation_chunk(self):
+        raw = _RAW_CHUNKS + [
+            {
+                "choices": [
+                    {
+                        "delta": {
+                            "tool_calls": [
+                                {"index": 0, "id": "t1", "function": {"name": "f", "arguments": "{"}}
+                            ]
+                        }
+                    }
+                ]
+            }
+        ]
+        for chunk_data in raw:
+            expected = build_generation_chunk(chunk_data)
+            actual = parse_stream_delta(chunk_data).to_generation_chunk()
+            assert actual.message == expected.message
+            assert actual.generation_info == expected.generation_info
+
+    def test_stream_deltas_and_text(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url="https://x")
+        with patch.object(
+            IOIntelligenceStreamer, "stream_raw", side_effect=lambda data: iter(_RAW_CHUNKS)
+        ) as stream_raw:
+            deltas = list(chat.stream_deltas("hi"))
+            text = list(chat.stream_text("hi"))
+        assert [d.content for d in deltas] == ["Hel", "lo", "", ""]
+        assert deltas[2].finish_reason == "stop"
+        assert deltas[3].usage["total_tokens"] == 3
+        assert text == ["Hel", "lo"]
+        assert stream_raw.call_args.args[0]["stream"] is True
+
+    def test_astream_text(self):
+        chat = IOIntelligenceChatModel(api_key="k", api_url="https://x")
+
+        async def _aiter(data):
+            for chunk in _RAW_CHUNKS:
+                yield chunk
+
+        async def _collect():
+            return [text async for text in chat.astream_text("hi")]
+
+        client = MagicMock()
+        client.astream = _aiter
+        with patch.object(IOIntelligenceChatModel, "async_http_client", client):
+            assert asyncio.run(_collect()) == ["Hel", "lo"]
@@ -0,0 +1,118 @@
+"""Tests for concurrent tool execution."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from langchain_iointelligence.chat import _parse_response_tool_calls
+from langchain_iointelligence.tool_executor import ToolExecutor
+
+
+def _calls(*specs):
+    return [
+        {"name": name, "args": args, "id": f"c{i}", "type": "tool_call"}
+        for i, (name, args) in enumerate(specs)
+    ]
+
+
+class _Barrier:
+    """Tools that only finish if all of them run at the same time."""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=2)
+
+    def make_tool(self):
+        @tool
+        def wait(x: int) -> int:
+            """Wait for the other calls, then echo x."""
+            self.barrier.wait()
+            return x
+
+        return wait
+
+
+class TestToolExecutor:
+    def test_sync_tools_run_in_parallel_and_keep_order(self):
+        executor = ToolExecutor([_Barrier(4).make_tool()])
+        messages = executor.execute(_calls(*[("wait", {"x": i}) for i in range(4)]))
+        executor.close()
+        assert [m.content for m in messages] == ["0", "1", "2", "3"]
+        assert [m.tool_call_id for m in messages] == ["c0", "c1", "c2", "c3"]
+        assert all(isinstance(m, ToolMessage) for m in messages)
+
+    def test_async_tools_run_concurrently(self):
+        state = {"running": 0, "peak": 0}
+
+        @tool
+        async def nap(x: int) -> int:
+            """Sleep briefly."""
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.05)
+            state["running"] -= 1
+            return x * 2
+
+        executor = ToolExecutor([nap])
+        messages = asyncio.run(executor.aexecute(_calls(*[("nap", {"x": i}) for i in range(5)])))
+        assert [m.content for m in messages] == ["0", "2", "4", "6", "8"]
+        assert state["peak"] == 5
+
+    def test_plain_functions_and_parsed_tool_calls(self):
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        raw = {
+            "tool_calls": [
+                {"id": "t1", "type": "function", "function": {"name": "add", "arguments": '{"a": 1, "b": 2}'}},
+                {"id": "t2", "type": "function", "function": {"name": "add", "arguments": "{bad"}},
+            ]
+        }
+        tool_calls, invalid = _parse_response_tool_calls(raw)
+        message = AIMessage(content="", tool_calls=tool_calls, invalid_tool_calls=invalid)
+        results = ToolExecutor([add]).execute(message)
+        assert results[0].content == "3"
+        assert results[1].status == "error" and results[1].tool_call_id == "t2"
+
+    def test_timeouts_and_errors_become_error_messages(self):
+        @tool
+        def slow() -> str:
+            """Sleep past the timeout."""
+            time.sleep(0.3)
+            return "late"
+
+        @tool
+        def boom() -> str:
+            """Always fail."""
+            raise RuntimeError("kaboom")
+
+        executor = ToolExecutor([slow, boom], timeouts={"slow": 0.05})
+        results = executor.execute(_calls(("slow", {}), ("boom", {}), ("missing", {})))
+        assert [m.status for m in results] == ["error"] * 3
+        assert "timed out" in results[0].content
+        assert "kaboom" in results[1].content
+        assert "unknown tool" in results[2].content
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(
+                ToolExecutor([slow], timeout=0.05, handle_errors=False).aexecute(_calls(("slow", {})))
+            )
+
+    def test_async_timeouts_count_from_submission(self):
+        @tool
+        async def nap() -> str:
+            """Sleep for a while."""
+            await asyncio.sleep(0.2)
+            return "done"
+
+        # One worker: the second call waits 0.2s for the first, leaving it
+        # 0.1s of its 0.3s budget; the third starts with none left.
+        executor = ToolExecutor([nap], max_workers=1, timeout=0.3)
+        results = asyncio.run(executor.aexecute(_calls(("nap", {}), ("nap", {}), ("nap", {}))))
+        assert results[0].content == "done"
+        assert [m.status for m in results[1:]] == ["error", "error"]
+        assert all("timed out" in m.content for m in results[1:])
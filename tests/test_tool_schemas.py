@@ -0,0 +1,72 @@
+"""Tests for cached tool schemas and toolsets."""
+
+from unittest.mock import patch
+
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, Field
+
+from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.tool_schemas import (Toolset,
+                                                   clear_tool_schema_cache,
+                                                   get_openai_tool_schema)
+
+_CONVERT = "langchain_iointelligence.tool_schemas.convert_to_openai_tool"
+
+
+class Lookup(BaseModel):
+    """Look something up."""
+
+    query: str = Field(..., description="What to look up")
+
+
+def _model():
+    return IOIntelligenceChatModel(api_key="k", api_url="https://x")
+
+
+class TestToolSchemaCache:
+    def setup_method(self):
+        clear_tool_schema_cache()
+
+    def test_schema_generated_once_per_tool(self):
+        @tool
+        def ping(host: str) -> str:
+            """Ping a host."""
+            return host
+
+        def add(a: int, b: int) -> int:
+            """Add numbers."""
+            return a + b
+
+        chat = _model()
+        with patch(_CONVERT, wraps=convert_to_openai_tool) as convert:
+            for _ in range(5):
+                bound = chat.bind_tools([Lookup, ping, add], tool_choice="ping")
+        assert convert.call_count == 3
+        assert [t["function"]["name"] for t in bound.kwargs["tools"]] == ["Lookup", "ping", "add"]
+        assert bound.kwargs["tool_choice"] == {"type": "function", "function": {"name": "ping"}}
+
+    def test_changed_docstring_regenerates(self):
+        def fn(x: int) -> int:
+            """Old."""
+            return x
+
+        assert get_openai_tool_schema(fn)["function"]["description"] == "Old."
+        fn.__doc__ = "New."
+        assert get_openai_tool_schema(fn)["function"]["description"] == "New."
+
+    def test_structured_output_uses_cache(self):
+        chat = _model()
+        chat.with_structured_output(Lookup)
+        with patch(_CONVERT) as convert:
+            chat.with_structured_output(Lookup)
+            chat.with_structured_output(Lookup, method="json_schema")
+        convert.assert_not_called()
+
+
+class TestToolset:
+    def test_bind_toolset(self):
+        toolset = Toolset([Lookup])
+        assert toolset.names == ["Lookup"]
+        bound = _model().bind_tools(toolset, tool_choice="Lookup")
+        assert bound.kwargs["tools"] is toolset.schemas
@@ -0,0 +1,78 @@
+"""Tests for incremental tool-call assembly."""
+
+from langchain_iointelligence.streaming import (build_generation_chunk,
+                                                parse_stream_delta)
+from langchain_iointelligence.tool_stream import ToolCallAccumulator
+
+
+def _chunk(tool_calls=None, finish_reason=None):
+    delta = {"tool_calls": tool_calls} if tool_calls else {}
+    return {"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+def _fragment(index, arguments, id=None, name=None):
+    function = {"arguments": arguments}
+    if name:
+        function["name"] = name
+    tool_call = {"index": index, "function": function}
+    if id:
+        tool_call["id"] = id
+    return tool_call
+
+
+_STREAM = [
+    _chunk([_fragment(0, "", id="c1", name="search")]),
+    _chunk([_fragment(0, '{"query": "a {b}')]),
+    _chunk([_fragment(0, ' \\"c\\" [d]", "n": [1, ')]),
+    _chunk([_fragment(0, "2]}")]),
+    _chunk([_fragment(1, '{"x"', id="c2", name="lookup")]),
+    _chunk([_fragment(1, ": 1}")]),
+    _chunk(finish_reason="tool_calls"),
+]
+
+
+class TestToolCallAccumulator:
+    def test_reports_each_call_when_its_arguments_close(self):
+        seen = []
+        calls = ToolCallAccumulator(on_tool_call=seen.append)
+        completed_at = [len(calls.add(chunk)) for chunk in _STREAM]
+        assert completed_at == [0, 0, 0, 1, 0, 1, 0]
+        assert seen == calls.tool_calls
+        assert seen[0] == {
+            "name": "search",
+            "args": {"query": 'a {b} "c" [d]', "n": [1, 2]},
+            "id": "c1",
+            "type": "tool_call",
+        }
+        assert seen[1]["args"] == {"x": 1}
+
+    def test_accepts_deltas_and_langchain_chunks(self):
+        for convert in (parse_stream_delta, build_generation_chunk):
+            calls = ToolCallAccumulator()
+            for chunk in _STREAM:
+                calls.add(convert(chunk))
+            assert [c["id"] for c in calls.tool_calls] == ["c1", "c2"]
+
+    def test_partial_args(self):
+        calls = ToolCallAccumulator()
+        for chunk in _STREAM[:2]:
+            calls.add(chunk)
+        assert calls.partial_args(0) == {"query": "a {b}"}
+        assert not calls.is_complete(0)
+        assert calls.partial_args(5) == {}
+
+    def test_escape_split_across_fragments(self):
+        calls = ToolCallAccumulator()
+        calls.add_deltas([_fragment(0, '{"s": "\\', name="f")])
+        assert calls.add_deltas([_fragment(0, '"}')]) == []
+        (call,) = calls.add_deltas([_fragment(0, '"}')])
+        assert call["args"] == {"s": '"}'}
+
+    def test_finish_flushes_argumentless_and_invalid_calls(self):
+        calls = ToolCallAccumulator()
+        calls.add_deltas([_fragment(0, "", id="c1", name="now")])
+        calls.add_deltas([_fragment(1, "[1, 2]", id="c2", name="bad")])
+        calls.add_deltas([_fragment(2, "not json", id="c3", name="bad")])
+        completed = calls.finish()
+        assert completed == [{"name": "now", "args": {}, "id": "c1", "type": "tool_call"}]
+        assert [c["id"] for c in calls.invalid_tool_calls] == ["c2", "c3"]
@@ -1,11 +1,15 @@
 """Test usage metadata mapping functionality."""
 
+import asyncio
+import time
 from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
 from langchain_core.messages import HumanMessage
 
 from langchain_iointelligence.chat import IOIntelligenceChatModel
+from langchain_iointelligence.streaming import IOIntelligenceStreamer
+from langchain_iointelligence.timing import RequestTiming, parse_server_timing
 
 
 class TestUsageMetadata:
@@ -105,6 +109,137 @@ class TestUsageMetadata:
             assert ai_message.usage_metadata["output_tokens"] == 0
             assert ai_message.usage_metadata["total_tokens"] == 0
 
+    def test_cached_prompt_tokens_mapped_to_cache_read(self):
+        """prompt_tokens_details.cached_tokens surfaces as input_token_details."""
+        from langchain_iointelligence.streaming import build_generation_chunk
+
+        usage = {
+            "prompt_tokens": 6000,
+            "completion_tokens": 10,
+            "total_tokens": 6010,
+            "prompt_tokens_details": {"cached_tokens": 5800},
+        }
+        chat = IOIntelligenceChatModel(
+            api_key="test_key",
+            api_url="https://test.api.com/v1/chat/completions"
+        )
+        result = chat._create_chat_result(
+            {"choices": [{"message": {"content": "ok"}}], "usage": usage}
+        )
+        metadata = result.generations[0].message.usage_metadata
+        assert metadata["input_token_details"] == {"cache_read": 5800}
+
+        chunk = build_generation_chunk({"choices": [], "usage": usage})
+        assert chunk.message.usage_metadata["input_token_details"] == {"cache_read": 5800}
+
+    def test_reasoning_and_audio_details_mapped(self):
+        """completion_tokens_details surfaces as output_token_details."""
+        from langchain_iointelligence.usage import build_usage_metadata
+
+        metadata = build_usage_metadata({
+            "prompt_tokens": 50,
+            "completion_tokens": 400,
+            "total_tokens": 450,
+            "prompt_tokens_details": {"cached_tokens": 0, "audio_tokens": 12},
+            "completion_tokens_details": {"reasoning_tokens": 320, "audio_tokens": None},
+        })
+        assert metadata["input_token_details"] == {"cache_read": 0, "audio": 12}
+        assert metadata["output_token_details"] == {"reasoning": 320}
+        assert "output_token_details" not in build_usage_metadata({"completion_tokens": 1})
+
+
+class TestResponseTiming:
+    """Client-measured timings in response_metadata["timing"]."""
+
+    def _chat(self):
+        return IOIntelligenceChatModel(
+            api_key="test_key", api_url="https://test.api.com/v1/chat/completions"
+        )
+
+    def test_generate_reports_client_and_server_timing(self):
+        def _post(data, timing=None):
+            timing.retries = 1
+            timing.connect_ms = 4.0
+            timing.server = parse_server_timing(
+                {"openai-processing-ms": "250", "server-timing": "queue;dur=30.5, infer;dur=200"}
+            )
+            time.sleep(0.01)
+            timing.finish()
+            return {
+                "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 20, "total_tokens": 25},
+            }
+
+        mock_client = Mock()
+        mock_client.post_with_retry.side_effect = _post
+        chat = self._chat()
+        with patch.object(type(chat), "http_client", new_callable=PropertyMock) as prop:
+            prop.return_value = mock_client
+            message = chat.invoke("hi")
+
+        timing = message.response_metadata["timing"]
+        assert timing["retries"] == 1
+        assert timing["connect_ms"] == 4.0
+        assert timing["total_ms"] >= 10
+        assert timing["server"] == {"processing_ms": 250.0, "queue_ms": 30.5, "infer_ms": 200.0}
+        assert 0 < timing["tokens_per_sec"] <= 2000
+
+    def test_stream_reports_time_to_first_token(self):
+        raw_chunks = [
+            {"choices": [{"index": 0, "delta": {"content": "Hel"}}]},
+            {"choices": [{"index": 0, "delta": {"content": "lo"}, "finish_reason": "stop"}]},
+            {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}},
+        ]
+        chat = IOIntelligenceChatModel(
+            api_key="test_key", api_url="https://test.api.com/v1/chat/completions", streaming=True
+        )
+        with patch.object(IOIntelligenceStreamer, "stream_raw", side_effect=lambda data: iter(raw_chunks)):
+            chunks = list(chat.stream("hi"))
+
+        assert "timing" not in chunks[0].response_metadata
+        merged = chunks[0]
+        for chunk in chunks[1:]:
+            merged += chunk
+        timing = merged.response_metadata["timing"]
+        assert timing["ttft_ms"] <= timing["total_ms"]
+        assert timing["retries"] == 0
+
+    def test_httpx_trace_events(self):
+        timing = RequestTiming()
+
+        async def _trace():
+            for event in (
+                "connection.connect_tcp.started",
+                "connection.connect_tcp.complete",
+                "connection.start_tls.started",
+                "connection.start_tls.complete",
+                "http11.send_request_headers.started",
+                "http11.send_request_headers.complete",
+                "http11.receive_response_headers.started",
+                "http11.receive_response_headers.complete",
+            ):
+                await timing.trace(event, {})
+
+        asyncio.run(_trace())
+        assert timing.connect_ms is not None and timing.connect_ms > 0
+        assert timing.tls_ms is not None
+        assert timing.ttfb_ms is not None
+
+        reused = RequestTiming()
+        reused._on_trace("http2.send_request_headers.started")
+        reused._on_trace("http2.send_request_headers.complete")
+        assert reused.connect_ms == 0.0
+
+    def test_usage_timing_fields(self):
+        assert parse_server_timing(usage={"queue_time": 0.012, "completion_time": 0.5}) == {
+            "queue_time_ms": 12.0,
+            "completion_time_ms": 500.0,
+        }
+        timing = RequestTiming()
+        timing.total_ms = 900.0
+        timing.server = {"completion_time_ms": 500.0}
+        assert timing.to_metadata(100)["tokens_per_sec"] == 200.0
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,6 +1,7 @@
 """Tests for IOIntelligenceUtils model-listing helpers."""
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -60,3 +61,96 @@ class TestGetRecommendedModels:
         utils = _utils()
         with patch.object(IOIntelligenceUtils, "list_models", return_value=[]):
             assert utils.get_recommended_models() == []
+
+
+def _response(status_code=200, models=(), etag=None):
+    response = MagicMock(status_code=status_code, text="", headers={"ETag": etag} if etag else {})
+    response.json.return_value = {"data": list(models)}
+    return response
+
+
+def _cached_utils(clock, **kwargs):
+    utils = IOIntelligenceUtils(
+        api_key="k", api_url="https://test.api.com/v1/chat/completions", clock=clock, **kwargs
+    )
+    utils.invalidate_catalog()
+    return utils
+
+
+class TestModelCatalogCache:
+    def test_lookups_share_one_download(self, clock):
+        utils = _cached_utils(clock)
+        models = _catalog([f"org/model-{i}" for i in range(20)])
+        with patch.object(utils.session, "get", return_value=_response(models=models)) as get:
+            assert all(utils.validate_model(f"org/model-{i}") for i in range(20))
+            assert not utils.validate_model("org/missing")
+            assert utils.get_recommended_models()
+        get.assert_called_once()
+
+    def test_cache_shared_between_instances(self, clock):
+        first = _cached_utils(clock)
+        second = IOIntelligenceUtils(
+            api_key="k", api_url="https://test.api.com/v1/chat/completions", clock=clock
+        )
+        with patch.object(first.session, "get", return_value=_response(models=_catalog(["a"]))):
+            first.list_models()
+        with patch.object(second.session, "get") as get:
+            assert second.validate_model("a")
+        get.assert_not_called()
+
+    def test_lookup_by_name(self, clock):
+        utils = _cached_utils(clock)
+        models = [{"id": "org/x", "name": "Friendly X"}]
+        with patch.object(utils.session, "get", return_value=_response(models=models)):
+            assert utils.get_model_info("Friendly X")["id"] == "org/x"
+
+    def test_malformed_entries_are_ignored(self, clock):
+        utils = _cached_utils(clock)
+        models = ["org/bare-string", None, {"id": "org/x"}]
+        with patch.object(utils.session, "get", return_value=_response(models=models)):
+            assert utils.list_models() == [{"id": "org/x"}]
+            assert utils.validate_model("org/x")
+            assert not utils.validate_model("org/bare-string")
+
+    def test_expired_catalog_revalidates_with_etag(self, clock):
+        utils = _cached_utils(clock, catalog_ttl=10, stale_while_revalidate=0)
+        responses = [_response(models=_catalog(["a"]), etag='"v1"'), _response(304)]
+        with patch.object(utils.session, "get", side_effect=responses) as get:
+            utils.list_models()
+            clock.now = 11
+            assert utils.list_models() == _catalog(["a"])
+        assert get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert utils.get_catalog().fetched_at == 11
+
+    def test_stale_catalog_served_while_revalidating(self, clock):
+        utils = _cached_utils(clock, catalog_ttl=10, stale_while_revalidate=60)
+        with patch.object(utils.session, "get", return_value=_response(models=_catalog(["a"]))):
+            utils.list_models()
+        clock.now = 30
+        with patch.object(utils, "_refresh_in_background") as refresh:
+            assert utils.validate_model("a")
+        refresh.assert_called_once()
+
+    def test_fetch_error_propagates(self, clock):
+        utils = _cached_utils(clock)
+        with patch.object(utils.session, "get", return_value=_response(500)):
+            with pytest.raises(IOIntelligenceError):
+                utils.list_models()
+
+
+class TestAsyncModelCatalog:
+    def test_avalidate_model_downloads_once(self, clock):
+        utils = _cached_utils(clock)
+
+        async def _run():
+            client = MagicMock()
+            client.get = AsyncMock(return_value=_response(models=_catalog(["a", "b"])))
+            with patch.object(utils, "_get_async_client", return_value=client):
+                results = [await utils.avalidate_model(m) for m in ("a", "b", "c")]
+                models = await utils.alist_models()
+            return results, models, client.get.await_count
+
+        results, models, calls = asyncio.run(_run())
+        assert results == [True, True, False]
+        assert [m["id"] for m in models] == ["a", "b"]
+        assert calls == 1